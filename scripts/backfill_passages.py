@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.govuk_content_agents.storage.models import content_hash
+from src.govuk_content_agents.storage.vectors import VectorService, create_vector_client
+
+def stored_documents(client, chunk_rows: int):
+    """
+    Stream stored documents as ingest documents, keeping their ids and creation
+    times. Rows saved before content hashes were recorded get theirs first.
+    """
+    for records, _ in client.export_chunks("documents", chunk_rows):
+        client.update_content_hashes({
+            str(record["id"]): content_hash(record["content"] or "")
+            for record in records
+            if not record.get("content_hash")
+        })
+        for record in records:
+            yield {
+                "id": str(record["id"]),
+                "content": record["content"] or "",
+                "metadata": record.get("metadata") or {},
+                "created_at": record.get("created_at")
+            }
+
+async def backfill(table: str, backend: str | None, chunk_rows: int):
+    client = create_vector_client(table=table, backend=backend)
+    client.connect()
+    print(f"🧩 Indexing passages for documents in {client.table} that have none...")
+
+    # Documents that already have passages are skipped. The rest are re-saved with
+    # their stored embedding (found by content hash), so only passage text that
+    # differs from the whole document is embedded. Re-running is safe.
+    scanned = 0
+    async for ids in VectorService(client=client).ingest(stored_documents(client, chunk_rows)):
+        scanned += len(ids)
+
+    print(f"✅ Done ({scanned} documents checked)")
+    client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Add passages to documents stored before the passage index.")
+    parser.add_argument("--table", default="content_embeddings")
+    parser.add_argument("--backend", choices=["pgvector", "local"], help="Defaults to VECTOR_BACKEND")
+    parser.add_argument("--chunk-rows", type=int, default=1_000, help="Stored rows read at a time")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.table, args.backend, args.chunk_rows))
+
+if __name__ == "__main__":
+    main()
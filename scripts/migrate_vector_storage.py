@@ -0,0 +1,26 @@
+import argparse
+import os
+import sys
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.govuk_content_agents.storage.vectors import STORAGE_MODES, create_vector_client
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the embeddings ANN index for another storage mode.")
+    parser.add_argument("storage", choices=STORAGE_MODES, help="Target storage mode")
+    parser.add_argument("--table", default="content_embeddings")
+    parser.add_argument("--index-type", choices=["hnsw", "ivfflat"], help="Defaults to VECTOR_INDEX_TYPE")
+    args = parser.parse_args()
+
+    # The table of the pinned embedding version
+    client = create_vector_client(table=args.table, backend="pgvector")
+    client.connect()
+    print(f"🔧 Building {args.storage} index on {client.table} (existing rows are not re-embedded)...")
+    client.migrate_storage(args.storage, index_type=args.index_type)
+    print(f"✅ Done ({client.index_size(args.storage) / 1024 / 1024:.1f} MiB). Set VECTOR_STORAGE={args.storage}.")
+    client.close()
+
+if __name__ == "__main__":
+    main()
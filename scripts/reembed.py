@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.govuk_content_agents.storage.models import EmbeddingVersion
+from src.govuk_content_agents.storage.reembed import reembed
+from src.govuk_content_agents.storage.vectors import create_vector_client
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-embed the knowledge base with another embedding model (resumable; safe to re-run)."
+    )
+    parser.add_argument("--model", required=True, help="Target embedding model")
+    parser.add_argument("--dimensions", type=int, required=True, help="Target embedding size")
+    parser.add_argument("--table", default="content_embeddings")
+    parser.add_argument("--backend", choices=["pgvector", "local"], help="Defaults to VECTOR_BACKEND")
+    parser.add_argument("--batch-size", type=int, help="Documents per embeddings request (defaults to EMBEDDING_BATCH_SIZE)")
+    parser.add_argument("--chunk-rows", type=int, default=1_000, help="Source rows read at a time")
+    args = parser.parse_args()
+
+    # Source: the pinned version searches currently use
+    source = create_vector_client(table=args.table, backend=args.backend)
+    target = create_vector_client(
+        table=args.table, backend=args.backend, version=EmbeddingVersion(args.model, args.dimensions)
+    )
+    print(f"🔁 Re-embedding {source.table} into {target.table}...")
+    try:
+        report = asyncio.run(reembed(source, target, batch_size=args.batch_size, chunk_rows=args.chunk_rows))
+    finally:
+        source.close()
+        target.close()
+    print(json.dumps(report, indent=2))
+    print(
+        f"✅ Done. Re-run just before switching, then set EMBEDDING_MODEL={args.model} "
+        f"EMBEDDING_DIMENSIONS={args.dimensions}."
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import argparse
+import json
+import os
+import sys
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.govuk_content_agents.storage.rekey import rekey
+from src.govuk_content_agents.storage.vectors import create_vector_client
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Move documents saved with random ids to deterministic ids and drop duplicates (safe to re-run)."
+    )
+    parser.add_argument("--table", default="content_embeddings")
+    parser.add_argument("--backend", choices=["pgvector", "local"], help="Defaults to VECTOR_BACKEND")
+    parser.add_argument("--chunk-rows", type=int, default=1_000, help="Stored rows read at a time")
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would change")
+    args = parser.parse_args()
+
+    client = create_vector_client(table=args.table, backend=args.backend)
+    print(f"🔑 Re-keying {client.table}...")
+    try:
+        report = rekey(client, chunk_rows=args.chunk_rows, dry_run=args.dry_run)
+    finally:
+        client.close()
+    print(json.dumps(report, indent=2))
+    print("✅ Done")
+
+if __name__ == "__main__":
+    main()
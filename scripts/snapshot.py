@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+import time
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from src.govuk_content_agents.storage.snapshot import DTYPES, export_snapshot, import_snapshot
+from src.govuk_content_agents.storage.vectors import create_vector_client
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or bulk-load a knowledge base snapshot (no embedding calls).")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="Snapshot file")
+    parser.add_argument("--table", default="content_embeddings")
+    parser.add_argument("--backend", choices=["pgvector", "local"], help="Defaults to VECTOR_BACKEND")
+    parser.add_argument("--chunk-rows", type=int, default=10_000, help="Rows per chunk when exporting")
+    parser.add_argument("--dtype", choices=DTYPES, default="float32", help="Embedding precision when exporting")
+    parser.add_argument("--keep-indexes", action="store_true", help="Maintain ANN indexes during import instead of rebuilding")
+    args = parser.parse_args()
+
+    client = create_vector_client(table=args.table, backend=args.backend)
+    start = time.perf_counter()
+    if args.command == "export":
+        print(f"📦 Exporting {client.table} to {args.path}...")
+        counts = export_snapshot(client, args.path, chunk_rows=args.chunk_rows, dtype=args.dtype)
+    else:
+        print(f"📥 Loading {args.path} into {client.table}...")
+        counts = import_snapshot(client, args.path, rebuild_indexes=not args.keep_indexes)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {counts['documents']} documents, {counts['passages']} passages in {elapsed:.1f}s")
+    client.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,83 @@
 from abc import ABC, abstractmethod
-from typing import override
+from typing import Any
 import json
 import logging
-from google import genai
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable, InternalServerError
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
 
 from ..config import settings
-from ..storage.models import AgentFeedback
+from ..llm.cache import embedding_cache, embedding_namespace, response_cache
+from ..llm.clients import get_embedding_client, get_fake_client, get_gemini_client, get_openai_client
+from ..llm.scheduler import CallStats, estimate_tokens, llm_scheduler
+from ..llm.transport import run_blocking
+from ..storage.models import AgentFeedback, AgentTelemetry, EmbeddingVersion
 
 logger = logging.getLogger(__name__)
 
 type Context = dict[str, Any] | None
 
+# Telemetry for the execute() call running in the current task
+_current_telemetry: ContextVar[AgentTelemetry | None] = ContextVar("agent_telemetry", default=None)
+
+def _int(value: Any) -> int:
+    return value if isinstance(value, int) else 0
+
+def _record_usage(telemetry: AgentTelemetry, response: Any):
+    """Add token counts from an OpenAI `usage` or Gemini `usage_metadata` block."""
+    usage = getattr(response, "usage", None)
+    if usage is not None and isinstance(getattr(usage, "prompt_tokens", None), int):
+        telemetry.prompt_tokens += usage.prompt_tokens
+        telemetry.completion_tokens += _int(getattr(usage, "completion_tokens", None))
+        details = getattr(usage, "prompt_tokens_details", None)
+        telemetry.cached_tokens += _int(getattr(details, "cached_tokens", None))
+        return
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is not None:
+        telemetry.prompt_tokens += _int(getattr(metadata, "prompt_token_count", None))
+        telemetry.completion_tokens += _int(getattr(metadata, "candidates_token_count", None))
+        telemetry.cached_tokens += _int(getattr(metadata, "cached_content_token_count", None))
+
+def _usage_tokens(response: Any) -> int | None:
+    """Total tokens billed for an OpenAI or Gemini response, if reported."""
+    usage = getattr(response, "usage", None)
+    total = getattr(usage, "total_tokens", None)
+    if isinstance(total, int):
+        return total
+    metadata = getattr(response, "usage_metadata", None)
+    total = getattr(metadata, "total_token_count", None)
+    return total if isinstance(total, int) else None
+
 class BaseAgent(ABC):
     """Abstract base class for all content agents."""
+
+    # Whether responses may be served from the response cache.
+    # Agents that generate new text (rewrites, drafts) opt out.
+    cacheable: bool = True
+
+    # Scheduling priority when the provider budget is contended (higher runs first)
+    priority: int = 0
     
     def __init__(self, name: str, model: str = "gpt-4.1-mini"):
         self.name = name
         self.model = model
-        
-        if self.model.startswith("gpt"):
+        self.select_provider()
+
+    def select_provider(self):
+        """
+        Resolve the provider and client from the model name and settings.
+        LLM_PROVIDER=fake (or a "fake-*" model) uses the offline simulator.
+        """
+        if settings.LLM_PROVIDER == "fake" or self.model.startswith("fake"):
+            self.provider = "fake"
+            self.client = get_fake_client()
+        elif self.model.startswith("gpt"):
             self.provider = "openai"
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+            self.client = get_openai_client()
         else:
             self.provider = "gemini"
-            if settings.GEMINI_API_KEY:
-                self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            else:
-                self.client = None
+            self.client = get_gemini_client()
+            if self.client is None:
                 logger.warning("Gemini API key not found, but Gemini model selected.")
         
     @abstractmethod
@@ -40,11 +88,82 @@ class BaseAgent(ABC):
     async def execute(self, content: str, context: Context = None) -> AgentFeedback:
         """
         Execute the agent on the given content.
+        Identical requests are served from the response cache unless the agent opts out.
+        Timing and token usage are attached as `feedback.telemetry` and logged as an
+        `agent_execution` event.
         """
-        if self.provider == "openai":
-            return await self._execute_openai(content, context)
-        else:
-            return await self._execute_gemini(content, context)
+        telemetry = AgentTelemetry(agent_name=self.name, provider=self.provider, model=self.model)
+        token = _current_telemetry.set(telemetry)
+        start = time.perf_counter()
+        try:
+            feedback = None
+            cache_key = None
+            if self.cacheable and settings.RESPONSE_CACHE_ENABLED:
+                cache_key = response_cache.make_key(
+                    self.provider, self.model, self.get_system_prompt(), content, context
+                )
+                cached = await response_cache.aget(cache_key)
+                if cached is not None:
+                    logger.info(f"Agent {self.name} served from response cache")
+                    telemetry.cache_hit = True
+                    feedback = AgentFeedback(**cached)
+
+            if feedback is None:
+                if self.provider in ("openai", "fake"):
+                    # The simulator speaks the OpenAI chat API
+                    feedback = await self._execute_openai(content, context)
+                else:
+                    feedback = await self._execute_gemini(content, context)
+
+                # Unparseable replies fall back to raw text; caching them would replay the failure
+                if cache_key is not None and not telemetry.parse_failures:
+                    await response_cache.aset(
+                        cache_key, feedback.model_dump(mode="json", exclude={"created_at", "telemetry"})
+                    )
+        finally:
+            _current_telemetry.reset(token)
+            telemetry.total_seconds = time.perf_counter() - start
+
+        logger.info(
+            f"Agent {self.name} finished in {telemetry.total_seconds:.2f}s "
+            f"({telemetry.prompt_tokens}+{telemetry.completion_tokens} tokens)",
+            extra={"event": "agent_execution", "data": telemetry.model_dump(mode="json")}
+        )
+        return feedback.model_copy(update={"telemetry": telemetry})
+
+    async def _call_provider(
+        self,
+        func: Callable[..., Any],
+        prompt: str,
+        provider: str | None = None,
+        completion_tokens: int | None = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Run a blocking SDK call within the scheduler's rate budget, with retries.
+        The budget is chosen by `provider` and the call's `model` keyword argument.
+        """
+        if completion_tokens is None:
+            completion_tokens = settings.LLM_COMPLETION_TOKEN_ESTIMATE
+        stats = CallStats()
+        response = await llm_scheduler.submit(
+            provider or self.provider,
+            kwargs.get("model", self.model),
+            lambda: run_blocking(func, **kwargs),
+            estimated_tokens=estimate_tokens(prompt) + completion_tokens,
+            priority=self.priority,
+            usage_tokens=_usage_tokens,
+            stats=stats
+        )
+
+        telemetry = _current_telemetry.get()
+        if telemetry is not None:
+            telemetry.queue_wait_seconds += stats.queue_wait
+            telemetry.backoff_seconds += stats.backoff_wait
+            telemetry.provider_latency_seconds += stats.provider_latency
+            telemetry.retries += stats.retries
+            _record_usage(telemetry, response)
+        return response
 
     async def _execute_openai(self, content: str, context: Context = None) -> AgentFeedback:
         system_prompt = self.get_system_prompt()
@@ -57,10 +176,11 @@ class BaseAgent(ABC):
             messages.append({"role": "user", "content": f"Additional Context:\n{json.dumps(context, indent=2)}"})
             
         try:
-            logger.info(f"Agent {self.name} starting execution (OpenAI: {self.model})")
+            logger.info(f"Agent {self.name} starting execution ({self.provider}: {self.model})")
             
-            # OpenAI call (using synchronous client in async wrapper if needed, but for now direct call)
-            response = self.client.chat.completions.create(
+            response = await self._call_provider(
+                self.client.chat.completions.create,
+                "".join(m["content"] for m in messages),
                 model=self.model,
                 messages=messages,
                 response_format={"type": "json_object"}
@@ -80,12 +200,6 @@ class BaseAgent(ABC):
             logger.error(f"Error in agent {self.name} (OpenAI): {e}")
             raise
 
-    @retry(
-        retry=retry_if_exception_type((ResourceExhausted, ServiceUnavailable, InternalServerError)),
-        stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=2, min=10, max=120),
-        reraise=True
-    )
     async def _execute_gemini(self, content: str, context: Context = None) -> AgentFeedback:
         if not self.client:
              raise ValueError("Gemini API key not configured.")
@@ -99,7 +213,9 @@ class BaseAgent(ABC):
         try:
             logger.info(f"Agent {self.name} starting execution (Gemini: {self.model})")
             
-            response = self.client.models.generate_content(
+            response = await self._call_provider(
+                self.client.models.generate_content,
+                prompt,
                 model=self.model,
                 contents=prompt
             )
@@ -119,38 +235,65 @@ class BaseAgent(ABC):
             raise
 
     async def get_embedding(self, text: str) -> list[float]:
-        """Generate embedding for text."""
+        """Generate embedding for text (cached by content hash across agents and restarts)."""
+        if settings.EMBEDDING_CACHE_ENABLED:
+            # Agents on Gemini embed through OpenAI
+            provider = "fake" if self.provider == "fake" else "openai"
+            namespace = embedding_namespace(provider, EmbeddingVersion.current().key)
+            return await embedding_cache.aget_or_embed(namespace, text, self._embed)
+        return await self._embed(text)
+
+    async def _embed(self, text: str) -> list[float]:
+        # Query embeddings must match the pinned version of the stored vectors
+        version = EmbeddingVersion.current()
         try:
-            if self.provider == "openai":
-                response = self.client.embeddings.create(
+            if self.provider in ("openai", "fake"):
+                response = await self._call_provider(
+                    self.client.embeddings.create,
+                    text,
+                    model=version.model,
+                    completion_tokens=0,
                     input=text,
-                    model="text-embedding-3-small"
+                    **version.request_options()
                 )
                 return response.data[0].embedding
             else:
                 if settings.OPENAI_API_KEY:
-                   client = OpenAI(api_key=settings.OPENAI_API_KEY)
-                   response = client.embeddings.create(input=text, model="text-embedding-3-small")
+                   client = get_embedding_client()
+                   response = await self._call_provider(
+                       client.embeddings.create,
+                       text,
+                       provider="openai",
+                       model=version.model,
+                       completion_tokens=0,
+                       input=text,
+                       **version.request_options()
+                   )
                    return response.data[0].embedding
                 else:
-                    raise ValueError("OpenAI API Key required for vector search (1536 dimensions).")
+                    raise ValueError(f"OpenAI API Key required for vector search ({version.key}).")
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             raise
 
     def _parse_response(self, text: str) -> dict[str, Any]:
-        """Parse JSON response from LLM."""
-        try:
-            # Clean up potential markdown formatting
-            text = text.replace("```json", "").replace("```", "").strip()
-            
-            # Find JSON/dict structure if wrapped
-            start = text.find('{')
-            end = text.rfind('}') + 1
-            if start != -1 and end != -1:
-                json_str = text[start:end]
-                return json.loads(json_str)
-            return {"summary": text, "issues": []}
-        except json.JSONDecodeError:
-            logger.warning(f"Failed to parse JSON response from {self.name}")
-            return {"summary": text, "issues": []}
+        """Parse JSON response from LLM. Anything that is not a JSON object counts as a parse failure."""
+        # Clean up potential markdown formatting
+        text = text.replace("```json", "").replace("```", "").strip()
+
+        # Find JSON/dict structure if wrapped
+        start = text.find('{')
+        end = text.rfind('}')
+        if start != -1 and end > start:
+            try:
+                parsed = json.loads(text[start:end + 1])
+            except json.JSONDecodeError:
+                parsed = None
+            if isinstance(parsed, dict):
+                return parsed
+
+        logger.warning(f"Failed to parse JSON response from {self.name}")
+        telemetry = _current_telemetry.get()
+        if telemetry is not None:
+            telemetry.parse_failures += 1
+        return {"summary": text, "issues": []}
@@ -7,6 +7,14 @@ class ConsistencyAgent(BaseAgent):
     Agent responsible for checking content consistency.
     Uses vector search to find duplicates or contradictory content in the database.
     """
+
+    # Matches below this cosine similarity are not worth showing the LLM
+    min_similarity: float = 0.7
+    # Existing documents, and passages from each, shown to the LLM
+    max_documents: int = 3
+    passages_per_document: int = 2
+    # Excerpt shown for documents stored before the passage index (no passages yet)
+    fallback_content_chars: int = 500
     
     def __init__(self):
         super().__init__(name="Consistency Checker")
@@ -46,18 +54,20 @@ Output JSON:
         # 1. Generate embedding for new content
         embedding = await self.get_embedding(content)
         
-        # 2. Search for similar content
-        similar_items = self.vector_db.search_similar(embedding, limit=3)
+        # 2. Search the passage index: the best-matching passages, grouped by document
+        similar_documents = await self.search_existing(embedding)
         
         # 3. Format context for LLM
         db_context = "No existing content found."
-        if similar_items:
+        if similar_documents:
             db_context = "Found the following similar content in database:\n"
-            for item in similar_items:
-                similarity = item.get('similarity', 0)
-                # Only include relevant matches
-                if similarity > 0.7:
-                    db_context += f"- [ID: {item['id']}] (Similarity: {similarity:.2f}): {item['content'][:200]}...\n"
+            for document in similar_documents:
+                metadata = document.get("metadata") or {}
+                source = " / ".join(str(metadata[k]) for k in ("department", "title") if metadata.get(k))
+                label = f" {source}" if source else ""
+                db_context += f"- [ID: {document['id']}]{label} (Similarity: {document['similarity']:.2f}):\n"
+                for passage in document["passages"]:
+                    db_context += f"  > {' '.join(passage['content'].split())}\n"
         
         # 4. Pass combined context to LLM
         full_context = {"existing_content": db_context}
@@ -65,3 +75,44 @@ Output JSON:
             full_context.update(context)
             
         return await super().execute(content, context=full_context)
+
+    async def search_existing(self, embedding: list[float]) -> list[dict[str, Any]]:
+        """
+        Similar documents with their best passages. Documents without passages
+        (stored before the passage index, not yet backfilled) are found by
+        whole-document search and shown as an excerpt.
+        """
+        documents = await self.vector_db.asearch_passages(
+            embedding,
+            limit=self.max_documents,
+            passages_per_parent=self.passages_per_document,
+            min_similarity=self.min_similarity
+        )
+        if len(documents) >= self.max_documents:
+            return documents
+
+        found = {str(document["id"]) for document in documents}
+        candidates = [
+            hit for hit in await self.vector_db.asearch_similar(
+                embedding,
+                self.max_documents,
+                min_similarity=self.min_similarity,
+                max_content_chars=self.fallback_content_chars
+            )
+            if str(hit["id"]) not in found
+        ]
+        if not candidates:
+            return documents
+        unindexed = set(await self.vector_db.aids_without_passages([str(hit["id"]) for hit in candidates]))
+        documents += [
+            {
+                "id": hit["id"],
+                "metadata": hit.get("metadata"),
+                "similarity": hit["similarity"],
+                "passages": [{"position": 0, "title": None, "content": hit["content"] or "", "similarity": hit["similarity"]}]
+            }
+            for hit in candidates
+            if str(hit["id"]) in unindexed
+        ]
+        documents.sort(key=lambda document: document["similarity"], reverse=True)
+        return documents[:self.max_documents]
@@ -3,6 +3,8 @@ from .base import BaseAgent
 import json
 
 class SimplifierAgent(BaseAgent):
+    cacheable = False
+
     def __init__(self):
         super().__init__(name="The Simplifier")
 
@@ -23,6 +25,8 @@ Output JSON:
 """
 
 class LegalistAgent(BaseAgent):
+    cacheable = False
+
     def __init__(self):
         super().__init__(name="The Legalist")
 
@@ -44,6 +48,8 @@ Output JSON:
 """
 
 class MediatorAgent(BaseAgent):
+    cacheable = False
+
     def __init__(self):
         super().__init__(name="The Mediator")
 
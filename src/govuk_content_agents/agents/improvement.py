@@ -5,6 +5,12 @@ class ImprovementAgent(BaseAgent):
     """
     Agent responsible for rewriting content based on feedback from other agents.
     """
+
+    # Rewrites should be regenerated, not replayed
+    cacheable = False
+
+    # On the critical path of every loop iteration
+    priority = 1
     
     def __init__(self):
         super().__init__(name="Content Improver")
@@ -6,6 +6,9 @@ class QualityJudgeAgent(BaseAgent):
     Agent responsible for final quality assessment of content.
     Acts as 'LLM-as-a-Judge' to provide a final score and decision.
     """
+
+    # On the critical path of every loop iteration
+    priority = 1
     
     def __init__(self):
         super().__init__(name="Quality Judge")
@@ -6,6 +6,9 @@ class TemplateAgent(BaseAgent):
     """
     Agent responsible for generating initial content based on a GOV.UK template.
     """
+
+    # Drafts should be regenerated, not replayed
+    cacheable = False
     
     def __init__(self):
         super().__init__(name="Content Architect")
@@ -0,0 +1,3 @@
+"""
+Shared LLM provider plumbing used by the agents and vector services.
+"""
@@ -0,0 +1,373 @@
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from typing import Any
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+class TieredCache:
+    """
+    Two-tier key/value cache: an in-memory LRU in front of a SQLite file.
+    Values must be JSON serialisable. Entries expire after `ttl_seconds` and the
+    disk tier is trimmed to `max_disk_entries` (least recently used first).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: str | None,
+        max_memory_entries: int = 1024,
+        max_disk_entries: int = 100_000,
+        ttl_seconds: float | None = None
+    ):
+        self.name = name
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._writes_since_trim = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+
+    def _disk(self) -> sqlite3.Connection | None:
+        """Open the SQLite tier lazily (callers hold the lock)."""
+        if self.path is None:
+            return None
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, value: Any):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            try:
+                conn = self._disk()
+                row = None
+                if conn is not None:
+                    row = conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+                    if row is not None and self._expired(row[1], now):
+                        conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                        conn.commit()
+                        row = None
+                    elif row is not None:
+                        conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"{self.name} cache disk read failed: {e}")
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value = json.loads(row[0])
+            self._remember(key, row[1], value)
+            self.hits += 1
+            self.disk_hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        """Store a value in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            try:
+                conn = self._disk()
+                if conn is None:
+                    return
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now)
+                )
+                conn.commit()
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= 100:
+                    self._trim(conn, now)
+            except sqlite3.Error as e:
+                logger.warning(f"{self.name} cache disk write failed: {e}")
+
+    def _trim(self, conn: sqlite3.Connection, now: float):
+        """Drop expired rows and evict least recently used rows over the size limit."""
+        self._writes_since_trim = 0
+        if self.ttl_seconds is not None:
+            conn.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
+        conn.commit()
+
+    async def aget(self, key: str) -> Any | None:
+        """Async get; disk reads run off the event loop."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any):
+        """Async set; disk writes run off the event loop."""
+        await asyncio.to_thread(self.set, key, value)
+
+    def clear(self):
+        """Remove every entry from both tiers and reset counters."""
+        with self._lock:
+            self._memory.clear()
+            conn = self._disk()
+            if conn is not None:
+                conn.execute("DELETE FROM cache")
+                conn.commit()
+            self.hits = self.misses = self.memory_hits = self.disk_hits = 0
+
+    def close(self):
+        """Close the SQLite tier."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory)
+        }
+
+def canonical_json(value: Any) -> str:
+    """Stable JSON encoding (sorted keys, no whitespace) for use in cache keys."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+def provider_namespace(provider: str) -> str:
+    """
+    Cache namespace for a provider. Simulated output is namespaced by its seed,
+    so it is never served to (or from) calls to a real provider.
+    """
+    return f"fake:{settings.FAKE_LLM_SEED}" if provider == "fake" else provider
+
+class ResponseCache(TieredCache):
+    """Cache of parsed agent responses keyed by provider, model, prompt, content and context."""
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        system_prompt: str,
+        content: str,
+        context: dict[str, Any] | None
+    ) -> str:
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        digest = hashlib.sha256()
+        for part in (provider_namespace(provider), model, prompt_hash, content, canonical_json(context or {})):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+def _encode_vector(vector: list[float]) -> str:
+    """Pack a vector as base64 float32 (a quarter of the size of a JSON float list)."""
+    return base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+
+def _decode_vector(value: str) -> list[float]:
+    return array("f", base64.b64decode(value)).tolist()
+
+def embedding_namespace(provider: str, version_key: str) -> str:
+    """Embedding cache namespace: the provider (fake vectors never mix with real ones) and version."""
+    return f"{provider_namespace(provider)}:{version_key}"
+
+class EmbeddingCache(TieredCache):
+    """
+    Embeddings keyed by model and content hash, with in-flight coalescing:
+    concurrent requests for the same text (from threads or event loops) wait
+    for the first caller instead of embedding it again.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        content_digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{model}\x00{content_digest}".encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> list[float] | None:
+        value = self.get(key)
+        return _decode_vector(value) if value is not None else None
+
+    def store(self, key: str, vector: list[float]):
+        self.set(key, _encode_vector(vector))
+
+    def _claim(self, key: str) -> tuple[Future, bool]:
+        """Return the in-flight future for `key` and whether this caller must compute it."""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _settle(self, key: str, future: Future, vector: list[float] | None = None, error: BaseException | None = None):
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(vector)
+
+    def get_or_embed(self, model: str, text: str, embed: Callable[[str], list[float]]) -> list[float]:
+        """Cached embedding for `text`, calling `embed` at most once per process for concurrent misses."""
+        key = self.make_key(model, text)
+        vector = self.lookup(key)
+        if vector is not None:
+            return vector
+
+        future, leader = self._claim(key)
+        if not leader:
+            return future.result()
+        try:
+            # Another caller may have finished between the lookup and the claim
+            vector = self.lookup(key)
+            if vector is None:
+                vector = embed(text)
+                self.store(key, vector)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, vector)
+        return vector
+
+    async def aget_or_embed_many(
+        self,
+        model: str,
+        texts: list[str],
+        embed: Callable[[list[str]], Awaitable[list[list[float]]]]
+    ) -> list[list[float]]:
+        """
+        Cached embeddings for `texts` in order. Misses not already in flight are
+        embedded in one `embed` call; disk lookups and writes run off the event loop.
+        """
+        keys = [self.make_key(model, text) for text in texts]
+        unique = dict(zip(keys, texts))
+        found = await asyncio.to_thread(lambda: {key: self.lookup(key) for key in unique})
+        vectors = {key: vector for key, vector in found.items() if vector is not None}
+
+        leading: dict[str, Future] = {}
+        waiting: dict[str, Future] = {}
+        for key in unique:
+            if key not in vectors:
+                future, leader = self._claim(key)
+                (leading if leader else waiting)[key] = future
+
+        if leading:
+            try:
+                embedded = await embed([unique[key] for key in leading])
+                vectors.update(zip(leading, embedded))
+                await asyncio.to_thread(lambda: [self.store(key, vectors[key]) for key in leading])
+            except BaseException as e:
+                for key, future in leading.items():
+                    self._settle(key, future, error=e)
+                raise
+            for key, future in leading.items():
+                self._settle(key, future, vectors[key])
+
+        for key, future in waiting.items():
+            vectors[key] = await asyncio.wrap_future(future)
+        return [vectors[key] for key in keys]
+
+    async def aget_or_embed(
+        self,
+        model: str,
+        text: str,
+        embed: Callable[[str], Awaitable[list[float]]]
+    ) -> list[float]:
+        """Async `get_or_embed` for a single text."""
+        async def embed_many(batch: list[str]) -> list[list[float]]:
+            return [await embed(batch[0])]
+
+        (vector,) = await self.aget_or_embed_many(model, [text], embed_many)
+        return vector
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats, "coalesced": self.coalesced}
+
+# Global instances
+response_cache = ResponseCache(
+    name="llm_responses",
+    path=settings.RESPONSE_CACHE_PATH,
+    max_memory_entries=settings.RESPONSE_CACHE_MEMORY_ENTRIES,
+    max_disk_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+)
+
+# Embeddings are deterministic for a model, so they never expire
+embedding_cache = EmbeddingCache(
+    name="embeddings",
+    path=settings.EMBEDDING_CACHE_PATH,
+    max_memory_entries=settings.EMBEDDING_CACHE_MEMORY_ENTRIES,
+    max_disk_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Any
+
+import httpx
+from google import genai
+from google.genai import types as genai_types
+from openai import OpenAI
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Process-wide registry: (provider, credential fingerprint) -> client
+_clients: dict[tuple[str, str], Any] = {}
+_clients_lock = threading.Lock()
+
+def _fingerprint(api_key: str) -> str:
+    """Hash credentials so raw keys are never used as registry keys or logged."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+def _pool_limits() -> httpx.Limits:
+    """Keep-alive connection pool limits shared by every provider client."""
+    return httpx.Limits(
+        max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY
+    )
+
+def get_openai_client(api_key: str | None = None) -> OpenAI:
+    """Return the shared, connection-pooled OpenAI client for these credentials."""
+    api_key = api_key or settings.OPENAI_API_KEY
+    key = ("openai", _fingerprint(api_key))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(
+                api_key=api_key,
+                http_client=httpx.Client(limits=_pool_limits(), timeout=settings.LLM_TIMEOUT),
+                # LLMScheduler owns retries, so it sees every 429 and Retry-After
+                max_retries=0
+            )
+            _clients[key] = client
+            logger.info(f"Created pooled OpenAI client ({key[1]})")
+        return client
+
+def get_gemini_client(api_key: str | None = None) -> genai.Client | None:
+    """Return the shared Gemini client for these credentials, or None if no key is configured."""
+    api_key = api_key or settings.GEMINI_API_KEY
+    if not api_key:
+        return None
+    key = ("gemini", _fingerprint(api_key))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = genai.Client(
+                api_key=api_key,
+                http_options=genai_types.HttpOptions(
+                    timeout=int(settings.LLM_TIMEOUT * 1000),
+                    client_args={"limits": _pool_limits()},
+                    # One attempt per call; LLMScheduler owns retries
+                    retry_options=genai_types.HttpRetryOptions(attempts=1)
+                )
+            )
+            _clients[key] = client
+            logger.info(f"Created pooled Gemini client ({key[1]})")
+        return client
+
+def get_fake_client() -> Any:
+    """Return the shared offline simulator client (see llm/fake.py)."""
+    from .fake import FakeLLMClient
+
+    # Keyed by every simulator setting, so changed latency or error rates take effect
+    options = {name: value for name, value in settings.model_dump().items() if name.startswith("FAKE_LLM_")}
+    key = ("fake", _fingerprint(json.dumps(options, sort_keys=True)))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = FakeLLMClient()
+            _clients[key] = client
+        return client
+
+def embedding_provider() -> str:
+    """Provider behind `get_embedding_client`: "fake" or "openai"."""
+    return "fake" if settings.LLM_PROVIDER == "fake" else "openai"
+
+def get_embedding_client() -> Any:
+    """Client used for embeddings: OpenAI, or the simulator when LLM_PROVIDER is "fake"."""
+    if settings.LLM_PROVIDER == "fake":
+        return get_fake_client()
+    return get_openai_client()
+
+def clear_clients():
+    """Close and forget all registered clients (used by tests and on shutdown)."""
+    with _clients_lock:
+        for client in _clients.values():
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"Error closing provider client: {e}")
+        _clients.clear()
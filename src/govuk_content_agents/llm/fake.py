@@ -0,0 +1,224 @@
+"""
+Deterministic local LLM simulator for load and benchmark testing.
+
+`FakeLLMClient` mimics the parts of the OpenAI client the agents use
+(`chat.completions.create` and `embeddings.create`) and returns schema-valid
+JSON for each agent's prompt contract. Latency, token counts and injected
+errors are drawn from a generator seeded by the request, so a run with the
+same seed produces the same results regardless of scheduling order.
+"""
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+
+from ..config import settings
+
+EMBEDDING_DIMENSIONS = 1536
+# Requests whose failed attempts are remembered (oldest forgotten first)
+MAX_TRACKED_REQUESTS = 10_000
+
+SEVERITIES = ["high", "medium", "low"]
+ISSUE_TEMPLATES = [
+    ("clarity", "Sentence is longer than 25 words", "Split it into two shorter sentences"),
+    ("style", "Passive voice used", "Rewrite in the active voice"),
+    ("style", "Uses jargon ('facilitate')", "Use 'help' instead"),
+    ("structure", "Most important information is not first", "Move the key action to the opening paragraph"),
+    ("user_needs", "Does not say who this applies to", "Add an eligibility summary"),
+]
+
+class FakeLLMError(Exception):
+    """Injected provider failure with an HTTP-like status code and headers."""
+
+    def __init__(self, status_code: int, retry_after: float | None = None):
+        super().__init__(f"Fake provider error {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": f"{retry_after:.3f}"} if retry_after is not None else {}
+        self.response = httpx.Response(status_code, headers=headers)
+
+def _seed(*parts: Any) -> int:
+    digest = hashlib.sha256("\x00".join(str(p) for p in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+class FakeLLM:
+    """Simulated provider: latency distribution, token accounting and error injection."""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency: str = "lognormal",
+        latency_mean: float = 1.0,
+        latency_sigma: float = 0.3,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        rewrite_rate: float = 0.3
+    ):
+        self.seed = seed
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rewrite_rate = rewrite_rate
+
+        # Failed attempts per request, so a retried request can succeed deterministically.
+        # Entries are dropped on success, so the map only holds requests being retried.
+        self._attempts: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "FakeLLM":
+        return cls(
+            seed=settings.FAKE_LLM_SEED,
+            latency=settings.FAKE_LLM_LATENCY,
+            latency_mean=settings.FAKE_LLM_LATENCY_MEAN,
+            latency_sigma=settings.FAKE_LLM_LATENCY_SIGMA,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            rate_limit_rate=settings.FAKE_LLM_RATE_LIMIT_RATE,
+            retry_after=settings.FAKE_LLM_RETRY_AFTER,
+            rewrite_rate=settings.FAKE_LLM_REWRITE_RATE
+        )
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draw a latency in seconds from the configured distribution."""
+        if self.latency_mean <= 0:
+            return 0.0
+        if self.latency == "constant":
+            return self.latency_mean
+        if self.latency == "uniform":
+            spread = self.latency_mean * self.latency_sigma
+            return max(0.0, rng.uniform(self.latency_mean - spread, self.latency_mean + spread))
+        # lognormal with the requested mean
+        mu = math.log(self.latency_mean) - self.latency_sigma ** 2 / 2
+        return rng.lognormvariate(mu, self.latency_sigma)
+
+    def _begin(self, request_seed: int) -> random.Random:
+        """Sleep for the simulated latency and raise any injected error for this attempt."""
+        with self._lock:
+            attempt = self._attempts.get(request_seed, 0)
+        rng = random.Random(_seed(request_seed, attempt))
+        time.sleep(self.sample_latency(rng))
+        roll = rng.random()
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self._attempts.pop(request_seed, None)
+                self._attempts[request_seed] = attempt + 1
+                while len(self._attempts) > MAX_TRACKED_REQUESTS:
+                    del self._attempts[next(iter(self._attempts))]
+            if roll < self.rate_limit_rate:
+                raise FakeLLMError(429, retry_after=self.retry_after)
+            raise FakeLLMError(503)
+        with self._lock:
+            self._attempts.pop(request_seed, None)
+        return random.Random(request_seed)
+
+    def _rewrite(self, content: str, rng: random.Random) -> str:
+        """Deterministically 'improve' a fraction of the paragraphs."""
+        paragraphs = re.split(r"(\n\s*\n)", content)
+        for i in range(0, len(paragraphs), 2):
+            if paragraphs[i].strip() and rng.random() < self.rewrite_rate:
+                paragraphs[i] = paragraphs[i].rstrip() + " This has been rewritten for clarity."
+        return "".join(paragraphs)
+
+    def respond(self, system_prompt: str, user_content: str, rng: random.Random) -> dict[str, Any]:
+        """Build a response matching the JSON contract described in the system prompt."""
+        issues = []
+        for _ in range(rng.randint(0, 3)):
+            kind, description, suggestion = rng.choice(ISSUE_TEMPLATES)
+            issues.append({
+                "type": kind,
+                "severity": rng.choice(SEVERITIES),
+                "location": user_content[:40],
+                "description": description,
+                "suggestion": suggestion
+            })
+
+        response: dict[str, Any] = {
+            "summary": f"Simulated review ({len(user_content.split())} words).",
+            "score": rng.randint(55, 100),
+            "issues": issues
+        }
+        if "rewritten_content" in system_prompt:
+            if "null (you are a reader" in system_prompt:
+                response["rewritten_content"] = None
+            else:
+                response["rewritten_content"] = self._rewrite(user_content, rng)
+        return response
+
+    def complete(self, model: str, messages: list[dict[str, str]]) -> SimpleNamespace:
+        """Chat completion in the OpenAI response shape."""
+        system_prompt = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user_messages = [m["content"] for m in messages if m["role"] == "user"]
+        prompt = "\n".join(user_messages)
+        request_seed = _seed(self.seed, model, system_prompt, prompt)
+        rng = self._begin(request_seed)
+
+        user_content = user_messages[0] if user_messages else ""
+        user_content = user_content.split("Please review the following content:\n\n", 1)[-1]
+        text = json.dumps(self.respond(system_prompt, user_content, rng))
+
+        prompt_tokens = (len(system_prompt) + len(prompt)) // 4
+        completion_tokens = len(text) // 4
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=text), finish_reason="stop")],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=0)
+            )
+        )
+
+    def embed_one(self, text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> list[float]:
+        """
+        Hashed bag-of-words embedding: texts sharing words get similar vectors,
+        which keeps similarity search meaningful in offline runs.
+        """
+        vector = [0.0] * dimensions
+        for token in re.findall(r"\w+", text.lower()):
+            h = _seed(self.seed, token)
+            vector[h % dimensions] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            rng = random.Random(_seed(self.seed, text))
+            vector = [rng.gauss(0, 1) for _ in range(dimensions)]
+            norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector]
+
+    def embed(self, model: str, inputs: str | list[str], dimensions: int | None = None) -> SimpleNamespace:
+        """Embeddings in the OpenAI response shape (`dimensions` as for text-embedding-3 models)."""
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        self._begin(_seed(self.seed, model, *texts))
+        tokens = sum(len(t) for t in texts) // 4
+        return SimpleNamespace(
+            model=model,
+            data=[
+                SimpleNamespace(index=i, embedding=self.embed_one(t, dimensions or EMBEDDING_DIMENSIONS))
+                for i, t in enumerate(texts)
+            ],
+            usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens)
+        )
+
+class FakeLLMClient:
+    """OpenAI-compatible facade over FakeLLM."""
+
+    def __init__(self, llm: FakeLLM | None = None):
+        self.llm = llm or FakeLLM.from_settings()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_completion))
+        self.embeddings = SimpleNamespace(create=self._create_embedding)
+
+    def _create_completion(self, model: str, messages: list[dict[str, str]], **kwargs: Any) -> SimpleNamespace:
+        return self.llm.complete(model, messages)
+
+    def _create_embedding(self, input: str | list[str], model: str, **kwargs: Any) -> SimpleNamespace:
+        return self.llm.embed(model, input, dimensions=kwargs.get("dimensions"))
@@ -0,0 +1,292 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable, InternalServerError
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token estimate (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+def _status_code(error: Exception) -> int | None:
+    """Extract an HTTP status code from OpenAI, genai or google-api-core errors."""
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts and transient server errors are worth retrying."""
+    if isinstance(error, (ResourceExhausted, ServiceUnavailable, InternalServerError)):
+        return True
+    if type(error).__name__ in ("APITimeoutError", "APIConnectionError"):
+        return True
+    return _status_code(error) in RETRYABLE_STATUS_CODES
+
+def is_rate_limit(error: Exception) -> bool:
+    return isinstance(error, ResourceExhausted) or _status_code(error) == 429
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """Read the provider's requested delay from Retry-After style headers or error details."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            value = headers["retry-after"]
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+
+    # Gemini reports RetryInfo in the error body, e.g. {"retryDelay": "12s"}
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        for item in details.get("error", {}).get("details", []):
+            delay = item.get("retryDelay") if isinstance(item, dict) else None
+            if isinstance(delay, str) and delay.endswith("s"):
+                try:
+                    return float(delay[:-1])
+                except ValueError:
+                    pass
+    return None
+
+class TokenBucket:
+    """Continuously refilling budget, e.g. requests or tokens per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float, scale: float = 1.0):
+        elapsed = now - self.updated
+        self.available = min(self.capacity, self.available + elapsed * self.rate * scale)
+        self.updated = now
+
+    def wait_time(self, amount: float, scale: float = 1.0) -> float:
+        """Seconds until `amount` is available (0 if it is available now)."""
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / (self.rate * scale)
+
+class ModelLimiter:
+    """
+    Request and token budgets for one (provider, model) pair.
+    Waiters are served in priority order (higher first, then FIFO). Only the head
+    of the queue checks the budget: it sleeps until its tokens refill, and every
+    other waiter sleeps until it becomes the head. The effective refill rate backs
+    off multiplicatively on 429s and recovers on success.
+    """
+
+    def __init__(self, rpm: int, tpm: int, max_concurrency: int | None = None):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.rate_scale = 1.0
+
+        self._lock = threading.Lock()
+        self._queue: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        # ticket -> (event loop, event) of the waiting coroutine; callers may run on different loops
+        self._waiters: dict[tuple[int, int], tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+
+    def _wake_head(self):
+        """Wake the waiter at the head of the queue to re-check the budget (caller holds the lock)."""
+        if not self._queue:
+            return
+        waiter = self._waiters.get(self._queue[0])
+        if waiter is not None:
+            loop, event = waiter
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The waiter's loop has closed; its ticket is removed when it unwinds
+                pass
+
+    def _next_delay(self, ticket: tuple[int, int], tokens: int) -> float | None:
+        """
+        Try to grant the ticket (caller holds the lock). Returns 0 if granted,
+        seconds until the budget refills, or None to wait until woken.
+        """
+        if self._queue[0] != ticket:
+            return None
+        now = time.monotonic()
+        self.requests.refill(now, self.rate_scale)
+        self.tokens.refill(now, self.rate_scale)
+        if self.max_concurrency is not None and self.in_flight >= self.max_concurrency:
+            return None
+        delay = max(
+            self.blocked_until - now,
+            self.requests.wait_time(1, self.rate_scale),
+            self.tokens.wait_time(tokens, self.rate_scale)
+        )
+        if delay > 0:
+            return delay
+        self.requests.available -= 1
+        self.tokens.available -= min(tokens, self.tokens.capacity)
+        self.in_flight += 1
+        heapq.heappop(self._queue)
+        del self._waiters[ticket]
+        self._wake_head()
+        return 0.0
+
+    async def acquire(self, tokens: int, priority: int = 0) -> float:
+        """Wait for budget; returns the time spent queued in seconds."""
+        start = time.monotonic()
+        ticket = (-priority, next(self._sequence))
+        event = asyncio.Event()
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+            self._waiters[ticket] = (asyncio.get_running_loop(), event)
+        try:
+            while True:
+                with self._lock:
+                    delay = self._next_delay(ticket, tokens)
+                    if delay == 0.0:
+                        return time.monotonic() - start
+                    # Cleared under the lock, so a wake-up scheduled after this check is never lost
+                    event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=delay)
+                except TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                self._waiters.pop(ticket, None)
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._wake_head()
+            raise
+
+    def release(self, estimated_tokens: int, actual_tokens: int | None = None):
+        """Free the concurrency slot and settle the token estimate against real usage."""
+        with self._lock:
+            self.in_flight -= 1
+            if actual_tokens is not None:
+                self.tokens.available -= actual_tokens - min(estimated_tokens, self.tokens.capacity)
+            self._wake_head()
+
+    def record_success(self):
+        with self._lock:
+            self.rate_scale = min(1.0, self.rate_scale + 0.05)
+            self._wake_head()
+
+    def record_rate_limit(self, retry_after: float | None):
+        """Pause the whole model for Retry-After and halve the effective rate."""
+        with self._lock:
+            self.rate_scale = max(0.1, self.rate_scale * 0.5)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+class CallStats:
+    """
+    Timing and retry counters for one submitted call, filled in by the scheduler.
+    `queue_wait` is time waiting for rate budget; `backoff_wait` is time sleeping between retries.
+    """
+    __slots__ = ("queue_wait", "backoff_wait", "provider_latency", "retries")
+
+    def __init__(self):
+        self.queue_wait = 0.0
+        self.backoff_wait = 0.0
+        self.provider_latency = 0.0
+        self.retries = 0
+
+class LLMScheduler:
+    """Owns rate budgets for every provider/model and retries transient failures."""
+
+    def __init__(self):
+        self._limiters: dict[tuple[str, str], ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, provider: str, model: str) -> ModelLimiter:
+        key = (provider, model)
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limits = settings.LLM_RATE_LIMITS.get(model, {})
+                defaults = settings.PROVIDER_RATE_LIMITS.get(provider, {})
+                limiter = ModelLimiter(
+                    rpm=limits.get("rpm", defaults.get("rpm", 60)),
+                    tpm=limits.get("tpm", defaults.get("tpm", 100_000)),
+                    max_concurrency=limits.get("concurrency", defaults.get("concurrency"))
+                )
+                self._limiters[key] = limiter
+            return limiter
+
+    @staticmethod
+    def backoff(attempt: int, previous: float) -> float:
+        """Decorrelated jitter: random between the base delay and three times the previous delay."""
+        base = settings.LLM_BACKOFF_BASE
+        return min(settings.LLM_BACKOFF_MAX, random.uniform(base, max(base, previous * 3)))
+
+    async def submit[T](
+        self,
+        provider: str,
+        model: str,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int,
+        priority: int = 0,
+        usage_tokens: Callable[[T], int | None] | None = None,
+        stats: CallStats | None = None
+    ) -> T:
+        """Run `call` within the model's budget, retrying retryable errors."""
+        limiter = self.limiter(provider, model)
+        stats = stats or CallStats()
+        delay = 0.0
+        attempt = 0
+        while True:
+            stats.queue_wait += await limiter.acquire(estimated_tokens, priority)
+            actual_tokens = None
+            started = time.monotonic()
+            try:
+                result = await call()
+                if usage_tokens is not None:
+                    actual_tokens = usage_tokens(result)
+            except Exception as e:
+                if not is_retryable(e) or attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                retry_after = retry_after_seconds(e)
+                if is_rate_limit(e):
+                    limiter.record_rate_limit(retry_after)
+                delay = retry_after if retry_after is not None else self.backoff(attempt, delay)
+                attempt += 1
+                stats.retries = attempt
+                logger.warning(
+                    f"{provider}/{model} call failed ({e.__class__.__name__}); "
+                    f"retry {attempt}/{settings.LLM_MAX_RETRIES} in {delay:.1f}s"
+                )
+            else:
+                limiter.record_success()
+                return result
+            finally:
+                stats.provider_latency += time.monotonic() - started
+                limiter.release(estimated_tokens, actual_tokens)
+            await asyncio.sleep(delay)
+            stats.backoff_wait += delay
+
+# Global instance
+llm_scheduler = LLMScheduler()
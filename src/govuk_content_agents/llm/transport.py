@@ -0,0 +1,43 @@
+import asyncio
+import functools
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor used for blocking provider calls."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.LLM_MAX_WORKERS,
+                    thread_name_prefix="llm-transport"
+                )
+                logger.info(f"LLM transport executor started ({settings.LLM_MAX_WORKERS} workers)")
+    return _executor
+
+async def run_blocking[T](func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking SDK call on the bounded executor without stalling the event loop.
+    At most LLM_MAX_WORKERS calls are in flight at once; the rest queue in the executor.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_executor(wait: bool = True):
+    """Stop the executor (it is recreated lazily on next use)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
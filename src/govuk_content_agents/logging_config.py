@@ -14,9 +14,13 @@ class JsonFormatter(logging.Formatter):
             "function": record.funcName,
             "line": record.lineno,
         }
+        # Structured events: logger.info(msg, extra={"event": ..., "data": {...}})
+        if hasattr(record, "event"):
+            log_record["event"] = record.event
+            log_record["data"] = getattr(record, "data", None)
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
-        return json.dumps(log_record)
+        return json.dumps(log_record, default=str)
 
 def setup_logging():
     """Configure logging for the application."""
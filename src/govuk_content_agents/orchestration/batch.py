@@ -0,0 +1,246 @@
+"""
+Headless bulk review runner.
+
+Reads a JSONL or CSV list of GOV.UK paths, URLs or raw texts and runs the
+review graph over them with bounded concurrency. Results are streamed to a
+JSONL file and progress is checkpointed in MongoDB as ReviewSession documents,
+so a crashed batch resumes where it stopped.
+
+    python -m govuk_content_agents.orchestration.batch pages.jsonl \\
+        --output results.jsonl --batch-id gov-uk-2025 --concurrency 8
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from .graph import app as graph_app
+from ..storage.models import ReviewSession
+from ..storage.mongodb import mongo_client
+from ..storage.search_cache import search_cache
+from ..utils.stats import latency_summary
+from ..utils.telemetry import summarize_telemetry
+from ..utils.web import fetch_content_from_govuk_api, fetch_content_from_url
+
+logger = logging.getLogger(__name__)
+
+def load_items(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream batch items from a .jsonl or .csv file.
+    Each item needs one of `path` (GOV.UK Content API), `url` or `text`, and may set `id`.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if v}
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def item_key(item: Dict[str, Any]) -> str:
+    """Stable key for an item: its id, path or URL, or a hash of its text."""
+    for field in ("id", "path", "url"):
+        if item.get(field):
+            return str(item[field])
+    return hashlib.sha256(item.get("text", "").encode("utf-8")).hexdigest()
+
+def session_id(batch_id: str, key: str) -> str:
+    """Deterministic ReviewSession id, so re-runs update the same document."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{batch_id}:{key}"))
+
+async def load_content(item: Dict[str, Any]) -> str:
+    """Resolve an item to review text (network fetches run off the event loop)."""
+    if item.get("text"):
+        return item["text"]
+    if item.get("path"):
+        return await asyncio.to_thread(fetch_content_from_govuk_api, item["path"])
+    if item.get("url"):
+        return await asyncio.to_thread(fetch_content_from_url, item["url"])
+    raise ValueError("Item needs one of 'text', 'path' or 'url'")
+
+class BatchRunner:
+    """Runs the review graph over many items with bounded concurrency and checkpointing."""
+
+    def __init__(
+        self,
+        batch_id: str,
+        output_path: str,
+        concurrency: int = 8,
+        max_iterations: int = 3,
+        checkpoint: bool = True
+    ):
+        self.batch_id = batch_id
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.max_iterations = max_iterations
+        self.checkpoint = checkpoint
+
+        self.latencies: list[float] = []
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self._output_lock = asyncio.Lock()
+
+    async def _save(self, session: ReviewSession):
+        if self.checkpoint:
+            session.updated_at = datetime.utcnow()
+            await mongo_client.save_review(session)
+
+    async def _write_result(self, record: Dict[str, Any], output):
+        async with self._output_lock:
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+
+    async def review_item(self, item: Dict[str, Any], output):
+        """Review one item and record the outcome in MongoDB and the output file."""
+        key = item_key(item)
+        session = ReviewSession(
+            id=session_id(self.batch_id, key),
+            content="",
+            content_title=item.get("title") or key,
+            status="reviewing",
+            batch_id=self.batch_id,
+            source=key
+        )
+        start = time.perf_counter()
+        try:
+            content = await load_content(item)
+            session.content = content
+            await self._save(session)
+
+            result = await graph_app.ainvoke({
+                "input_content": content,
+                "current_content": content,
+                "feedback": [],
+                "iteration": 0,
+                "max_iterations": self.max_iterations,
+                "metadata": {"batch_id": self.batch_id, "source": key}
+            })
+
+            session.status = "completed"
+            session.final_score = result.get("final_score")
+            session.final_decision = result.get("final_decision")
+            session.agent_results = {f.agent_name: f for f in result.get("feedback", [])}
+            record = {
+                "id": session.id,
+                "source": key,
+                "status": "completed",
+                "final_score": session.final_score,
+                "final_decision": session.final_decision,
+                "iterations": result.get("iteration"),
+                "telemetry": summarize_telemetry(result.get("telemetry", []))["total"],
+                "content": result.get("current_content")
+            }
+        except Exception as e:
+            logger.error(f"Batch item {key} failed: {e}")
+            session.status = "failed"
+            session.error = str(e)
+            record = {"id": session.id, "source": key, "status": "failed", "error": str(e)}
+
+        session.duration_seconds = time.perf_counter() - start
+        record["duration_seconds"] = session.duration_seconds
+        # The result is written before the checkpoint, so an item is never marked done without it
+        try:
+            await self._write_result(record, output)
+            await self._save(session)
+        except Exception as e:
+            logger.error(f"Could not record batch item {key}: {e}")
+            session.status = "failed"
+
+        if session.status == "completed":
+            self.completed += 1
+            self.latencies.append(session.duration_seconds)
+        else:
+            self.failed += 1
+
+    async def run(self, items: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """Process all items, skipping ones already completed in this batch."""
+        done = await mongo_client.completed_review_ids(self.batch_id) if self.checkpoint else set()
+        if done:
+            logger.info(f"Resuming batch {self.batch_id}: {len(done)} items already completed")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        start = time.perf_counter()
+
+        Path(self.output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, "a", encoding="utf-8") as output:
+            async def worker():
+                while True:
+                    item = await queue.get()
+                    try:
+                        if item is None:
+                            return
+                        await self.review_item(item, output)
+                    finally:
+                        queue.task_done()
+
+            async def produce():
+                for item in items:
+                    if session_id(self.batch_id, item_key(item)) in done:
+                        self.skipped += 1
+                        continue
+                    await queue.put(item)
+                for _ in range(self.concurrency):
+                    await queue.put(None)
+
+            # A worker that dies would leave the producer blocked on the bounded queue,
+            # so the first failure of any task stops the batch
+            tasks = [asyncio.create_task(produce())]
+            tasks += [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            try:
+                finished, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+                for task in finished:
+                    if task.exception() is not None:
+                        raise task.exception()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        elapsed = time.perf_counter() - start
+        return {
+            "batch_id": self.batch_id,
+            "completed": self.completed,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_seconds": elapsed,
+            "throughput_per_minute": self.completed / elapsed * 60 if elapsed else 0.0,
+            "latency_seconds": latency_summary(self.latencies),
+            "search_cache": search_cache.stats
+        }
+
+def main(argv: list[str] | None = None):
+    from ..logging_config import setup_logging
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Run the review graph over a list of GOV.UK pages or texts.")
+    parser.add_argument("input", help="JSONL or CSV file with path/url/text (and optional id) per item")
+    parser.add_argument("--output", default="review_results.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--batch-id", help="Batch identifier used for resume (defaults to the input file name)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Documents reviewed at once")
+    parser.add_argument("--max-iterations", type=int, default=3, help="Improvement loop limit per document")
+    parser.add_argument("--no-checkpoint", action="store_true", help="Do not record progress in MongoDB")
+    args = parser.parse_args(argv)
+
+    runner = BatchRunner(
+        batch_id=args.batch_id or Path(args.input).stem,
+        output_path=args.output,
+        concurrency=args.concurrency,
+        max_iterations=args.max_iterations,
+        checkpoint=not args.no_checkpoint
+    )
+    report = asyncio.run(runner.run(load_items(args.input)))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
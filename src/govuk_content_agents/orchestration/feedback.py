@@ -0,0 +1,66 @@
+from typing import Any, Dict, List
+from ..config import settings
+from ..storage.models import AgentFeedback
+
+SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+# Severities reviewers use for notes that need no action
+NON_ACTIONABLE_SEVERITIES = {"none", "info", "pass", "resolved"}
+
+def merge_feedback(existing: List[AgentFeedback] | None, new: List[AgentFeedback] | None) -> List[AgentFeedback]:
+    """
+    Reducer for the `feedback` channel, windowed by iteration.
+    Only feedback from the most recent iteration is kept, so earlier rounds
+    do not accumulate and get re-sent to the Improvement agent.
+    """
+    merged = list(existing or []) + list(new or [])
+    if not merged:
+        return merged
+    latest = max(f.iteration for f in merged)
+    return [f for f in merged if f.iteration == latest]
+
+def merge_section_reviews(
+    existing: Dict[str, Dict[str, AgentFeedback]] | None,
+    new: Dict[str, Dict[str, AgentFeedback]] | None
+) -> Dict[str, Dict[str, AgentFeedback]]:
+    """
+    Reducer for the `section_reviews` channel.
+    Each reviewer replaces only its own entry, so the parallel reviewers can
+    update the channel in the same step.
+    """
+    return {**(existing or {}), **(new or {})}
+
+def _normalise(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def compact_feedback(feedback: List[AgentFeedback], max_issues_per_agent: int | None = None) -> List[dict[str, Any]]:
+    """
+    Build the feedback summary sent to the Improvement agent.
+    Resolved and non-actionable issues are dropped, duplicates raised by more
+    than one agent are kept once, and each agent's issues are sorted by
+    severity and capped.
+    """
+    seen: set[str] = set()
+    summary = []
+    for f in feedback:
+        issues = []
+        for issue in f.issues:
+            severity = str(issue.get("severity", "medium")).lower()
+            if issue.get("resolved") or severity in NON_ACTIONABLE_SEVERITIES:
+                continue
+            key = _normalise(str(issue.get("description", "")))
+            if key and key in seen:
+                continue
+            seen.add(key)
+            issues.append(issue)
+        issues.sort(key=lambda i: SEVERITY_ORDER.get(str(i.get("severity", "medium")).lower(), 1))
+        if max_issues_per_agent is not None:
+            issues = issues[:max_issues_per_agent]
+        summary.append({"agent": f.agent_name, "issues": issues})
+    return summary
+
+def summarise_feedback(feedback: List[AgentFeedback]) -> List[dict[str, Any]]:
+    """Feedback summary for the Improvement agent, compacted if enabled in settings."""
+    if not settings.FEEDBACK_COMPACTION:
+        return [{"agent": f.agent_name, "issues": f.issues} for f in feedback]
+    return compact_feedback(feedback, settings.FEEDBACK_MAX_ISSUES_PER_AGENT)
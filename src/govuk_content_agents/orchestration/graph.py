@@ -1,5 +1,11 @@
 from typing import Dict, Any, List
-from langgraph.graph import StateGraph, END
+import functools
+import logging
+import time
+from langgraph.graph import StateGraph, START, END
+from .feedback import summarise_feedback
+from .map_reduce import review_chunks
+from .sections import combine_section_feedback
 from .state import AgentState
 from ..agents import (
     ContentReviewerAgent, 
@@ -8,7 +14,12 @@ from ..agents import (
     ImprovementAgent, 
     QualityJudgeAgent
 )
+from ..agents.base import BaseAgent
+from ..config import settings
 from ..storage.models import AgentFeedback
+from ..utils.text import Section, split_chunks
+
+logger = logging.getLogger(__name__)
 
 # Initialize agents
 content_agent = ContentReviewerAgent()
@@ -17,27 +28,78 @@ consistency_agent = ConsistencyAgent()
 improvement_agent = ImprovementAgent()
 judge_agent = QualityJudgeAgent()
 
+def timed(node_name: str, iteration_offset: int = 0):
+    """
+    Record the node's wall-clock duration in the state's `timings` channel,
+    under the iteration the node ran for (`state["iteration"]` plus
+    `iteration_offset`).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(state: AgentState):
+            iteration = state["iteration"] + iteration_offset
+            start = time.perf_counter()
+            update = await func(state)
+            seconds = time.perf_counter() - start
+            logger.info(f"Node {node_name} finished in {seconds:.2f}s (iteration {iteration})")
+            return {**update, "timings": [{"node": node_name, "iteration": iteration, "seconds": seconds}]}
+        return wrapper
+    return decorator
+
+async def dispatch_reviews(state: AgentState):
+    """Fan-out point: the three reviewers run concurrently from here."""
+    return {}
+
+async def review_sections(node: str, agent: BaseAgent, state: AgentState) -> Dict[str, Any]:
+    """
+    Map-reduce review over part/token-budget chunks, re-reviewing only the
+    chunks that changed since this reviewer last saw them. Feedback for
+    unchanged chunks (matched by content hash) is carried forward.
+    """
+    content = state["current_content"]
+    if settings.INCREMENTAL_REVIEW:
+        sections = split_chunks(content, settings.REVIEW_CHUNK_TOKENS)
+    else:
+        sections = [Section(title="Document", text=content, hash="")]
+
+    previous = state.get("section_reviews", {}).get(node, {}) if settings.INCREMENTAL_REVIEW else {}
+    changed = list({s.hash: s for s in sections if s.hash not in previous}.values())
+
+    results = await review_chunks(agent, changed, with_context=len(sections) > 1)
+    if len(sections) > 1:
+        logger.info(f"Node {node}: reviewed {len(changed)} of {len(sections)} sections")
+
+    reviews = {s.hash: previous[s.hash] for s in sections if s.hash in previous}
+    reviews.update({s.hash: feedback for s, feedback in zip(changed, results)})
+
+    feedback = combine_section_feedback(sections, reviews)
+    return {
+        "feedback": [feedback.model_copy(update={"iteration": state["iteration"]})],
+        "section_reviews": {node: reviews},
+        "telemetry": [f.telemetry for f in results if f.telemetry is not None]
+    }
+
+@timed("review_content")
 async def review_content(state: AgentState):
     """Run Content Reviewer."""
-    feedback = await content_agent.execute(state["current_content"])
-    return {"feedback": [feedback]}
+    return await review_sections("review_content", content_agent, state)
 
+@timed("review_style")
 async def review_style(state: AgentState):
     """Run Style Check."""
-    feedback = await style_agent.execute(state["current_content"])
-    return {"feedback": [feedback]}
+    return await review_sections("review_style", style_agent, state)
 
+@timed("review_consistency")
 async def review_consistency(state: AgentState):
     """Run Consistency Check."""
-    feedback = await consistency_agent.execute(state["current_content"])
-    return {"feedback": [feedback]}
+    return await review_sections("review_consistency", consistency_agent, state)
 
+@timed("improve")
 async def improve_content(state: AgentState):
     """Generate improved content based on feedback."""
-    feedback_summary = [
-        {"agent": f.agent_name, "issues": f.issues} 
-        for f in state["feedback"]
-    ]
+    feedback_summary = summarise_feedback(
+        [f for f in state["feedback"] if f.iteration == state["iteration"]]
+    )
     
     result = await improvement_agent.execute(
         state["current_content"], 
@@ -49,16 +111,19 @@ async def improve_content(state: AgentState):
     return {
         "current_content": new_content,
         "iteration": state["iteration"] + 1,
-        "feedback": [] 
+        "telemetry": [result.telemetry] if result.telemetry else []
     }
 
+# improve has already advanced the iteration; judge scores the one it finished
+@timed("judge", iteration_offset=-1)
 async def judge_content(state: AgentState):
     """Score the content."""
     result = await judge_agent.execute(state["current_content"])
     decision = "pass" if (result.score or 0) >= 80 else "fail"
     return {
         "final_score": result.score, 
-        "final_decision": decision
+        "final_decision": decision,
+        "telemetry": [result.telemetry] if result.telemetry else []
     }
 
 def router(state: AgentState):
@@ -71,7 +136,10 @@ def router(state: AgentState):
 # Build Graph
 builder = StateGraph(AgentState)
 
+REVIEW_NODES = ["review_content", "review_style", "review_consistency"]
+
 # Nodes
+builder.add_node("dispatch_reviews", dispatch_reviews)
 builder.add_node("review_content", review_content)
 builder.add_node("review_style", review_style)
 builder.add_node("review_consistency", review_consistency)
@@ -79,15 +147,11 @@ builder.add_node("improve", improve_content)
 builder.add_node("judge", judge_content)
 
 # Flow
-# Start -> Parallel Reviews
-builder.set_entry_point("review_content")
-builder.add_edge("review_content", "improve")
-
-# Sequential execution flow
-builder.set_entry_point("review_content")
-builder.add_edge("review_content", "review_style")
-builder.add_edge("review_style", "review_consistency")
-builder.add_edge("review_consistency", "improve")
+# Start -> Parallel Reviews (fan-out) -> Improve (fan-in, waits for all three)
+builder.add_edge(START, "dispatch_reviews")
+for node in REVIEW_NODES:
+    builder.add_edge("dispatch_reviews", node)
+builder.add_edge(REVIEW_NODES, "improve")
 builder.add_edge("improve", "judge")
 
 # Conditional Edge
@@ -95,7 +159,7 @@ builder.add_conditional_edges(
     "judge",
     router,
     {
-        "continue_loop": "review_content",
+        "continue_loop": "dispatch_reviews",
         "stop": END
     }
 )
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Dict, List
+from .sections import combine_section_feedback
+from ..agents.base import BaseAgent
+from ..config import settings
+from ..storage.models import AgentFeedback
+from ..utils.text import Section, split_chunks
+
+async def review_chunks(
+    agent: BaseAgent,
+    chunks: List[Section],
+    with_context: bool | None = None,
+    max_parallel: int | None = None
+) -> List[AgentFeedback]:
+    """
+    Map step: review each chunk, with at most `max_parallel` chunks in flight.
+    Chunks carry their section title as context unless the document is a single
+    chunk, which is reviewed exactly like a whole-document review.
+    """
+    if with_context is None:
+        with_context = len(chunks) > 1
+    semaphore = asyncio.Semaphore(max_parallel or settings.REVIEW_MAX_PARALLEL_CHUNKS)
+
+    async def review(chunk: Section) -> AgentFeedback:
+        async with semaphore:
+            if not with_context:
+                return await agent.execute(chunk.text)
+            return await agent.execute(chunk.text, context={"section": chunk.title})
+
+    return await asyncio.gather(*(review(c) for c in chunks))
+
+async def map_reduce_review(agent: BaseAgent, content: str, max_tokens: int | None = None) -> AgentFeedback:
+    """
+    Review long content by splitting it into part/token-budget chunks, reviewing
+    them concurrently and merging the results into one deduplicated AgentFeedback.
+    """
+    chunks = split_chunks(content, max_tokens or settings.REVIEW_CHUNK_TOKENS)
+    unique: Dict[str, Section] = {c.hash: c for c in chunks}
+    results = await review_chunks(agent, list(unique.values()), with_context=len(chunks) > 1)
+    reviews = dict(zip(unique.keys(), results))
+    return combine_section_feedback(chunks, reviews)
@@ -0,0 +1,42 @@
+from typing import Dict, List
+from ..storage.models import AgentFeedback
+from ..utils.text import Section
+
+def combine_section_feedback(sections: List[Section], reviews: Dict[str, AgentFeedback]) -> AgentFeedback:
+    """
+    Merge per-section (or per-chunk) feedback into one document-level result.
+    Issues record the section and 1-based chunk they came from; an issue raised
+    in several chunks is kept once with every chunk listed. The score is a
+    length-weighted average.
+    """
+    if len(sections) == 1:
+        return reviews[sections[0].hash]
+
+    issues: List[dict] = []
+    by_description: Dict[str, dict] = {}
+    summaries = []
+    weighted_score = 0.0
+    total_weight = 0
+    for index, section in enumerate(sections, start=1):
+        feedback = reviews[section.hash]
+        summaries.append(f"{section.title}: {feedback.summary}")
+        for issue in feedback.issues:
+            key = " ".join(str(issue.get("description", "")).lower().split())
+            duplicate = by_description.get(key) if key else None
+            if duplicate is not None:
+                duplicate["chunks"].append(index)
+                continue
+            tagged = {**issue, "section": section.title, "chunk": index, "chunks": [index]}
+            by_description[key] = tagged
+            issues.append(tagged)
+        if feedback.score is not None:
+            weighted_score += feedback.score * len(section.text)
+            total_weight += len(section.text)
+
+    first = reviews[sections[0].hash]
+    return AgentFeedback(
+        agent_name=first.agent_name,
+        summary="\n".join(summaries),
+        issues=issues,
+        score=round(weighted_score / total_weight) if total_weight else None
+    )
@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional, TypedDict, Annotated
 import operator
-from ..storage.models import AgentFeedback
+from .feedback import merge_feedback, merge_section_reviews
+from ..storage.models import AgentFeedback, AgentTelemetry
 
 class AgentState(TypedDict):
     """
@@ -9,9 +10,13 @@ class AgentState(TypedDict):
     input_content: str
     metadata: Dict[str, Any]
     
-    # Feedback from parallel review node
-    # Annotated[list, operator.add] means new feedback is appended to the list
-    feedback: Annotated[List[AgentFeedback], operator.add]
+    # Feedback from the parallel review nodes
+    # merge_feedback appends new feedback but keeps only the latest iteration's entries
+    feedback: Annotated[List[AgentFeedback], merge_feedback]
+    
+    # Per-reviewer section feedback keyed by section hash, carried across iterations
+    # so unchanged sections are not reviewed again
+    section_reviews: Annotated[Dict[str, Dict[str, AgentFeedback]], merge_section_reviews]
     
     # Current working version of content (starts as input, then rewritten)
     current_content: str
@@ -23,3 +28,9 @@ class AgentState(TypedDict):
     # Loop control
     iteration: int
     max_iterations: int
+
+    # Wall-clock duration of each node run: {"node", "iteration", "seconds"}
+    timings: Annotated[List[Dict[str, Any]], operator.add]
+
+    # Per-execute telemetry from every agent call in the run (see utils.telemetry)
+    telemetry: Annotated[List[AgentTelemetry], operator.add]
@@ -1,3 +1,3 @@
 from .mongodb import mongo_client, MongoDBClient
 from .vectors import vector_client, VectorDBClient
-from .models import ReviewSession, ContentEmbedding, AgentFeedback
+from .models import ReviewSession, ContentEmbedding, AgentFeedback, AgentTelemetry
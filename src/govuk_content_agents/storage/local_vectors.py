@@ -0,0 +1,795 @@
+"""
+In-process vector store for local development, CI and small deployments.
+
+Embeddings live in a memory-mapped float32 or float16 matrix (`embeddings.bin`),
+one L2-normalised row per document, and everything else in a SQLite sidecar
+(`documents.sqlite3`). Search is a blocked matrix-vector product with top-k
+selection, optionally restricted to the nearest clusters of an IVF index.
+Rows are copy-on-write: replacing a document appends a new row and retires
+the old one, so a search keeps a consistent view while writes go on. Retired
+rows are dropped when the store is compacted. Passages are kept in a second
+store of the same kind (`<table>_passages`).
+`LocalVectorClient` has the same interface as `VectorDBClient`; select it with
+VECTOR_BACKEND=local.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..config import settings
+from .models import DEFAULT_EMBEDDING_VERSION, ContentEmbedding, EmbeddingVersion, PassageEmbedding, content_hash
+from .search_cache import cached_search, search_cache
+from .vectors import AsyncVectorMixin, HYBRID_CANDIDATE_FACTOR, RRF_K
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per matrix-vector product; bounds the float32 copy made for float16 stores
+BLOCK_ROWS = 65_536
+# Rows sampled to train IVF centroids
+KMEANS_SAMPLE = 50_000
+KMEANS_ITERATIONS = 10
+# Retired rows tolerated before a store is compacted (both limits must be passed)
+COMPACT_MIN_DEAD_ROWS = 1_024
+COMPACT_DEAD_RATIO = 0.25
+
+def _normalise(vector: Iterable[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm > 0 else array
+
+def _contains(value: Any, expected: Any) -> bool:
+    """JSONB `@>` semantics: dicts match recursively, lists by inclusion, scalars by equality."""
+    if isinstance(expected, dict):
+        return isinstance(value, dict) and all(k in value and _contains(value[k], v) for k, v in expected.items())
+    if isinstance(expected, list):
+        return isinstance(value, list) and all(any(_contains(item, e) for item in value) for e in expected)
+    return value == expected
+
+def _tokens(text: str) -> frozenset[str]:
+    return frozenset(re.findall(r"\w+", text.lower()))
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` highest scores, best first (ties broken by position)."""
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+def _score_rows(matrix: np.ndarray, query: np.ndarray, rows: Optional[np.ndarray], count: int) -> np.ndarray:
+    """Cosine similarity of `query` with each row of `matrix` (all rows up to `count`, or `rows`)."""
+    total = count if rows is None else len(rows)
+    scores = np.empty(total, dtype=np.float32)
+    for start in range(0, total, BLOCK_ROWS):
+        end = min(start + BLOCK_ROWS, total)
+        block = matrix[start:end] if rows is None else matrix[rows[start:end]]
+        scores[start:end] = block.astype(np.float32, copy=False) @ query
+    return scores
+
+def _result(doc_id: str, doc: Dict[str, Any], similarity: float, max_content_chars: Optional[int]) -> Dict[str, Any]:
+    content = doc["content"]
+    if max_content_chars and content:
+        content = content[:max_content_chars]
+    return {"id": doc_id, "content": content, "metadata": doc["metadata"], "similarity": similarity}
+
+class LocalVectorClient(AsyncVectorMixin):
+    """Memory-mapped NumPy vector store with a SQLite metadata sidecar."""
+
+    def __init__(
+        self,
+        table: str = "content_embeddings",
+        path: Optional[str] = None,
+        dtype: Optional[str] = None,
+        max_connections: int = 4,
+        version: Optional[EmbeddingVersion] = None
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.table = table
+        # Embedding model and size of every row in this store (recorded in meta.json)
+        self.version = version or EmbeddingVersion.current()
+        self.root = path or settings.VECTOR_LOCAL_PATH
+        self.path = os.path.join(self.root, table)
+        self.dtype = np.dtype(dtype or settings.VECTOR_LOCAL_DTYPE)
+        # Worker threads for the async API (NumPy releases the GIL while scoring)
+        self.max_connections = max_connections
+        self.dimensions: Optional[int] = None
+
+        self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._matrix: Optional[np.memmap] = None
+        self._capacity = 0
+
+        # Row-aligned document state. Rows below len(self._ids) are never edited in place:
+        # replaced documents get a new row and `_live` (sized to capacity) is swapped, not edited
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._docs: List[Dict[str, Any]] = []
+        self._tokens: List[frozenset[str]] = []
+        self._live = np.zeros(0, dtype=bool)
+        self._dead = 0
+
+        # IVF index: unit-length centroids and each row's cluster
+        self._centroids: Optional[np.ndarray] = None
+        self._clusters: Optional[np.ndarray] = None
+
+        # Passage store, opened on first use
+        self._passages: Optional["LocalVectorClient"] = None
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def connect(self):
+        """Open (or create) the store and load the sidecar into memory."""
+        with self._lock:
+            if self._db is not None:
+                return
+            os.makedirs(self.path, exist_ok=True)
+            self._db = sqlite3.connect(self._file("documents.sqlite3"), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    row INTEGER PRIMARY KEY,
+                    id TEXT UNIQUE NOT NULL,
+                    content TEXT,
+                    content_hash TEXT,
+                    metadata TEXT,
+                    created_at TEXT,
+                    cluster INTEGER
+                )
+                """
+            )
+            self._db.commit()
+
+            if os.path.exists(self._file("meta.json")):
+                with open(self._file("meta.json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+                # Stores written before versioning hold the original model's embeddings
+                stored = meta.get("embedding_model", DEFAULT_EMBEDDING_VERSION.key)
+                if stored != self.version.key:
+                    raise ValueError(f"{self.path} holds {stored} embeddings, not {self.version.key}")
+                self.dimensions = meta["dimensions"]
+                self.dtype = np.dtype(meta["dtype"])
+                self._capacity = meta["capacity"]
+                self._matrix = np.memmap(
+                    self._file("embeddings.bin"), dtype=self.dtype, mode="r+",
+                    shape=(self._capacity, self.dimensions)
+                )
+                self._live = np.zeros(self._capacity, dtype=bool)
+
+            clusters = []
+            for row, doc_id, content, digest, metadata, created_at, cluster in self._db.execute(
+                "SELECT row, id, content, content_hash, metadata, created_at, cluster FROM documents ORDER BY row"
+            ):
+                # Rows retired before the last compaction have no sidecar entry
+                while len(self._ids) < row:
+                    self._ids.append("")
+                    self._docs.append({"content": "", "content_hash": None, "metadata": {}, "created_at": None})
+                    self._tokens.append(frozenset())
+                    clusters.append(-1)
+                    self._dead += 1
+                self._append_doc(doc_id, {
+                    "content": content,
+                    "content_hash": digest,
+                    "metadata": json.loads(metadata) if metadata else {},
+                    "created_at": datetime.fromisoformat(created_at) if created_at else None
+                })
+                clusters.append(-1 if cluster is None else cluster)
+
+            if os.path.exists(self._file("ivf.npy")):
+                self._centroids = np.load(self._file("ivf.npy"))
+                self._clusters = np.array(clusters, dtype=np.int32)
+            logger.info(f"Opened local vector store {self.path} ({len(self._ids)} rows, {self.dtype})")
+
+    def close(self):
+        """Flush the matrix and close the sidecar."""
+        with self._lock:
+            self._shutdown_executor()
+            if self._passages is not None:
+                self._passages.close()
+                self._passages = None
+            if self._matrix is not None:
+                self._matrix.flush()
+                self._matrix = None
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            self._ids, self._rows, self._docs, self._tokens = [], {}, [], []
+            self._live, self._dead = np.zeros(0, dtype=bool), 0
+            self._centroids = self._clusters = None
+
+    def _append_doc(self, doc_id: str, doc: Dict[str, Any]):
+        row = len(self._ids)
+        self._rows[doc_id] = row
+        self._ids.append(doc_id)
+        self._docs.append(doc)
+        self._tokens.append(_tokens(doc["content"] or ""))
+        # Beyond every search's row count, so this edit is not visible to them
+        self._live[row] = True
+
+    def _live_rows(self, count: Optional[int] = None) -> np.ndarray:
+        return np.flatnonzero(self._live[:len(self._ids) if count is None else count])
+
+    def _retire(self, rows: List[int]):
+        """Mark rows dead with a new mask, so searches holding the old one are unaffected."""
+        if not rows:
+            return
+        live = self._live.copy()
+        live[rows] = False
+        self._live = live
+        self._dead += len(rows)
+
+    def _delete_rows(self, rows: List[int]):
+        """Retire rows and remove their documents from the sidecar."""
+        ids = [self._ids[row] for row in rows]
+        self._retire(rows)
+        for doc_id in ids:
+            self._rows.pop(doc_id, None)
+        self._db.executemany("DELETE FROM documents WHERE id = ?", [(doc_id,) for doc_id in ids])
+        self._db.commit()
+        self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        if self._dead >= COMPACT_MIN_DEAD_ROWS and self._dead >= COMPACT_DEAD_RATIO * len(self._ids):
+            self._compact()
+
+    def _write_meta(self):
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "dimensions": self.dimensions,
+                "dtype": self.dtype.name,
+                "capacity": self._capacity,
+                "embedding_model": self.version.key
+            }, f)
+
+    def _ensure_capacity(self, rows: int):
+        """Grow the memory-mapped file (doubling) so it holds at least `rows` rows."""
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, self._capacity * 2, 1024)
+        if self._matrix is not None:
+            self._matrix.flush()
+        with open(self._file("embeddings.bin"), "ab") as f:
+            f.truncate(capacity * self.dimensions * self.dtype.itemsize)
+        self._matrix = np.memmap(
+            self._file("embeddings.bin"), dtype=self.dtype, mode="r+", shape=(capacity, self.dimensions)
+        )
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        self._live = live
+        self._capacity = capacity
+        self._write_meta()
+
+    def save_embedding(self, item: ContentEmbedding):
+        """Save an embedding."""
+        self.save_embeddings([item])
+
+    def save_embeddings(self, items: Iterable[ContentEmbedding]) -> int:
+        """Upsert many embeddings; duplicate ids keep the last item."""
+        items = list({item.id: item for item in items}.values())
+        if not items:
+            return 0
+        dimensions = self.dimensions or len(items[0].embedding)
+        for item in items:
+            if len(item.embedding) != dimensions:
+                raise ValueError(f"Expected {dimensions} dimensions, got {len(item.embedding)}")
+        records = [
+            {
+                "id": item.id,
+                "content": item.content,
+                "content_hash": item.content_hash,
+                "metadata": item.metadata,
+                "created_at": item.created_at
+            }
+            for item in items
+        ]
+        return self._upsert(records, np.array([item.embedding for item in items], dtype=np.float32))
+
+    def _upsert(self, records: List[Dict[str, Any]], embeddings: np.ndarray) -> int:
+        """Write rows (records with id/content/content_hash/metadata/created_at) and their embeddings."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.connect()
+        with self._lock:
+            if self.dimensions is None:
+                self.dimensions = embeddings.shape[1]
+            if embeddings.shape[1] != self.dimensions:
+                raise ValueError(f"Expected {self.dimensions} dimensions, got {embeddings.shape[1]}")
+            # Duplicate ids keep the last record
+            order = sorted({record["id"]: i for i, record in enumerate(records)}.values())
+            records, embeddings = [records[i] for i in order], embeddings[order]
+            self._ensure_capacity(len(self._ids) + len(records))
+
+            # Every record gets a new row and replaced rows are retired, so rows a search
+            # may be scoring are never overwritten
+            self._retire([self._rows[record["id"]] for record in records if record["id"] in self._rows])
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            vectors = np.divide(embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
+            rows = []
+            sql_records = []
+            for record in records:
+                doc = {
+                    "content": record["content"],
+                    "content_hash": record.get("content_hash") or content_hash(record["content"] or ""),
+                    "metadata": record.get("metadata") or {},
+                    "created_at": record.get("created_at")
+                }
+                self._append_doc(record["id"], doc)
+                row = len(self._ids) - 1
+                rows.append(row)
+                sql_records.append([
+                    row, record["id"], record["content"], doc["content_hash"], json.dumps(doc["metadata"]),
+                    doc["created_at"].isoformat() if doc["created_at"] else None, None
+                ])
+
+            rows = np.array(rows, dtype=np.int64)
+            self._matrix[rows] = vectors.astype(self.dtype)
+            if self._centroids is not None:
+                clusters = np.argmax(vectors @ self._centroids.T, axis=1)
+                if rows.max() >= len(self._clusters):
+                    self._clusters = np.resize(self._clusters, int(rows.max()) + 1)
+                self._clusters[rows] = clusters
+                for record, cluster in zip(sql_records, clusters):
+                    record[-1] = int(cluster)
+
+            self._matrix.flush()
+            self._db.executemany(
+                """
+                INSERT INTO documents (row, id, content, content_hash, metadata, created_at, cluster)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    row = excluded.row,
+                    content = excluded.content,
+                    content_hash = excluded.content_hash,
+                    metadata = excluded.metadata,
+                    created_at = excluded.created_at,
+                    cluster = excluded.cluster
+                """,
+                sql_records
+            )
+            self._db.commit()
+            self._compact_if_needed()
+        search_cache.invalidate(self.table)
+        return len(records)
+
+    def _filter_rows(
+        self,
+        count: int,
+        filters: Optional[Dict[str, Any]],
+        created_after: Optional[datetime],
+        created_before: Optional[datetime]
+    ) -> Optional[np.ndarray]:
+        """Live row numbers matching the metadata/date filters, or None when every row qualifies."""
+        unfiltered = not (filters or created_after or created_before)
+        if unfiltered and self._dead == 0:
+            return None
+        live = self._live_rows(count)
+        if unfiltered:
+            return live
+
+        def matches(doc: Dict[str, Any]) -> bool:
+            created = doc["created_at"]
+            if created_after and (created is None or created < created_after):
+                return False
+            if created_before and (created is None or created >= created_before):
+                return False
+            return not filters or _contains(doc["metadata"], filters)
+
+        return np.fromiter((i for i in live if matches(self._docs[i])), dtype=np.int64)
+
+    @cached_search
+    def search_similar(
+        self,
+        embedding: List[float],
+        limit: int = 5,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        min_similarity: Optional[float] = None,
+        query_text: Optional[str] = None,
+        max_content_chars: Optional[int] = None,
+        storage: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for similar content; same arguments and result shape as
+        `VectorDBClient.search_similar`. `probes` limits the search to the
+        nearest IVF clusters when an index has been built. `ef_search` and
+        `storage` are ignored (precision is set by VECTOR_LOCAL_DTYPE).
+        """
+        self.connect()
+        with self._lock:
+            count = len(self._ids)
+            if count == 0:
+                return []
+            rows = self._filter_rows(count, filters, created_after, created_before)
+            centroids, clusters = self._centroids, self._clusters
+            # Scoring runs outside the lock. Writes only append rows past `count`, and compaction
+            # swaps in new objects, so the first `count` rows of these stay as they are now
+            matrix, ids, docs, tokens = self._matrix, self._ids, self._docs, self._tokens
+
+        query = _normalise(embedding)
+        vector_rows = rows
+        if centroids is not None and clusters is not None:
+            nprobe = probes or settings.VECTOR_IVFFLAT_PROBES or 1
+            nearest = top_k(centroids @ query, nprobe)
+            in_clusters = np.flatnonzero(np.isin(clusters[:count], nearest))
+            vector_rows = in_clusters if rows is None else np.intersect1d(rows, in_clusters)
+
+        scores = _score_rows(matrix, query, vector_rows, count)
+        if min_similarity is not None:
+            keep = scores >= min_similarity
+            scores = scores[keep]
+            vector_rows = np.flatnonzero(keep) if vector_rows is None else vector_rows[keep]
+
+        def row_of(index: int) -> int:
+            return int(index if vector_rows is None else vector_rows[index])
+
+        if not query_text:
+            hits = [(row_of(i), float(scores[i])) for i in top_k(scores, limit)]
+            return [_result(ids[row], docs[row], similarity, max_content_chars) for row, similarity in hits]
+
+        # Hybrid: reciprocal rank fusion of the vector and keyword rankings
+        candidates = max(limit * HYBRID_CANDIDATE_FACTOR, 20)
+        fused: Dict[int, float] = {}
+        for rank, i in enumerate(top_k(scores, candidates), start=1):
+            fused[row_of(i)] = 1.0 / (RRF_K + rank)
+
+        terms = _tokens(query_text)
+        text_rows = range(count) if rows is None else rows.tolist()
+        text_scores = [(len(terms & tokens[row]), row) for row in text_rows]
+        text_hits = sorted((hit for hit in text_scores if hit[0] > 0), key=lambda hit: (-hit[0], hit[1]))
+        for rank, (_, row) in enumerate(text_hits[:candidates], start=1):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (RRF_K + rank)
+
+        best = sorted(fused.items(), key=lambda entry: (-entry[1], entry[0]))[:limit]
+        similarities = _score_rows(matrix, query, np.array([row for row, _ in best], dtype=np.int64), count)
+        return [
+            {**_result(ids[row], docs[row], float(similarity), max_content_chars), "score": score}
+            for (row, score), similarity in zip(best, similarities)
+        ]
+
+    def get_content_hashes(self, ids: List[str]) -> Dict[str, Optional[str]]:
+        """Stored content hash for each of `ids` that exists."""
+        self.connect()
+        with self._lock:
+            return {i: self._docs[self._rows[i]]["content_hash"] for i in ids if i in self._rows}
+
+    def find_embeddings_by_hash(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """Existing embedding for each content hash already stored."""
+        self.connect()
+        wanted = set(hashes)
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for row in self._live_rows():
+                digest = self._docs[row]["content_hash"]
+                if digest in wanted and digest not in found:
+                    found[digest] = self._matrix[row].astype(np.float32).tolist()
+        return found
+
+    def update_metadata(self, doc_id: str, metadata: Dict[str, Any]):
+        """Replace a row's metadata without touching its embedding."""
+        self.connect()
+        with self._lock:
+            row = self._rows.get(doc_id)
+            if row is None:
+                return
+            # The embedding is unchanged, so the row keeps its place and only its doc is swapped
+            self._docs[row] = {**self._docs[row], "metadata": metadata or {}}
+            self._db.execute("UPDATE documents SET metadata = ? WHERE id = ?", (json.dumps(metadata or {}), doc_id))
+            self._db.commit()
+        search_cache.invalidate(self.table)
+
+    def update_content_hashes(self, hashes: Dict[str, str]):
+        """Set the content hash of rows ({id: hash}); rows written here always have one."""
+        self.connect()
+        with self._lock:
+            for doc_id, digest in hashes.items():
+                row = self._rows.get(doc_id)
+                if row is not None:
+                    self._docs[row] = {**self._docs[row], "content_hash": digest}
+            self._db.executemany(
+                "UPDATE documents SET content_hash = ? WHERE id = ?", [(digest, doc_id) for doc_id, digest in hashes.items()]
+            )
+            self._db.commit()
+
+    def delete_documents(self, ids: List[str]) -> int:
+        """Delete documents and their passages. Returns the number deleted."""
+        store = self._passage_store()
+        doomed = set(ids)
+        with self._lock:
+            rows = [self._rows[doc_id] for doc_id in doomed if doc_id in self._rows]
+            self._delete_rows(rows)
+        with store._lock:
+            store._delete_rows([
+                int(row) for row in store._live_rows() if store._docs[row]["metadata"].get("parent_id") in doomed
+            ])
+        search_cache.invalidate(self.table)
+        return len(rows)
+
+    def _passage_store(self) -> "LocalVectorClient":
+        """
+        Passages live in their own store, keyed to their parent by metadata
+        `parent_id`; replaced passages are retired like replaced documents.
+        """
+        self.connect()
+        with self._lock:
+            if self._passages is None:
+                self._passages = LocalVectorClient(
+                    table=f"{self.table}_passages", path=self.root, dtype=self.dtype.name, version=self.version
+                )
+                self._passages.connect()
+            return self._passages
+
+    def save_passages(self, passages: Iterable[PassageEmbedding]) -> int:
+        """Replace the passages of every parent document in `passages`."""
+        passages = list({passage.id: passage for passage in passages}.values())
+        if not passages:
+            return 0
+        records = [passage.model_dump(exclude={"embedding"}) for passage in passages]
+        return self._save_passage_rows(records, np.array([p.embedding for p in passages], dtype=np.float32))
+
+    def _save_passage_rows(self, records: List[Dict[str, Any]], embeddings: np.ndarray, replace: bool = True) -> int:
+        store = self._passage_store()
+        parents = {record["parent_id"] for record in records}
+        current = {record["id"] for record in records}
+        with store._lock:
+            rows = [
+                {
+                    "id": record["id"],
+                    "content": record["content"],
+                    "metadata": {
+                        "parent_id": record["parent_id"],
+                        "position": record["position"],
+                        "title": record.get("title")
+                    }
+                }
+                for record in records
+            ]
+            if replace:
+                store._delete_rows([
+                    int(row) for row in store._live_rows()
+                    if store._docs[row]["metadata"].get("parent_id") in parents and store._ids[row] not in current
+                ])
+            store._upsert(rows, embeddings)
+        search_cache.invalidate(self.table)
+        return len(records)
+
+    def _compact(self):
+        """
+        Drop retired rows, renumbering the live ones from zero. The matrix is
+        rewritten to a new file and the row lists are replaced, so searches
+        that took the old ones keep a consistent view.
+        """
+        with self._lock:
+            keep = self._live_rows().tolist()
+            removed = len(self._ids) - len(keep)
+            capacity = max(len(keep), 1024)
+            staging = self._file("embeddings.bin.compact")
+            matrix = np.memmap(staging, dtype=self.dtype, mode="w+", shape=(capacity, self.dimensions))
+            for start in range(0, len(keep), BLOCK_ROWS):
+                block = keep[start:start + BLOCK_ROWS]
+                matrix[start:start + len(block)] = self._matrix[block]
+            matrix.flush()
+            del matrix
+
+            # Retired rows have no sidecar entry, and live rows only move down,
+            # so renumbering in ascending order never collides
+            self._db.executemany(
+                "UPDATE documents SET row = ? WHERE row = ?",
+                [(new, old) for new, old in enumerate(keep) if new != old]
+            )
+            self._db.commit()
+            os.replace(staging, self._file("embeddings.bin"))
+
+            self._ids = [self._ids[row] for row in keep]
+            self._docs = [self._docs[row] for row in keep]
+            self._tokens = [self._tokens[row] for row in keep]
+            self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+            self._live = np.zeros(capacity, dtype=bool)
+            self._live[:len(keep)] = True
+            self._dead = 0
+            if self._clusters is not None:
+                self._clusters = self._clusters[np.array(keep, dtype=np.int64)]
+            self._matrix = np.memmap(
+                self._file("embeddings.bin"), dtype=self.dtype, mode="r+", shape=(capacity, self.dimensions)
+            )
+            self._capacity = capacity
+            self._write_meta()
+        search_cache.invalidate(self.table)
+        logger.info(f"Compacted local vector store {self.path} ({removed} rows removed)")
+
+    def export_chunks(self, kind: str = "documents", chunk_rows: int = 10_000) -> Iterator[tuple[List[Dict[str, Any]], np.ndarray]]:
+        """Stream document or passage rows as (records, float32 embedding matrix) chunks."""
+        store = self if kind == "documents" else self._passage_store()
+        store.connect()
+        with store._lock:
+            # Rows are copy-on-write, so this view holds while the store is written to (e.g. by re-ingest)
+            ids, docs, matrix = store._ids, store._docs, store._matrix
+            live = store._live_rows()
+        for start in range(0, len(live), chunk_rows):
+            rows = live[start:start + chunk_rows]
+            if kind == "documents":
+                records = [
+                    {"id": ids[row], **{k: docs[row][k] for k in ("content", "content_hash", "metadata", "created_at")}}
+                    for row in rows
+                ]
+            else:
+                records = [
+                    {
+                        "id": ids[row],
+                        "parent_id": docs[row]["metadata"]["parent_id"],
+                        "position": docs[row]["metadata"]["position"],
+                        "title": docs[row]["metadata"].get("title"),
+                        "content": docs[row]["content"]
+                    }
+                    for row in rows
+                ]
+            yield records, np.asarray(matrix[rows], dtype=np.float32)
+
+    def bulk_load(self, kind: str, records: List[Dict[str, Any]], embeddings: np.ndarray) -> int:
+        """Upsert a chunk of document or passage rows straight into the matrix and sidecar."""
+        if not records:
+            return 0
+        if kind == "documents":
+            return self._upsert(records, embeddings)
+        # Passages of one parent can span chunks, so existing ones are overwritten by id, not replaced
+        return self._save_passage_rows(records, embeddings, replace=False)
+
+    @contextmanager
+    def bulk_loading(self) -> Iterator[None]:
+        """No-op: rows are assigned to existing IVF clusters as they load."""
+        yield
+
+    def ids_without_passages(self, ids: List[str]) -> List[str]:
+        """Stored documents among `ids` that have no passages yet."""
+        store = self._passage_store()
+        with store._lock:
+            indexed = {store._docs[row]["metadata"].get("parent_id") for row in store._live_rows()}
+        with self._lock:
+            return [doc_id for doc_id in ids if doc_id in self._rows and doc_id not in indexed]
+
+    @cached_search
+    def search_passages(
+        self,
+        embedding: List[float],
+        limit: int = 3,
+        passages_per_parent: int = 2,
+        filters: Optional[Dict[str, Any]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        min_similarity: Optional[float] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Passage search grouped by parent; same arguments and result shape as
+        `VectorDBClient.search_passages`. Passages are scanned exactly, so
+        `ef_search` and `probes` are ignored.
+        """
+        store = self._passage_store()
+        with self._lock:
+            allowed = self._filter_rows(len(self._ids), filters, created_after, created_before)
+            allowed_ids = None if allowed is None else {self._ids[row] for row in allowed}
+        with store._lock:
+            count = len(store._ids)
+            matrix, docs = store._matrix, store._docs
+            rows = np.fromiter(
+                (
+                    row for row in store._live_rows(count)
+                    if allowed_ids is None or docs[row]["metadata"].get("parent_id") in allowed_ids
+                ),
+                dtype=np.int64
+            )
+        if len(rows) == 0:
+            return []
+
+        scores = _score_rows(matrix, _normalise(embedding), rows, count)
+        if min_similarity is not None:
+            keep = scores >= min_similarity
+            scores, rows = scores[keep], rows[keep]
+
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for i in top_k(scores, limit * passages_per_parent * HYBRID_CANDIDATE_FACTOR):
+            doc = docs[int(rows[i])]
+            parent_id = doc["metadata"]["parent_id"]
+            group = groups.get(parent_id)
+            if group is None:
+                if len(groups) == limit:
+                    continue
+                group = groups[parent_id] = []
+            if len(group) < passages_per_parent:
+                group.append({
+                    "position": doc["metadata"].get("position"),
+                    "title": doc["metadata"].get("title"),
+                    "content": doc["content"],
+                    "similarity": float(scores[i])
+                })
+
+        with self._lock:
+            return [
+                {
+                    "id": parent_id,
+                    "metadata": self._docs[self._rows[parent_id]]["metadata"] if parent_id in self._rows else {},
+                    "similarity": hits[0]["similarity"],
+                    "passages": hits
+                }
+                for parent_id, hits in groups.items()
+            ]
+
+    def create_index(
+        self,
+        index_type: Optional[str] = None,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        lists: Optional[int] = None,
+        rebuild: bool = False,
+        concurrently: bool = False,
+        storage: Optional[str] = None
+    ):
+        """
+        Build an IVF index with spherical k-means over (a sample of) the rows.
+        HNSW is not available locally, so every index type builds IVF with `lists` clusters.
+        """
+        if index_type == "hnsw":
+            logger.warning("Local vector backend has no HNSW; building an IVF index instead")
+        self.connect()
+        with self._lock:
+            if self._centroids is not None and not rebuild:
+                return
+            count = len(self._ids)
+            live = self._live_rows(count)
+            if len(live) == 0:
+                logger.warning("Not building an IVF index over an empty store")
+                return
+            nlist = min(lists or settings.VECTOR_IVFFLAT_LISTS, len(live))
+            rng = np.random.default_rng(0)
+            sample_rows = np.sort(rng.choice(live, size=min(len(live), KMEANS_SAMPLE), replace=False))
+            sample = np.asarray(self._matrix[sample_rows], dtype=np.float32)
+
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+            for _ in range(KMEANS_ITERATIONS):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for cluster in range(nlist):
+                    members = sample[assignment == cluster]
+                    if len(members):
+                        centroids[cluster] = _normalise(members.sum(axis=0))
+
+            clusters = np.empty(count, dtype=np.int32)
+            for start in range(0, count, BLOCK_ROWS):
+                end = min(start + BLOCK_ROWS, count)
+                block = np.asarray(self._matrix[start:end], dtype=np.float32)
+                clusters[start:end] = np.argmax(block @ centroids.T, axis=1)
+
+            np.save(self._file("ivf.npy"), centroids)
+            self._db.executemany(
+                "UPDATE documents SET cluster = ? WHERE row = ?",
+                [(int(c), row) for row, c in enumerate(clusters)]
+            )
+            self._db.commit()
+            self._centroids, self._clusters = centroids, clusters
+            logger.info(f"Built local IVF index for {self.table} ({nlist} lists over {count} rows)")
+
+    def drop_index(self, storage: Optional[str] = None, concurrently: bool = False):
+        """Drop the IVF index, falling back to exact scans."""
+        self.connect()
+        with self._lock:
+            if os.path.exists(self._file("ivf.npy")):
+                os.remove(self._file("ivf.npy"))
+            self._db.execute("UPDATE documents SET cluster = NULL")
+            self._db.commit()
+            self._centroids = self._clusters = None
@@ -1,11 +1,71 @@
+import hashlib
+import re
 from datetime import datetime
-from typing import Any
+from typing import Any, NamedTuple
 from pydantic import BaseModel, Field
-from uuid import uuid4
+from uuid import NAMESPACE_URL, uuid4, uuid5
+
+from ..config import settings
 
 def generate_uuid() -> str:
     return str(uuid4())
 
+def content_hash(text: str) -> str:
+    """SHA-256 of the text (surrounding whitespace ignored), used to detect unchanged content."""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+def document_id(key: str) -> str:
+    """Deterministic UUID for a logical document key, so re-saving updates the same row."""
+    return str(uuid5(NAMESPACE_URL, f"content-embedding:{key}"))
+
+def passage_id(parent_id: str, position: int) -> str:
+    """Deterministic UUID for the passage at `position` of a parent document."""
+    return str(uuid5(NAMESPACE_URL, f"content-passage:{parent_id}:{position}"))
+
+class EmbeddingVersion(NamedTuple):
+    """An embedding model and output size. Each version is stored in its own table."""
+    model: str
+    dimensions: int
+
+    @classmethod
+    def current(cls) -> "EmbeddingVersion":
+        """The version pinned by EMBEDDING_MODEL / EMBEDDING_DIMENSIONS, used for queries and writes."""
+        return cls(settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSIONS)
+
+    @property
+    def key(self) -> str:
+        return f"{self.model}@{self.dimensions}"
+
+    def table(self, base: str) -> str:
+        """Table holding this version: `base` for the original model, else e.g. `<base>_3_large_3072`."""
+        if self == DEFAULT_EMBEDDING_VERSION:
+            return base
+        slug = re.sub(r"[^a-z0-9]+", "_", self.model.lower().removeprefix("text-embedding-")).strip("_")
+        return f"{base}_{slug}_{self.dimensions}"
+
+    def request_options(self) -> dict[str, Any]:
+        """Extra `embeddings.create` arguments: text-embedding-3 models take `dimensions`."""
+        return {"dimensions": self.dimensions} if self.model.startswith("text-embedding-3") else {}
+
+DEFAULT_EMBEDDING_VERSION = EmbeddingVersion("text-embedding-3-small", 1536)
+
+class AgentTelemetry(BaseModel):
+    """Timing and token usage for one agent execution."""
+    agent_name: str
+    provider: str
+    model: str
+    queue_wait_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+    provider_latency_seconds: float = 0.0
+    total_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    retries: int = 0
+    parse_failures: int = 0
+    cache_hit: bool = False
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+
 class AgentFeedback(BaseModel):
     """Feedback from a single agent."""
     agent_name: str
@@ -13,6 +73,8 @@ class AgentFeedback(BaseModel):
     issues: list[dict[str, Any]] = []
     score: int | None = None
     rewritten_content: str | None = None
+    iteration: int = 0
+    telemetry: AgentTelemetry | None = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class HumanAction(BaseModel):
@@ -27,7 +89,13 @@ class ReviewSession(BaseModel):
     id: str = Field(default_factory=generate_uuid)
     content: str
     content_title: str | None = None
-    status: str = Field(default="pending", description="pending, reviewing, completed")
+    status: str = Field(default="pending", description="pending, reviewing, completed, failed")
+    batch_id: str | None = None
+    source: str | None = None
+    final_score: int | None = None
+    final_decision: str | None = None
+    error: str | None = None
+    duration_seconds: float | None = None
     agent_results: dict[str, AgentFeedback] = Field(default_factory=dict)
     human_actions: list[HumanAction] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -38,5 +106,16 @@ class ContentEmbedding(BaseModel):
     id: str = Field(default_factory=generate_uuid)
     content: str
     embedding: list[float]
+    content_hash: str | None = None
+    embedding_model: str | None = None
     metadata: dict[str, Any] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PassageEmbedding(BaseModel):
+    """Vector embedding for one passage of a stored document."""
+    id: str
+    parent_id: str
+    position: int
+    title: str | None = None
+    content: str
+    embedding: list[float]
@@ -33,7 +33,7 @@ class MongoDBClient:
 
     async def save_review(self, review: ReviewSession) -> str:
         """Save or update a review session."""
-        if not self.db:
+        if self.db is None:
             await self.connect()
             
         result = await self.db.reviews.update_one(
@@ -45,7 +45,7 @@ class MongoDBClient:
 
     async def get_review(self, review_id: str) -> Optional[ReviewSession]:
         """Retrieve a review session."""
-        if not self.db:
+        if self.db is None:
             await self.connect()
             
         data = await self.db.reviews.find_one({"id": review_id})
@@ -53,5 +53,13 @@ class MongoDBClient:
             return ReviewSession(**data)
         return None
 
+    async def completed_review_ids(self, batch_id: str) -> set[str]:
+        """IDs of the sessions in a batch that have already completed (for resume)."""
+        if self.db is None:
+            await self.connect()
+
+        cursor = self.db.reviews.find({"batch_id": batch_id, "status": "completed"}, {"id": 1, "_id": 0})
+        return {doc["id"] async for doc in cursor}
+
 # Global instance
 mongo_client = MongoDBClient()
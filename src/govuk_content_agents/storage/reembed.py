@@ -0,0 +1,76 @@
+"""
+Background re-embedding: copy a knowledge base from one embedding version
+(model + dimensions) to another.
+
+Every embedding version has its own table, so the new version is filled
+alongside the one serving searches. Documents stream from the source in chunks
+and go through the normal ingest pipeline against the target, with embedding
+calls queued below interactive work in the shared rate limit. The job is
+resumable: documents whose content hash already matches in the target are
+skipped, so an interrupted run continues where it stopped and a final run just
+before switching EMBEDDING_MODEL / EMBEDDING_DIMENSIONS catches up on recent
+writes.
+
+    python scripts/reembed.py --model text-embedding-3-large --dimensions 3072
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from .vectors import VectorService
+
+logger = logging.getLogger(__name__)
+
+# Scheduler priority of re-embedding calls (interactive embeddings use 0)
+BACKGROUND_PRIORITY = -10
+
+def _source_documents(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Ingest documents for source rows, keeping their ids and creation times."""
+    return [
+        {
+            "id": str(record["id"]),
+            "content": record["content"] or "",
+            "metadata": record.get("metadata") or {},
+            "created_at": record.get("created_at")
+        }
+        for record in records
+    ]
+
+async def reembed(
+    source: Any,
+    target: Any,
+    batch_size: Optional[int] = None,
+    chunk_rows: int = 1_000,
+    priority: int = BACKGROUND_PRIORITY
+) -> Dict[str, Any]:
+    """
+    Re-embed every document (and its passages) of `source` into `target`, a
+    client for another embedding version. Returns counts and elapsed time.
+    """
+    if source.version == target.version:
+        raise ValueError(f"Source and target are both {source.version.key}")
+    source.connect()
+    target.connect()
+    service = VectorService(client=target, priority=priority)
+    logger.info(f"Re-embedding {source.table} ({source.version.key}) into {target.table} ({target.version.key})")
+
+    scanned = 0
+    start = time.perf_counter()
+    chunks = source.export_chunks("documents", chunk_rows)
+    try:
+        # The source is read off the event loop, one chunk at a time
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            records, _ = chunk
+            async for ids in service.ingest(_source_documents(records), batch_size=batch_size):
+                scanned += len(ids)
+            logger.info(f"Re-embedded {scanned} documents into {target.table}")
+    finally:
+        chunks.close()
+
+    return {
+        "source": source.version.key,
+        "target": target.version.key,
+        "documents": scanned,
+        "elapsed_seconds": time.perf_counter() - start
+    }
@@ -0,0 +1,97 @@
+"""
+One-off re-keying of documents saved with random ids.
+
+Before ids were derived from document keys, rows were saved under a random
+UUIDv4, so ingesting the same document again adds a second row under its
+deterministic id instead of updating the first. This moves every UUIDv4 row to
+`document_id(VectorService.document_key(...))`, copying its stored embedding
+and passages (nothing is re-embedded), and deletes the ones that duplicate
+what is already stored:
+
+* a row whose content hash is already stored under a deterministic id is dropped;
+* a row whose new id already exists is dropped (the existing row is current);
+* of several rows with the same new id, the newest is moved and the rest dropped.
+
+Documents saved under explicit keys (the Knowledge Base page, seed_policies)
+can only be matched by content, so re-save those before running this. The job
+can be re-run: copied rows hold deterministic ids, so an interrupted run only
+has deletions left.
+
+    python scripts/rekey_documents.py --dry-run
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from .models import content_hash, document_id, passage_id
+from .vectors import VectorService
+
+logger = logging.getLogger(__name__)
+
+def _is_random_id(doc_id: str) -> bool:
+    """Whether `doc_id` came from `generate_uuid` (UUIDv4) rather than `document_id` (UUIDv5)."""
+    try:
+        return UUID(doc_id).version == 4
+    except ValueError:
+        return False
+
+def plan_rekey(client: Any, chunk_rows: int = 1_000) -> Dict[str, Optional[str]]:
+    """Map every UUIDv4 document id in `client` to its new id, or to None when it is a duplicate."""
+    stored_ids, stored_hashes = set(), set()
+    candidates = {}
+    for records, _ in client.export_chunks("documents", chunk_rows):
+        for record in records:
+            doc_id = str(record["id"])
+            digest = record.get("content_hash") or content_hash(record["content"] or "")
+            if _is_random_id(doc_id):
+                key = VectorService.document_key(record["content"] or "", record.get("metadata") or {})
+                candidates[doc_id] = (document_id(key), digest, record.get("created_at") or datetime.min)
+            else:
+                stored_ids.add(doc_id)
+                stored_hashes.add(digest)
+
+    newest: Dict[str, tuple[datetime, str]] = {}
+    for doc_id, (new_id, digest, created_at) in candidates.items():
+        if digest in stored_hashes or new_id in stored_ids:
+            continue
+        if new_id not in newest or (created_at, doc_id) > newest[new_id]:
+            newest[new_id] = (created_at, doc_id)
+    moves = {doc_id: new_id for new_id, (_, doc_id) in newest.items()}
+    return {doc_id: moves.get(doc_id) for doc_id in candidates}
+
+def rekey(client: Any, chunk_rows: int = 1_000, dry_run: bool = False) -> Dict[str, Any]:
+    """Move UUIDv4 documents of `client` to deterministic ids and delete duplicates. Returns counts."""
+    client.connect()
+    plan = plan_rekey(client, chunk_rows)
+    moves = {doc_id: new_id for doc_id, new_id in plan.items() if new_id}
+    report = {"table": client.table, "moved": len(moves), "dropped": len(plan) - len(moves), "dry_run": dry_run}
+    if dry_run or not plan:
+        return report
+
+    # Documents before their passages, then the old rows (their passages go with them)
+    for records, embeddings in client.export_chunks("documents", chunk_rows):
+        rows = [i for i, record in enumerate(records) if str(record["id"]) in moves]
+        if rows:
+            client.bulk_load("documents", [
+                {
+                    **records[i],
+                    "id": moves[str(records[i]["id"])],
+                    "content_hash": records[i].get("content_hash") or content_hash(records[i]["content"] or "")
+                }
+                for i in rows
+            ], embeddings[rows])
+    for records, embeddings in client.export_chunks("passages", chunk_rows):
+        rows = [i for i, record in enumerate(records) if str(record["parent_id"]) in moves]
+        if rows:
+            client.bulk_load("passages", [
+                {
+                    **records[i],
+                    "id": passage_id(moves[str(records[i]["parent_id"])], records[i]["position"]),
+                    "parent_id": moves[str(records[i]["parent_id"])]
+                }
+                for i in rows
+            ], embeddings[rows])
+    client.delete_documents(list(plan))
+    logger.info(f"Re-keyed {client.table}: {report['moved']} moved, {report['dropped']} duplicates dropped")
+    return report
@@ -0,0 +1,154 @@
+"""
+Read-through cache for vector searches.
+
+Results are kept in an in-memory LRU keyed by table, search method, a hash of
+the query embedding and every other search argument (k, filters, thresholds),
+plus the settings that searches fall back to (storage mode, ef_search/probes,
+re-rank factor), so changing those never serves results searched the old way.
+Each table has a generation counter that is part of the key and is bumped by
+every write through a vector client, so a write makes the table's cached
+results unreachable at once. The TTL bounds staleness from writes made by
+other processes.
+"""
+import copy
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from typing import Any, Dict, Optional, TypeVar
+
+from ..config import settings
+from ..llm.cache import canonical_json
+from ..utils.stats import latency_summary
+
+T = TypeVar("T")
+
+# Latencies kept for the saved-latency percentiles
+LATENCY_SAMPLES = 10_000
+
+# Settings read by search methods when an argument is left at its default
+SEARCH_SETTINGS = ("VECTOR_STORAGE", "VECTOR_HNSW_EF_SEARCH", "VECTOR_IVFFLAT_PROBES", "VECTOR_RERANK_FACTOR")
+
+def embedding_digest(embedding: Any) -> str:
+    """SHA-256 of the embedding's float64 bytes."""
+    return hashlib.sha256(array("d", [float(v) for v in embedding]).tobytes()).hexdigest()
+
+class SearchCache:
+    """LRU/TTL cache of search results with per-table generation counters."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (expires_at, search latency, results)
+        self._entries: OrderedDict[str, tuple[float, float, Any]] = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+        self._saved: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def generation(self, table: str) -> int:
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def invalidate(self, table: str):
+        """Bump the table's generation; its cached results are no longer served."""
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            self.invalidations += 1
+
+    def make_key(self, table: str, method: str, arguments: Dict[str, Any]) -> str:
+        arguments = dict(arguments)
+        arguments["embedding"] = embedding_digest(arguments["embedding"])
+        return hashlib.sha256(
+            f"{table}\x00{self.generation(table)}\x00{method}\x00{canonical_json(arguments)}".encode("utf-8")
+        ).hexdigest()
+
+    def get_or_search(self, key: str, search: Callable[[], T]) -> T:
+        """Cached results for `key`, or run `search` and cache what it returns."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._saved.append(entry[1])
+                self.saved_seconds += entry[1]
+                return copy.deepcopy(entry[2])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+
+        start = time.perf_counter()
+        results = search()
+        latency = time.perf_counter() - start
+
+        expires_at = now + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+        with self._lock:
+            self._entries[key] = (expires_at, latency, copy.deepcopy(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return results
+
+    def clear(self):
+        """Drop every entry and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.invalidations = 0
+            self.saved_seconds = 0.0
+            self._saved.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and the search latency saved by hits (p50/p99 in seconds)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            saved = list(self._saved)
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "latency_saved_seconds": latency_summary(saved),
+                "total_saved_seconds": self.saved_seconds
+            }
+
+# Global instance, shared by every vector client in the process
+search_cache = SearchCache(
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS
+)
+
+def cached_search(method: Callable[..., T]) -> Callable[..., T]:
+    """
+    Serve a vector client's search method through `search_cache`.
+    The key covers the client's table, the method, all bound arguments (with
+    `storage` resolved to the mode actually searched) and SEARCH_SETTINGS.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args: Any, **kwargs: Any) -> T:
+        if not settings.SEARCH_CACHE_ENABLED:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        del arguments["self"]
+        if "storage" in arguments and hasattr(self, "_storage"):
+            arguments["storage"] = self._storage(arguments["storage"])
+        arguments["settings"] = {name: getattr(settings, name) for name in SEARCH_SETTINGS}
+        key = search_cache.make_key(self.table, method.__name__, arguments)
+        return search_cache.get_or_search(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
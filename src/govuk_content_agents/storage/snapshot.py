@@ -0,0 +1,138 @@
+"""
+Knowledge base snapshots: export a vector store to one compact binary file and
+bulk-load it into another, without any embedding calls.
+
+File layout (all integers little-endian):
+
+    MAGIC, u32 header length, header JSON (version, table, embedding version, dtype)
+    chunk*: kind byte (b"D" documents / b"P" passages), u32 rows, u32 dimensions,
+            u32 records length, zlib-compressed JSON records,
+            rows x dimensions embedding matrix (float32 or float16)
+    b"E"
+
+Documents are written before passages, so parents always load first. Chunks are
+read and loaded one at a time, so memory stays bounded for any corpus size.
+"""
+import json
+import logging
+import struct
+import zlib
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, List, NamedTuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GCAKB\x00\x01\n"
+VERSION = 1
+KINDS = {"documents": b"D", "passages": b"P"}
+END = b"E"
+DTYPES = ("float32", "float16")
+
+class SnapshotChunk(NamedTuple):
+    kind: str
+    records: List[Dict[str, Any]]
+    embeddings: np.ndarray
+
+def _encode_records(records: List[Dict[str, Any]]) -> bytes:
+    return zlib.compress(json.dumps(records, default=str, separators=(",", ":")).encode("utf-8"))
+
+def _decode_records(data: bytes) -> List[Dict[str, Any]]:
+    records = json.loads(zlib.decompress(data))
+    for record in records:
+        if record.get("created_at"):
+            record["created_at"] = datetime.fromisoformat(record["created_at"])
+    return records
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated snapshot file")
+    return data
+
+def write_header(f: BinaryIO, table: str, dtype: str, embedding_model: str):
+    header = json.dumps({
+        "version": VERSION,
+        "table": table,
+        "embedding_model": embedding_model,
+        "dtype": dtype,
+        "created_at": datetime.utcnow().isoformat()
+    }).encode("utf-8")
+    f.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+def write_chunk(f: BinaryIO, kind: str, records: List[Dict[str, Any]], embeddings: np.ndarray, dtype: str):
+    matrix = np.ascontiguousarray(embeddings, dtype=np.dtype(dtype).newbyteorder("<"))
+    data = _encode_records(records)
+    f.write(KINDS[kind] + struct.pack("<III", matrix.shape[0], matrix.shape[1], len(data)))
+    f.write(data)
+    f.write(matrix.tobytes())
+
+def read_snapshot(f: BinaryIO) -> tuple[Dict[str, Any], Iterator[SnapshotChunk]]:
+    """Parse the header and return it with a lazy iterator over the chunks."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a knowledge base snapshot")
+    (length,) = struct.unpack("<I", _read_exact(f, 4))
+    header = json.loads(_read_exact(f, length))
+    if header.get("version") != VERSION:
+        raise ValueError(f"Unsupported snapshot version: {header.get('version')}")
+    dtype = np.dtype(header["dtype"]).newbyteorder("<")
+    kinds = {code: kind for kind, code in KINDS.items()}
+
+    def chunks() -> Iterator[SnapshotChunk]:
+        while True:
+            code = _read_exact(f, 1)
+            if code == END:
+                return
+            if code not in kinds:
+                raise ValueError(f"Unknown snapshot chunk type: {code!r}")
+            rows, dimensions, length = struct.unpack("<III", _read_exact(f, 12))
+            records = _decode_records(_read_exact(f, length))
+            matrix = np.frombuffer(_read_exact(f, rows * dimensions * dtype.itemsize), dtype=dtype)
+            yield SnapshotChunk(kinds[code], records, matrix.reshape(rows, dimensions).astype(np.float32))
+
+    return header, chunks()
+
+def export_snapshot(client: Any, path: str, chunk_rows: int = 10_000, dtype: str = "float32") -> Dict[str, int]:
+    """Write every document and passage of `client`'s table to `path`. Returns row counts."""
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown snapshot dtype: {dtype} (expected one of {DTYPES})")
+    counts = {kind: 0 for kind in KINDS}
+    client.connect()
+    with open(path, "wb") as f:
+        write_header(f, client.table, dtype, client.version.key)
+        for kind in KINDS:
+            for records, embeddings in client.export_chunks(kind, chunk_rows):
+                write_chunk(f, kind, records, embeddings, dtype)
+                counts[kind] += len(records)
+                logger.info(f"Exported {counts[kind]} {kind}")
+        f.write(END)
+    return counts
+
+def import_snapshot(client: Any, path: str, rebuild_indexes: bool = True) -> Dict[str, int]:
+    """
+    Bulk-load a snapshot into `client`'s table (upserting by id). With
+    `rebuild_indexes` the ANN indexes are dropped for the load and built once
+    at the end. Returns row counts.
+    """
+    counts = {kind: 0 for kind in KINDS}
+    with open(path, "rb") as f:
+        header, chunks = read_snapshot(f)
+        if header["embedding_model"] != client.version.key:
+            raise ValueError(
+                f"Snapshot embeddings are from {header['embedding_model']}, "
+                f"but {client.table} holds {client.version.key}"
+            )
+        client.connect()
+        if rebuild_indexes:
+            with client.bulk_loading():
+                _load_chunks(client, chunks, counts)
+        else:
+            _load_chunks(client, chunks, counts)
+    return counts
+
+def _load_chunks(client: Any, chunks: Iterator[SnapshotChunk], counts: Dict[str, int]):
+    for chunk in chunks:
+        counts[chunk.kind] += client.bulk_load(chunk.kind, chunk.records, chunk.embeddings)
+        logger.info(f"Loaded {counts[chunk.kind]} {chunk.kind}")
@@ -1,146 +1,1194 @@
+import asyncio
+import functools
+import io
+import json
+import logging
+import struct
+import threading
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Optional, TypeVar
+
+import numpy as np
 import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from pgvector.psycopg2 import register_vector
-from typing import List, Dict, Any, Optional
-import logging
 from ..config import settings
-from .models import ContentEmbedding
+from ..llm.cache import embedding_cache, embedding_namespace
+from ..llm.clients import embedding_provider, get_embedding_client
+from ..llm.scheduler import estimate_tokens, llm_scheduler
+from ..llm.transport import run_blocking
+from ..utils.text import Section, split_chunks
+from .models import ContentEmbedding, EmbeddingVersion, PassageEmbedding, content_hash, document_id, passage_id
+from .search_cache import cached_search, search_cache
 
 logger = logging.getLogger(__name__)
 
-class VectorDBClient:
-    """PostgreSQL + pgvector client wrapper."""
+T = TypeVar("T")
+
+INDEX_TYPES = ("hnsw", "ivfflat")
+
+# How the ANN index stores vectors. Rows always keep the full-precision embedding,
+# which re-ranks the candidates found through a compressed index.
+STORAGE_MODES = ("full", "halfvec", "reduced", "binary")
+# pgvector index limits: larger embeddings index their "full" mode as halfvec
+MAX_VECTOR_INDEX_DIMENSIONS = 2000
+MAX_HALFVEC_INDEX_DIMENSIONS = 4000
+# Largest hnsw.ef_search pgvector accepts; an HNSW scan returns at most ef_search rows
+MAX_HNSW_EF_SEARCH = 1000
+
+# Hybrid search: reciprocal rank fusion constant and candidates fetched per branch (x limit)
+RRF_K = 60
+HYBRID_CANDIDATE_FACTOR = 4
+
+# Snapshot/bulk-load columns per row kind (the embedding travels separately as a float array)
+BULK_COLUMNS = {
+    "documents": ("id", "content", "content_hash", "metadata", "created_at"),
+    "passages": ("id", "parent_id", "position", "title", "content"),
+}
+# PostgreSQL binary timestamps count microseconds from 2000-01-01
+_PG_EPOCH = datetime(2000, 1, 1)
+
+# Tables whose schema has been set up by this process
+_initialised_tables: set[str] = set()
+_schema_lock = threading.Lock()
+
+def _copy_field(column: str, value: Any) -> bytes:
+    """One field in COPY binary format (length-prefixed, -1 for NULL)."""
+    if value is None:
+        return struct.pack(">i", -1)
+    if column in ("id", "parent_id"):
+        data = uuid.UUID(str(value)).bytes
+    elif column == "position":
+        data = struct.pack(">i", int(value))
+    elif column == "metadata":
+        # jsonb binary format: version byte then the JSON text
+        data = b"\x01" + json.dumps(value).encode("utf-8")
+    elif column == "created_at":
+        delta = value - _PG_EPOCH
+        data = struct.pack(">q", (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds)
+    else:
+        data = str(value).encode("utf-8")
+    return struct.pack(">i", len(data)) + data
+
+def _copy_binary(kind: str, records: List[Dict[str, Any]], embeddings: np.ndarray) -> io.BytesIO:
+    """
+    Encode rows for `COPY ... FROM STDIN WITH (FORMAT binary)`. Embeddings use
+    pgvector's binary form (int16 dimensions, int16 unused, big-endian float4s).
+    """
+    columns = BULK_COLUMNS[kind]
+    vectors = np.ascontiguousarray(embeddings, dtype=">f4")
+    vector_header = struct.pack(">ihh", 4 + vectors.shape[1] * 4, vectors.shape[1], 0)
+    field_count = struct.pack(">h", len(columns) + 1)
+
+    buffer = io.BytesIO()
+    buffer.write(b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0))
+    for record, vector in zip(records, vectors):
+        buffer.write(field_count)
+        for column in columns:
+            buffer.write(_copy_field(column, record.get(column)))
+        buffer.write(vector_header)
+        buffer.write(vector.tobytes())
+    buffer.write(struct.pack(">h", -1))
+    buffer.seek(0)
+    return buffer
+
+class _VectorConnectionPool(ThreadedConnectionPool):
+    """Thread-safe pool whose connections have the pgvector types registered."""
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        register_vector(conn)
+        return conn
+
+class AsyncVectorMixin:
+    """
+    Async API shared by the vector backends: each blocking method runs on the
+    client's own executor (`max_connections` workers), separate from the LLM
+    transport pool. Needs `table`, `max_connections`, `_lock` and `_executor`.
+    """
+
+    async def _run_async(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking method on the client's executor without stalling the event loop."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_connections,
+                        thread_name_prefix=f"vectors-{self.table}"
+                    )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def _shutdown_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def asave_embeddings(self, items: Iterable[ContentEmbedding]) -> int:
+        """Async `save_embeddings`."""
+        return await self._run_async(self.save_embeddings, list(items))
+
+    async def aget_content_hashes(self, ids: List[str]) -> Dict[str, Optional[str]]:
+        """Async `get_content_hashes`."""
+        return await self._run_async(self.get_content_hashes, ids)
+
+    async def afind_embeddings_by_hash(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """Async `find_embeddings_by_hash`."""
+        return await self._run_async(self.find_embeddings_by_hash, hashes)
+
+    async def asave_embedding(self, item: ContentEmbedding):
+        """Async `save_embedding`."""
+        await self._run_async(self.save_embedding, item)
+
+    async def asearch_similar(self, embedding: List[float], limit: int = 5, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Async `search_similar` with the same result shape (id, content, metadata, similarity)."""
+        return await self._run_async(self.search_similar, embedding, limit, **kwargs)
+
+    async def asave_passages(self, passages: Iterable[PassageEmbedding]) -> int:
+        """Async `save_passages`."""
+        return await self._run_async(self.save_passages, list(passages))
+
+    async def aids_without_passages(self, ids: List[str]) -> List[str]:
+        """Async `ids_without_passages`."""
+        return await self._run_async(self.ids_without_passages, ids)
+
+    async def asearch_passages(self, embedding: List[float], limit: int = 3, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Async `search_passages` (one result per parent document, with its best passages)."""
+        return await self._run_async(self.search_passages, embedding, limit, **kwargs)
+
+class VectorDBClient(AsyncVectorMixin):
+    """PostgreSQL + pgvector client wrapper backed by a thread-safe connection pool."""
     
-    def __init__(self):
-        self.conn = None
+    def __init__(
+        self,
+        table: str = "content_embeddings",
+        min_connections: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        version: Optional[EmbeddingVersion] = None
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.table = table
+        # Embedding model and size of every row in this table (queries must match)
+        self.version = version or EmbeddingVersion.current()
+        self.dimensions = self.version.dimensions
+        if self.dimensions > MAX_HALFVEC_INDEX_DIMENSIONS:
+            raise ValueError(
+                f"{self.version.key}: pgvector cannot index more than {MAX_HALFVEC_INDEX_DIMENSIONS} dimensions; "
+                f"request fewer dimensions from the model"
+            )
+        # One row per passage, linked to its parent document row
+        self.passages_table = f"{table}_passages"
+        self.min_connections = min_connections if min_connections is not None else settings.POSTGRES_POOL_MIN
+        self.max_connections = max_connections or settings.POSTGRES_POOL_MAX
+        self.pool: Optional[ThreadedConnectionPool] = None
+        # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._lock = threading.Lock()
+        # One worker per pooled connection for the async API, separate from the LLM transport
+        self._executor: Optional[ThreadPoolExecutor] = None
         
     def connect(self):
-        """Connect to PostgreSQL."""
-        try:
-            self.conn = psycopg2.connect(settings.POSTGRES_URI)
-            # Register pgvector extension
-            cur = self.conn.cursor()
-            cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
-            register_vector(self.conn)
-            self.conn.commit()
-            
-            # Create table if not exists (simple synchronous setup)
-            self._init_table()
-            
-            logger.info("Successfully connected to PostgreSQL/pgvector")
-        except Exception as e:
-            logger.error(f"Failed to connect to PostgreSQL: {e}")
-            raise
-
-    def _init_table(self):
-        """Initialize the vectors table."""
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS content_embeddings (
-            id UUID PRIMARY KEY,
-            content TEXT,
-            embedding vector(1536),
-            metadata JSONB,
-            created_at TIMESTAMP
-        );
-        """
-        if not self.conn:
-            return
-            
-        with self.conn.cursor() as cur:
-            cur.execute(create_table_sql)
-            self.conn.commit()
+        """Set up the schema (once per process) and open the connection pool."""
+        with self._lock:
+            if self.pool is not None:
+                return
+            try:
+                self._init_schema()
+                self.pool = _VectorConnectionPool(
+                    self.min_connections,
+                    self.max_connections,
+                    settings.POSTGRES_URI,
+                    connect_timeout=settings.POSTGRES_CONNECT_TIMEOUT
+                )
+                logger.info(
+                    f"Connected to PostgreSQL/pgvector (pool {self.min_connections}-{self.max_connections})"
+                )
+            except Exception as e:
+                logger.error(f"Failed to connect to PostgreSQL: {e}")
+                raise
+
+    def _init_schema(self):
+        """Create the pgvector extension and the vectors table, once per process per table."""
+        with _schema_lock:
+            if self.table in _initialised_tables:
+                return
+            conn = psycopg2.connect(settings.POSTGRES_URI, connect_timeout=settings.POSTGRES_CONNECT_TIMEOUT)
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+                    cur.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        id UUID PRIMARY KEY,
+                        content TEXT,
+                        embedding vector({self.dimensions}),
+                        metadata JSONB,
+                        created_at TIMESTAMP
+                    );
+                    """)
+                    # Added after the first release; older tables are migrated in place
+                    cur.execute(f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS content_hash TEXT")
+                    cur.execute(
+                        f"CREATE INDEX IF NOT EXISTS {self.table}_content_hash_idx ON {self.table} (content_hash)"
+                    )
+                    # Versioned embeddings: "<model>@<dimensions>" of each row
+                    cur.execute(f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS embedding_model TEXT")
+                    # Filtered and hybrid search
+                    cur.execute(
+                        f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+                        f"GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED"
+                    )
+                    cur.execute(
+                        f"CREATE INDEX IF NOT EXISTS {self.table}_metadata_idx ON {self.table} "
+                        f"USING gin (metadata jsonb_path_ops)"
+                    )
+                    cur.execute(
+                        f"CREATE INDEX IF NOT EXISTS {self.table}_content_tsv_idx ON {self.table} USING gin (content_tsv)"
+                    )
+                    cur.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_created_at_idx ON {self.table} (created_at)")
+                    cur.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.passages_table} (
+                        id UUID PRIMARY KEY,
+                        parent_id UUID NOT NULL REFERENCES {self.table} (id) ON DELETE CASCADE,
+                        position INTEGER NOT NULL,
+                        title TEXT,
+                        content TEXT,
+                        embedding vector({self.dimensions})
+                    );
+                    """)
+                    cur.execute(
+                        f"CREATE INDEX IF NOT EXISTS {self.passages_table}_parent_idx "
+                        f"ON {self.passages_table} (parent_id)"
+                    )
+                    if settings.VECTOR_INDEX_TYPE:
+                        cur.execute(self._index_sql(settings.VECTOR_INDEX_TYPE))
+                        # Passages are indexed at full precision (halfvec over 2000 dimensions)
+                        cur.execute(self._index_sql(settings.VECTOR_INDEX_TYPE, storage="full", table=self.passages_table))
+                conn.commit()
+            finally:
+                conn.close()
+            _initialised_tables.add(self.table)
+
+    @property
+    def index_name(self) -> str:
+        return self._index_name(self._storage())
+
+    def _storage(self, storage: Optional[str] = None) -> str:
+        """
+        Storage mode actually indexed (default VECTOR_STORAGE). pgvector cannot
+        index `vector` columns over 2000 dimensions, so "full" becomes "halfvec" there.
+        """
+        storage = storage or settings.VECTOR_STORAGE
+        if storage == "full" and self.dimensions > MAX_VECTOR_INDEX_DIMENSIONS:
+            return "halfvec"
+        return storage
+
+    def _index_name(self, storage: str, table: Optional[str] = None) -> str:
+        # The full-precision index keeps its original name
+        table = table or self.table
+        return f"{table}_embedding_idx" if storage == "full" else f"{table}_embedding_{storage}_idx"
+
+    def _index_expression(self, storage: str, column: str = "embedding") -> tuple[str, str, str]:
+        """(indexed expression, operator class, matching query expression) for a storage mode."""
+        if storage == "full":
+            return column, "vector_cosine_ops", f"{column} <=> %(embedding)s::vector"
+        if storage == "halfvec":
+            half = f"halfvec({self.dimensions})"
+            return f"({column}::{half})", "halfvec_cosine_ops", f"{column}::{half} <=> %(embedding)s::{half}"
+        if storage == "reduced":
+            # text-embedding-3 vectors can be shortened by truncation (what the API's
+            # `dimensions` parameter does); cosine distance ignores the lost norm
+            dims = int(settings.VECTOR_REDUCED_DIMENSIONS)
+            prefix = f"subvector({column}, 1, {dims})::vector({dims})"
+            return (
+                f"({prefix})",
+                "vector_cosine_ops",
+                f"{prefix} <=> subvector(%(embedding)s::vector, 1, {dims})::vector({dims})"
+            )
+        if storage == "binary":
+            bits = f"bit({self.dimensions})"
+            return (
+                f"(binary_quantize({column})::{bits})",
+                "bit_hamming_ops",
+                f"binary_quantize({column})::{bits} <~> binary_quantize(%(embedding)s::vector)"
+            )
+        raise ValueError(f"Unknown vector storage: {storage} (expected one of {STORAGE_MODES})")
+
+    def _index_sql(
+        self,
+        index_type: str,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        lists: Optional[int] = None,
+        concurrently: bool = False,
+        storage: Optional[str] = None,
+        table: Optional[str] = None
+    ) -> str:
+        """CREATE INDEX statement for an HNSW or IVFFlat index over the storage mode's expression."""
+        storage = self._storage(storage)
+        if index_type == "hnsw":
+            options = (
+                f"m = {int(m or settings.VECTOR_HNSW_M)}, "
+                f"ef_construction = {int(ef_construction or settings.VECTOR_HNSW_EF_CONSTRUCTION)}"
+            )
+        elif index_type == "ivfflat":
+            options = f"lists = {int(lists or settings.VECTOR_IVFFLAT_LISTS)}"
+        else:
+            raise ValueError(f"Unknown vector index type: {index_type} (expected one of {INDEX_TYPES})")
+        expression, opclass, _ = self._index_expression(storage)
+        return (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {self._index_name(storage, table)} "
+            f"ON {table or self.table} USING {index_type} ({expression} {opclass}) WITH ({options})"
+        )
+
+    def create_index(
+        self,
+        index_type: Optional[str] = None,
+        m: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        lists: Optional[int] = None,
+        rebuild: bool = False,
+        concurrently: bool = False,
+        storage: Optional[str] = None
+    ):
+        """
+        Create the ANN index (HNSW or IVFFlat) for a storage mode (default VECTOR_STORAGE).
+        `rebuild` drops the existing index first, e.g. to change parameters or to
+        re-cluster IVFFlat after a bulk load. `concurrently` avoids blocking writes
+        while the index builds.
+        """
+        index_type = index_type or settings.VECTOR_INDEX_TYPE or "hnsw"
+        storage = self._storage(storage)
+        sql = self._index_sql(index_type, m, ef_construction, lists, concurrently, storage)
+        index_name = self._index_name(storage)
+
+        def operation(conn):
+            # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+            conn.autocommit = concurrently
+            try:
+                with conn.cursor() as cur:
+                    if rebuild:
+                        cur.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {index_name}")
+                    cur.execute(sql)
+                if not concurrently:
+                    conn.commit()
+            finally:
+                conn.autocommit = False
+
+        logger.info(f"Building {index_type} index {index_name}")
+        self._run(operation)
+
+    def drop_index(self, storage: Optional[str] = None, concurrently: bool = False):
+        """Drop a storage mode's ANN index (default VECTOR_STORAGE)."""
+        index_name = self._index_name(self._storage(storage))
+
+        def operation(conn):
+            conn.autocommit = concurrently
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {index_name}")
+                if not concurrently:
+                    conn.commit()
+            finally:
+                conn.autocommit = False
+
+        self._run(operation)
+
+    def migrate_storage(self, storage: str, index_type: Optional[str] = None, concurrently: bool = True):
+        """
+        Switch the ANN index to another storage mode. Existing rows need no
+        re-embedding: the new index is built from the stored full-precision
+        column (without blocking writes), then the other modes' indexes are dropped.
+        Point VECTOR_STORAGE at the new mode once this returns.
+        """
+        storage = self._storage(storage)
+        self._index_expression(storage)
+        self.create_index(index_type, concurrently=concurrently, storage=storage)
+        for other in {self._storage(mode) for mode in STORAGE_MODES} - {storage}:
+            self.drop_index(other, concurrently=concurrently)
+        logger.info(f"Migrated {self.table} vector index to {storage} storage")
+
+    def index_size(self, storage: Optional[str] = None) -> int:
+        """On-disk size in bytes of a storage mode's ANN index (0 if it does not exist)."""
+        index_name = self._index_name(self._storage(storage))
+
+        def operation(conn):
+            with conn.cursor() as cur:
+                cur.execute("SELECT COALESCE(pg_relation_size(to_regclass(%s)), 0)", (index_name,))
+                size = cur.fetchone()[0]
+            conn.commit()
+            return size
+
+        return int(self._run(operation))
 
     def close(self):
-        """Close connection."""
-        if self.conn:
-            self.conn.close()
+        """Close every pooled connection and stop the async executor."""
+        with self._lock:
+            self._shutdown_executor()
+            if self.pool is not None:
+                self.pool.closeall()
+                self.pool = None
+
+    def _checkout(self):
+        """Take a healthy connection from the pool, replacing closed ones."""
+        if self.pool is None:
+            self.connect()
+        conn = self.pool.getconn()
+        if conn.closed:
+            logger.warning("Discarding closed PostgreSQL connection")
+            self.pool.putconn(conn, close=True)
+            conn = self.pool.getconn()
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Borrow a pooled connection. The transaction is rolled back if the block
+        raises, and a connection broken mid-use is closed rather than returned.
+        """
+        with self._slots:
+            conn = self._checkout()
+            broken = False
+            try:
+                yield conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                broken = True
+                raise
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self.pool.putconn(conn, close=broken or bool(conn.closed))
+
+    def _run(self, operation: Callable[[Any], T]) -> T:
+        """Run `operation(conn)`, retrying once on a fresh connection if the first one was dead."""
+        try:
+            with self.connection() as conn:
+                return operation(conn)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            logger.warning(f"PostgreSQL connection failed ({e}); retrying with a new connection")
+            with self.connection() as conn:
+                return operation(conn)
 
     def save_embedding(self, item: ContentEmbedding):
         """Save an embedding."""
-        if not self.conn:
-            self.connect()
-            
-        sql = """
-        INSERT INTO content_embeddings (id, content, embedding, metadata, created_at)
-        VALUES (%s, %s, %s, %s, %s)
-        ON CONFLICT (id) DO UPDATE SET
-            content = EXCLUDED.content,
-            embedding = EXCLUDED.embedding,
-            metadata = EXCLUDED.metadata,
-            created_at = EXCLUDED.created_at;
+        self.save_embeddings([item])
+
+    def _filter_clause(
+        self,
+        filters: Optional[Dict[str, Any]],
+        created_after: Optional[datetime],
+        created_before: Optional[datetime]
+    ) -> tuple[str, Dict[str, Any]]:
+        """WHERE conditions for metadata containment (GIN-indexed) and a created_at range."""
+        conditions = ["TRUE"]
+        params: Dict[str, Any] = {}
+        if filters:
+            conditions.append("metadata @> %(filters)s::jsonb")
+            params["filters"] = json.dumps(filters)
+        if created_after:
+            conditions.append("created_at >= %(created_after)s")
+            params["created_after"] = created_after
+        if created_before:
+            conditions.append("created_at < %(created_before)s")
+            params["created_before"] = created_before
+        return " AND ".join(conditions), params
+
+    @cached_search
+    def search_similar(
+        self,
+        embedding: List[float],
+        limit: int = 5,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        min_similarity: Optional[float] = None,
+        query_text: Optional[str] = None,
+        max_content_chars: Optional[int] = None,
+        storage: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
-        with self.conn.cursor() as cur:
-            cur.execute(sql, (
+        Search for similar content.
+
+        `filters` matches metadata by containment (e.g. {"department": "HMRC",
+        "type": "external_policy"}) and `created_after`/`created_before` bound
+        created_at. `min_similarity` drops weak matches in SQL and
+        `max_content_chars` truncates the returned content, so only useful rows
+        and bytes come back.
+
+        With `query_text` the search is hybrid: vector and full-text (tsvector)
+        candidates are fused by reciprocal rank and each result gets a `score`.
+        `min_similarity` then applies to the vector candidates only, so strong
+        keyword matches still surface.
+
+        `ef_search` (HNSW) and `probes` (IVFFlat) trade latency for recall on this
+        query only; they default to VECTOR_HNSW_EF_SEARCH / VECTOR_IVFFLAT_PROBES.
+
+        `storage` (default VECTOR_STORAGE) picks the index to search. For
+        `halfvec`, `reduced` and `binary`, VECTOR_RERANK_FACTOR times as many
+        candidates are read from the compressed index and re-ranked by exact
+        full-precision distance.
+        """
+        storage = self._storage(storage)
+        ef_search = ef_search or settings.VECTOR_HNSW_EF_SEARCH
+        probes = probes or settings.VECTOR_IVFFLAT_PROBES
+        where, params = self._filter_clause(filters, created_after, created_before)
+        params.update({"embedding": embedding, "limit": limit, "chars": max_content_chars})
+        content = "left(content, %(chars)s)" if max_content_chars else "content"
+        candidates = max(limit * HYBRID_CANDIDATE_FACTOR, 20) if query_text else limit
+        distance = "embedding <=> %(embedding)s::vector"
+
+        # Compressed storage: take candidates from its index, then re-rank them exactly
+        source, source_where = self.table, where
+        if storage != "full":
+            _, _, approximate = self._index_expression(storage)
+            params["rerank"] = max(candidates, min(candidates * settings.VECTOR_RERANK_FACTOR, MAX_HNSW_EF_SEARCH))
+            source = f"""(
+                SELECT id, content, metadata, embedding FROM {self.table}
+                WHERE {where}
+                ORDER BY {approximate}
+                LIMIT %(rerank)s
+            ) AS candidates"""
+            source_where = "TRUE"
+            ef_search = max(ef_search or 40, params["rerank"])
+        if ef_search:
+            ef_search = min(ef_search, MAX_HNSW_EF_SEARCH)
+
+        vector_where = source_where
+        if min_similarity is not None:
+            vector_where += f" AND {distance} <= %(max_distance)s"
+            params["max_distance"] = 1 - min_similarity
+
+        if query_text:
+            params.update({"query_text": query_text, "candidates": candidates, "k": RRF_K})
+            sql = f"""
+            WITH vector_hits AS (
+                SELECT id, row_number() OVER (ORDER BY {distance}) AS rank
+                FROM {source}
+                WHERE {vector_where}
+                ORDER BY {distance}
+                LIMIT %(candidates)s
+            ),
+            text_hits AS (
+                SELECT id, row_number() OVER (ORDER BY ts_rank_cd(content_tsv, query) DESC) AS rank
+                FROM {self.table}, websearch_to_tsquery('english', %(query_text)s) AS query
+                WHERE content_tsv @@ query AND {where}
+                ORDER BY ts_rank_cd(content_tsv, query) DESC
+                LIMIT %(candidates)s
+            ),
+            fused AS (
+                SELECT COALESCE(v.id, t.id) AS id,
+                       COALESCE(1.0 / (%(k)s + v.rank), 0) + COALESCE(1.0 / (%(k)s + t.rank), 0) AS score
+                FROM vector_hits v FULL OUTER JOIN text_hits t ON v.id = t.id
+            )
+            SELECT e.id, {content}, e.metadata, 1 - (e.embedding <=> %(embedding)s::vector) AS similarity, fused.score
+            FROM fused JOIN {self.table} e ON e.id = fused.id
+            ORDER BY fused.score DESC
+            LIMIT %(limit)s;
+            """
+        else:
+            sql = f"""
+            SELECT id, {content}, metadata, 1 - ({distance}) as similarity
+            FROM {source}
+            WHERE {vector_where}
+            ORDER BY {distance}
+            LIMIT %(limit)s;
+            """
+
+        def operation(conn):
+            with conn.cursor() as cur:
+                # SET LOCAL lasts until the commit below, so pooled connections are unaffected
+                if ef_search:
+                    cur.execute("SET LOCAL hnsw.ef_search = %s", (int(ef_search),))
+                if probes:
+                    cur.execute("SET LOCAL ivfflat.probes = %s", (int(probes),))
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+            conn.commit()
+            return rows
+
+        results = []
+        for row in self._run(operation):
+            result = {
+                "id": row[0],
+                "content": row[1],
+                "metadata": row[2],
+                "similarity": row[3]
+            }
+            if query_text:
+                result["score"] = float(row[4])
+            results.append(result)
+        return results
+
+    def save_embeddings(self, items: Iterable[ContentEmbedding]) -> int:
+        """
+        Upsert many embeddings in one transaction with multi-row INSERTs.
+        Returns the number of rows written (duplicate ids keep the last item).
+        """
+        rows = {
+            item.id: (
                 item.id,
                 item.content,
+                item.content_hash or content_hash(item.content),
                 item.embedding,
+                item.embedding_model or self.version.key,
                 json.dumps(item.metadata) if item.metadata else '{}',
                 item.created_at
-            ))
-            self.conn.commit()
+            )
+            for item in items
+        }
+        if not rows:
+            return 0
 
-    def search_similar(self, embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
-        """Search for similar content."""
-        if not self.conn:
-            self.connect()
-            
-        sql = """
-        SELECT id, content, metadata, 1 - (embedding <=> %s::vector) as similarity
-        FROM content_embeddings
-        ORDER BY embedding <=> %s::vector
-        LIMIT %s;
+        sql = f"""
+        INSERT INTO {self.table} (id, content, content_hash, embedding, embedding_model, metadata, created_at)
+        VALUES %s
+        ON CONFLICT (id) DO UPDATE SET
+            content = EXCLUDED.content,
+            content_hash = EXCLUDED.content_hash,
+            embedding = EXCLUDED.embedding,
+            embedding_model = EXCLUDED.embedding_model,
+            metadata = EXCLUDED.metadata,
+            created_at = EXCLUDED.created_at;
         """
-        results = []
-        with self.conn.cursor() as cur:
-            cur.execute(sql, (embedding, embedding, limit))
-            rows = cur.fetchall()
-            for row in rows:
-                results.append({
-                    "id": row[0],
-                    "content": row[1],
-                    "metadata": row[2],
-                    "similarity": row[3]
-                })
-        return results
+        def operation(conn):
+            with conn.cursor() as cur:
+                execute_values(cur, sql, list(rows.values()), page_size=len(rows))
+            conn.commit()
 
-import json
-from openai import OpenAI
-from ..config import settings
-from .models import generate_uuid, ContentEmbedding
-from datetime import datetime
+        self._run(operation)
+        search_cache.invalidate(self.table)
+        return len(rows)
+
+    def save_passages(self, passages: Iterable[PassageEmbedding]) -> int:
+        """
+        Replace the passages of every parent document in `passages`, in one
+        transaction. Parents must already be stored. Returns the number of passages written.
+        """
+        rows = {
+            passage.id: (
+                passage.id,
+                passage.parent_id,
+                passage.position,
+                passage.title,
+                passage.content,
+                passage.embedding
+            )
+            for passage in passages
+        }
+        if not rows:
+            return 0
+        parent_ids = list({row[1] for row in rows.values()})
+
+        def operation(conn):
+            with conn.cursor() as cur:
+                cur.execute(f"DELETE FROM {self.passages_table} WHERE parent_id = ANY(%s::uuid[])", (parent_ids,))
+                execute_values(
+                    cur,
+                    f"INSERT INTO {self.passages_table} (id, parent_id, position, title, content, embedding) VALUES %s",
+                    list(rows.values()),
+                    page_size=len(rows)
+                )
+            conn.commit()
+
+        self._run(operation)
+        search_cache.invalidate(self.table)
+        return len(rows)
+
+    def ids_without_passages(self, ids: List[str]) -> List[str]:
+        """Stored documents among `ids` that have no passages yet (e.g. saved before passage indexing)."""
+        if not ids:
+            return []
+
+        def operation(conn):
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"SELECT id::text FROM {self.table} d WHERE id = ANY(%s::uuid[]) "
+                    f"AND NOT EXISTS (SELECT 1 FROM {self.passages_table} p WHERE p.parent_id = d.id)",
+                    (list(ids),)
+                )
+                rows = cur.fetchall()
+            conn.commit()
+            return rows
+
+        return [row[0] for row in self._run(operation)]
+
+    @cached_search
+    def search_passages(
+        self,
+        embedding: List[float],
+        limit: int = 3,
+        passages_per_parent: int = 2,
+        filters: Optional[Dict[str, Any]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        min_similarity: Optional[float] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the passage index and group the hits by parent document.
+
+        Returns up to `limit` parents, best first, each with its `id`,
+        `metadata`, best passage `similarity` and its top `passages_per_parent`
+        passages ({"position", "title", "content", "similarity"}). Filters
+        apply to the parent rows, and `ef_search`/`probes` tune the passage
+        index, as in `search_similar`.
+        """
+        where, params = self._filter_clause(filters, created_after, created_before)
+        candidates = limit * passages_per_parent * HYBRID_CANDIDATE_FACTOR
+        params.update({
+            "embedding": embedding,
+            "limit": limit,
+            "per_parent": passages_per_parent,
+            "candidates": candidates
+        })
+        distance = "p.embedding <=> %(embedding)s::vector"
+        # Order by the passage index's expression (halfvec for large embeddings)
+        _, _, indexed = self._index_expression(self._storage("full"), column="p.embedding")
+        if min_similarity is not None:
+            where += f" AND {distance} <= %(max_distance)s"
+            params["max_distance"] = 1 - min_similarity
+        ef_search = min(max(ef_search or settings.VECTOR_HNSW_EF_SEARCH or 40, candidates), MAX_HNSW_EF_SEARCH)
+        probes = probes or settings.VECTOR_IVFFLAT_PROBES
+
+        sql = f"""
+        WITH hits AS (
+            SELECT p.parent_id, p.position, p.title, p.content, 1 - ({distance}) AS similarity
+            FROM {self.passages_table} p JOIN {self.table} d ON d.id = p.parent_id
+            WHERE {where}
+            ORDER BY {indexed}
+            LIMIT %(candidates)s
+        ),
+        ranked AS (
+            SELECT *, row_number() OVER (PARTITION BY parent_id ORDER BY similarity DESC) AS rank
+            FROM hits
+        )
+        SELECT d.id, d.metadata, max(r.similarity) AS similarity,
+               json_agg(json_build_object(
+                   'position', r.position, 'title', r.title, 'content', r.content, 'similarity', r.similarity
+               ) ORDER BY r.similarity DESC) AS passages
+        FROM ranked r JOIN {self.table} d ON d.id = r.parent_id
+        WHERE r.rank <= %(per_parent)s
+        GROUP BY d.id
+        ORDER BY max(r.similarity) DESC
+        LIMIT %(limit)s;
+        """
+
+        def operation(conn):
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL hnsw.ef_search = %s", (int(ef_search),))
+                if probes:
+                    cur.execute("SET LOCAL ivfflat.probes = %s", (int(probes),))
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+            conn.commit()
+            return rows
+
+        return [
+            {"id": row[0], "metadata": row[1], "similarity": float(row[2]), "passages": row[3]}
+            for row in self._run(operation)
+        ]
+
+    def export_chunks(self, kind: str = "documents", chunk_rows: int = 10_000) -> Iterator[tuple[List[Dict[str, Any]], np.ndarray]]:
+        """
+        Stream every document or passage row as (records, float32 embedding
+        matrix) chunks of up to `chunk_rows`, through a server-side cursor.
+        """
+        columns = BULK_COLUMNS[kind]
+        table = self.table if kind == "documents" else self.passages_table
+        select = ", ".join(f"{c}::text" if c in ("id", "parent_id") else c for c in columns)
+        with self.connection() as conn:
+            with conn.cursor(name=f"export_{table}") as cur:
+                cur.itersize = chunk_rows
+                cur.execute(f"SELECT {select}, embedding FROM {table}")
+                while rows := cur.fetchmany(chunk_rows):
+                    records = [dict(zip(columns, row[:-1])) for row in rows]
+                    yield records, np.stack([np.asarray(row[-1], dtype=np.float32) for row in rows])
+            conn.commit()
+
+    def bulk_load(self, kind: str, records: List[Dict[str, Any]], embeddings: np.ndarray) -> int:
+        """
+        Upsert a chunk of document or passage rows with binary COPY into a
+        staging table, then one INSERT ... ON CONFLICT. Load documents before
+        their passages. Returns the number of rows loaded.
+        """
+        if not records:
+            return 0
+        columns = BULK_COLUMNS[kind]
+        table = self.table if kind == "documents" else self.passages_table
+        column_list = ", ".join((*columns, "embedding"))
+        # Document rows are stamped with this table's embedding version as they are inserted
+        targets, values, params = [*columns, "embedding"], [*columns, "embedding"], None
+        if kind == "documents":
+            targets.append("embedding_model")
+            values.append("%s")
+            params = (self.version.key,)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in targets if c != "id")
+        data = _copy_binary(kind, records, embeddings)
+
+        def operation(conn):
+            data.seek(0)
+            with conn.cursor() as cur:
+                cur.execute(f"CREATE TEMP TABLE bulk_stage (LIKE {table}) ON COMMIT DROP")
+                cur.copy_expert(f"COPY bulk_stage ({column_list}) FROM STDIN WITH (FORMAT binary)", data)
+                cur.execute(
+                    f"INSERT INTO {table} ({', '.join(targets)}) SELECT {', '.join(values)} FROM bulk_stage "
+                    f"ON CONFLICT (id) DO UPDATE SET {updates}",
+                    params
+                )
+            conn.commit()
+
+        self._run(operation)
+        search_cache.invalidate(self.table)
+        return len(records)
+
+    @contextmanager
+    def bulk_loading(self) -> Iterator[None]:
+        """
+        Drop the ANN indexes for the duration of a bulk load and build them once
+        afterwards, which is much faster than maintaining them row by row.
+        """
+        index_type = settings.VECTOR_INDEX_TYPE
+        if not index_type:
+            yield
+            return
+        passage_index = self._index_name(self._storage("full"), self.passages_table)
+
+        def drop_passage_index(conn):
+            with conn.cursor() as cur:
+                cur.execute(f"DROP INDEX IF EXISTS {passage_index}")
+            conn.commit()
+
+        def create_passage_index(conn):
+            with conn.cursor() as cur:
+                cur.execute(self._index_sql(index_type, storage="full", table=self.passages_table))
+            conn.commit()
+
+        self.drop_index()
+        self._run(drop_passage_index)
+        try:
+            yield
+        finally:
+            logger.info(f"Rebuilding {index_type} indexes on {self.table} after bulk load")
+            self.create_index(index_type)
+            self._run(create_passage_index)
+
+    def get_content_hashes(self, ids: List[str]) -> Dict[str, Optional[str]]:
+        """Stored content hash for each of `ids` that exists."""
+        if not ids:
+            return {}
+
+        def operation(conn):
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT id::text, content_hash FROM {self.table} WHERE id = ANY(%s::uuid[])", (list(ids),))
+                rows = cur.fetchall()
+            conn.commit()
+            return rows
+
+        return dict(self._run(operation))
+
+    def find_embeddings_by_hash(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """Existing embedding for each content hash already stored, so identical text is never re-embedded."""
+        if not hashes:
+            return {}
+
+        def operation(conn):
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"SELECT DISTINCT ON (content_hash) content_hash, embedding FROM {self.table} "
+                    f"WHERE content_hash = ANY(%s)",
+                    (list(hashes),)
+                )
+                rows = cur.fetchall()
+            conn.commit()
+            return rows
+
+        return {digest: [float(v) for v in embedding] for digest, embedding in self._run(operation)}
+
+    def update_metadata(self, doc_id: str, metadata: Dict[str, Any]):
+        """Replace a row's metadata without touching its embedding."""
+        def operation(conn):
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"UPDATE {self.table} SET metadata = %s WHERE id = %s",
+                    (json.dumps(metadata) if metadata else '{}', doc_id)
+                )
+            conn.commit()
+
+        self._run(operation)
+        search_cache.invalidate(self.table)
+
+    def update_content_hashes(self, hashes: Dict[str, str]):
+        """Set the content hash of rows stored before hashes were recorded ({id: hash})."""
+        if not hashes:
+            return
+
+        def operation(conn):
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    f"UPDATE {self.table} AS t SET content_hash = v.hash "
+                    f"FROM (VALUES %s) AS v (id, hash) WHERE t.id = v.id::uuid",
+                    list(hashes.items())
+                )
+            conn.commit()
+
+        self._run(operation)
+
+    def delete_documents(self, ids: List[str]) -> int:
+        """Delete documents (their passages cascade). Returns the number deleted."""
+        if not ids:
+            return 0
+
+        def operation(conn):
+            with conn.cursor() as cur:
+                cur.execute(f"DELETE FROM {self.table} WHERE id = ANY(%s::uuid[])", (list(ids),))
+                deleted = cur.rowcount
+            conn.commit()
+            return deleted
+
+        deleted = self._run(operation)
+        search_cache.invalidate(self.table)
+        return deleted
+
+def create_vector_client(
+    table: str = "content_embeddings",
+    backend: Optional[str] = None,
+    version: Optional[EmbeddingVersion] = None
+):
+    """
+    Vector store for VECTOR_BACKEND: `VectorDBClient` (pgvector) or `LocalVectorClient`.
+    Each embedding version (default: the pinned EMBEDDING_MODEL/EMBEDDING_DIMENSIONS)
+    lives in its own table, so versions can be stored side by side during a migration.
+    """
+    backend = backend or settings.VECTOR_BACKEND
+    version = version or EmbeddingVersion.current()
+    if backend == "local":
+        from .local_vectors import LocalVectorClient
+        return LocalVectorClient(table=version.table(table), version=version)
+    if backend != "pgvector":
+        raise ValueError(f"Unknown vector backend: {backend} (expected pgvector or local)")
+    return VectorDBClient(table=version.table(table), version=version)
 
 # Global instance
-vector_client = VectorDBClient()
+vector_client = create_vector_client()
+
+def _batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def split_passages(content: str) -> List[Section]:
+    """Passages for the passage index: sections and paragraphs packed to PASSAGE_MAX_TOKENS."""
+    return [section for section in split_chunks(content, settings.PASSAGE_MAX_TOKENS) if section.text.strip()]
+
+def _passage_embeddings(
+    parent_id: str,
+    passages: List[Section],
+    embeddings: Dict[str, List[float]]
+) -> List[PassageEmbedding]:
+    """Passage rows for a parent, with embeddings looked up by content hash."""
+    return [
+        PassageEmbedding(
+            id=passage_id(parent_id, position),
+            parent_id=parent_id,
+            position=position,
+            title=section.title,
+            content=section.text,
+            embedding=embeddings[content_hash(section.text)]
+        )
+        for position, section in enumerate(passages)
+    ]
 
 class VectorService:
     """High-level service for vector operations (embedding + storage)."""
     
-    def __init__(self):
-        self.client = vector_client
-        self.openai = OpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(self, client: Optional[Any] = None, priority: int = 0):
+        self.client = client or vector_client
+        # Embeddings always match the client's table version
+        self.version: EmbeddingVersion = self.client.version
+        # Scheduler priority for embedding calls (background jobs run below interactive work)
+        self.priority = priority
+        self.openai = get_embedding_client()
+
+    def _cache_namespace(self) -> str:
+        return embedding_namespace(embedding_provider(), self.version.key)
 
     def embed_text(self, text: str) -> list[float]:
-        """Generate embedding for text using OpenAI."""
+        """Generate embedding for text using OpenAI (cached by content hash)."""
+        if settings.EMBEDDING_CACHE_ENABLED:
+            return embedding_cache.get_or_embed(self._cache_namespace(), text, self._embed_text)
+        return self._embed_text(text)
+
+    def _embed_text(self, text: str) -> list[float]:
         response = self.openai.embeddings.create(
             input=text,
-            model="text-embedding-3-small"
+            model=self.version.model,
+            **self.version.request_options()
         )
         return response.data[0].embedding
 
-    def upsert_policy(self, content: str, metadata: dict[str, Any]) -> str:
-        """Generate embedding and save to DB."""
-        embedding = self.embed_text(content)
-        doc_id = generate_uuid()
-        
+    async def aembed_texts(self, texts: List[str]) -> List[list[float]]:
+        """Embed many texts, requesting only cache misses in one call within the shared rate limit."""
+        if settings.EMBEDDING_CACHE_ENABLED:
+            return await embedding_cache.aget_or_embed_many(self._cache_namespace(), texts, self._aembed_texts)
+        return await self._aembed_texts(texts)
+
+    async def _aembed_texts(self, texts: List[str]) -> List[list[float]]:
+        provider = embedding_provider()
+        model = self.version.model
+        options = self.version.request_options()
+
+        async def embed_batch(batch: List[str]) -> List[list[float]]:
+            response = await llm_scheduler.submit(
+                provider,
+                model,
+                lambda: run_blocking(self.openai.embeddings.create, input=batch, model=model, **options),
+                estimated_tokens=sum(estimate_tokens(t) for t in batch),
+                priority=self.priority
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+        # Passages can push a batch past the per-request input limit
+        batches = await asyncio.gather(*(embed_batch(b) for b in _batched(texts, settings.EMBEDDING_BATCH_SIZE)))
+        return [embedding for batch in batches for embedding in batch]
+
+    @staticmethod
+    def document_key(content: str, metadata: Dict[str, Any]) -> str:
+        """
+        Logical document key: the GOV.UK `content_id`, `base_path` or `url` from
+        the metadata, falling back to the content hash (content-addressed).
+        """
+        for field in ("content_id", "base_path", "url"):
+            if metadata.get(field):
+                return f"{field}:{metadata[field]}"
+        return f"sha256:{content_hash(content)}"
+
+    def upsert_policy(self, content: str, metadata: dict[str, Any], key: Optional[str] = None) -> str:
+        """
+        Embed and save a document under a deterministic id.
+        Re-saving unchanged content only refreshes its metadata; changed content
+        for the same key is updated in place.
+        """
+        digest = content_hash(content)
+        doc_id = document_id(key or self.document_key(content, metadata))
+        if (
+            self.client.get_content_hashes([doc_id]).get(doc_id) == digest
+            and not self.client.ids_without_passages([doc_id])
+        ):
+            logger.info(f"Content unchanged for {doc_id}; skipping embedding")
+            self.client.update_metadata(doc_id, metadata)
+            return doc_id
+
+        embedding = self.client.find_embeddings_by_hash([digest]).get(digest) or self.embed_text(content)
         item = ContentEmbedding(
             id=doc_id,
             content=content,
+            content_hash=digest,
             embedding=embedding,
             metadata=metadata,
             created_at=datetime.utcnow()
         )
         
         self.client.save_embedding(item)
+
+        # A document that fits in one passage reuses its own embedding
+        passages = split_passages(content)
+        embeddings = {digest: embedding}
+        for section in passages:
+            passage_digest = content_hash(section.text)
+            if passage_digest not in embeddings:
+                embeddings[passage_digest] = self.embed_text(section.text)
+        self.client.save_passages(_passage_embeddings(doc_id, passages, embeddings))
         return doc_id
 
+    async def _ingest_batch(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """Store one batch with its passages, embedding only content that is new or changed."""
+        keyed = []
+        for doc in documents:
+            metadata = doc.get("metadata") or {}
+            key = doc.get("key") or self.document_key(doc["content"], metadata)
+            keyed.append((doc.get("id") or document_id(key), content_hash(doc["content"]), doc, metadata))
+
+        ids = [doc_id for doc_id, *_ in keyed]
+        stored = await self.client.aget_content_hashes(ids)
+        unindexed = set(await self.client.aids_without_passages(ids))
+        changed = [entry for entry in keyed if stored.get(entry[0]) != entry[1] or entry[0] in unindexed]
+        if changed:
+            hashes = list({digest for _, digest, _, _ in changed})
+            embeddings = await self.client.afind_embeddings_by_hash(hashes)
+            texts = {digest: doc["content"] for _, digest, doc, _ in changed}
+            passages = {doc_id: split_passages(doc["content"]) for doc_id, _, doc, _ in changed}
+            for sections in passages.values():
+                texts.update((content_hash(section.text), section.text) for section in sections)
+            # Documents and passages share one embedding pass; identical text is embedded once
+            missing = [digest for digest in texts if digest not in embeddings]
+            if missing:
+                embeddings.update(zip(missing, await self.aembed_texts([texts[d] for d in missing])))
+
+            now = datetime.utcnow()
+            await self.client.asave_embeddings([
+                ContentEmbedding(
+                    id=doc_id,
+                    content=doc["content"],
+                    content_hash=digest,
+                    embedding=embeddings[digest],
+                    metadata=metadata,
+                    created_at=doc.get("created_at") or now
+                )
+                for doc_id, digest, doc, metadata in changed
+            ])
+            await self.client.asave_passages([
+                passage
+                for doc_id, sections in passages.items()
+                for passage in _passage_embeddings(doc_id, sections, embeddings)
+            ])
+        logger.info(f"Ingested batch: {len(changed)} of {len(keyed)} documents new or changed")
+        return [doc_id for doc_id, *_ in keyed]
+
+    async def ingest(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> AsyncIterator[List[str]]:
+        """
+        Embed and store a stream of documents ({"content", "metadata", optional
+        "key" or "id", optional "created_at"}).
+
+        Documents are read lazily in batches of `batch_size`: one embeddings
+        request and one upsert transaction per batch. Up to `concurrency` batches
+        are in flight, so memory stays constant however long the stream is.
+        Unchanged documents are skipped and identical text reuses a stored embedding.
+        Yields the ids of each stored batch, in input order.
+        """
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        concurrency = concurrency or settings.EMBEDDING_MAX_CONCURRENCY
+        pending: deque[asyncio.Task] = deque()
+        try:
+            for batch in _batched(documents, batch_size):
+                pending.append(asyncio.create_task(self._ingest_batch(batch)))
+                if len(pending) >= concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
 # Service instance
 vector_service = VectorService()
@@ -42,8 +42,10 @@ with tab1:
         else:
             with st.spinner("Embedding and Indexing..."):
                 try:
+                    # Keyed by department + topic, so re-saving a policy updates it in place
                     doc_id = vector_service.upsert_policy(
                         content=content,
+                        key=f"{department}:{topic}",
                         metadata={
                             "department": department,
                             "topic": topic,
@@ -62,10 +64,10 @@ with tab2:
     search_query = st.text_input("Search Policies", placeholder="Search by topic or content...")
     
     if search_query:
-        # Vector search
+        # Hybrid search: semantic matches fused with keyword matches on the query
         try:
             embedding = vector_service.embed_text(search_query)
-            results = vector_client.search_similar(embedding, limit=10)
+            results = vector_client.search_similar(embedding, limit=10, query_text=search_query)
             
             for res in results:
                 meta = res.get("metadata", {})
@@ -0,0 +1,35 @@
+from typing import Any, Dict, Iterable
+
+from ..storage.models import AgentTelemetry
+
+COUNTERS = (
+    "queue_wait_seconds",
+    "backoff_seconds",
+    "provider_latency_seconds",
+    "total_seconds",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "retries",
+    "parse_failures",
+)
+
+def _rollup(items: list[AgentTelemetry]) -> Dict[str, Any]:
+    totals: Dict[str, Any] = {name: sum(getattr(t, name) for t in items) for name in COUNTERS}
+    totals["calls"] = len(items)
+    totals["cache_hits"] = sum(1 for t in items if t.cache_hit)
+    return totals
+
+def summarize_telemetry(items: Iterable[AgentTelemetry]) -> Dict[str, Any]:
+    """
+    Roll up agent telemetry for a graph run: overall totals plus the same
+    counters per agent, so the slowest or most expensive agent stands out.
+    """
+    items = list(items)
+    by_agent: Dict[str, list[AgentTelemetry]] = {}
+    for item in items:
+        by_agent.setdefault(item.agent_name, []).append(item)
+    return {
+        "total": _rollup(items),
+        "agents": {name: _rollup(group) for name, group in sorted(by_agent.items())}
+    }
@@ -0,0 +1,92 @@
+"""
+Text splitting shared by the review graph and the passage index: sections at
+markdown headings or GOV.UK guide part markers, and token-bounded chunks.
+"""
+import hashlib
+import re
+from typing import List, NamedTuple
+from ..llm.scheduler import estimate_tokens
+
+# Markdown headings ("## Eligibility") and GOV.UK guide part markers ("--- Part: Fuel Duty ---")
+SECTION_BOUNDARY = re.compile(r"^(?:#{1,6}\s+(?P<heading>.+?)\s*#*|---\s*Part:\s*(?P<part>.+?)\s*---)\s*$", re.MULTILINE)
+
+class Section(NamedTuple):
+    """A reviewable slice of a document."""
+    title: str
+    text: str
+    hash: str
+
+def hash_text(text: str) -> str:
+    """Content hash that ignores whitespace-only edits."""
+    normalised = " ".join(text.split())
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+def split_sections(content: str) -> List[Section]:
+    """
+    Split content at markdown headings or GOV.UK guide part markers.
+    Text before the first boundary becomes an "Introduction" section.
+    Content with no boundaries is returned as a single section, unchanged.
+    """
+    matches = list(SECTION_BOUNDARY.finditer(content))
+    if not matches:
+        return [Section(title="Document", text=content, hash=hash_text(content))]
+
+    sections = []
+    preamble = content[:matches[0].start()]
+    if preamble.strip():
+        sections.append(Section(title="Introduction", text=preamble.strip(), hash=hash_text(preamble)))
+
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        text = content[match.start():end].strip()
+        title = (match.group("heading") or match.group("part")).strip()
+        sections.append(Section(title=title, text=text, hash=hash_text(text)))
+    return sections
+
+def _split_paragraph(paragraph: str, max_chars: int) -> List[str]:
+    """Split an oversized paragraph at sentence boundaries, falling back to hard cuts."""
+    pieces: List[str] = []
+    current = ""
+    for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_chunks(content: str, max_tokens: int) -> List[Section]:
+    """
+    Split content into sections, then split any section over `max_tokens`
+    into paragraph-packed chunks titled "<section> (i/n)".
+    """
+    max_chars = max_tokens * 4
+    chunks: List[Section] = []
+    for section in split_sections(content):
+        if estimate_tokens(section.text) <= max_tokens:
+            chunks.append(section)
+            continue
+
+        parts: List[str] = []
+        current = ""
+        for paragraph in re.split(r"\n\s*\n", section.text):
+            for piece in _split_paragraph(paragraph, max_chars) if len(paragraph) > max_chars else [paragraph]:
+                if current and len(current) + len(piece) + 2 > max_chars:
+                    parts.append(current)
+                    current = piece
+                else:
+                    current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            parts.append(current)
+
+        for i, part in enumerate(parts, start=1):
+            chunks.append(Section(title=f"{section.title} ({i}/{len(parts)})", text=part, hash=hash_text(part)))
+    return chunks
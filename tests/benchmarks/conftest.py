@@ -0,0 +1,71 @@
+"""
+Performance benchmarks. Skipped unless RUN_BENCHMARKS=1.
+
+    RUN_BENCHMARKS=1 uv run pytest tests/benchmarks
+
+Results are written as JSON to BENCHMARK_OUTPUT (default benchmark_results.json)
+so regressions can be tracked between runs.
+"""
+import json
+import os
+import platform
+from datetime import datetime, timezone
+import pytest
+
+_results: list[dict] = []
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get("RUN_BENCHMARKS") == "1":
+        return
+    skip = pytest.mark.skip(reason="Benchmarks only run with RUN_BENCHMARKS=1")
+    for item in items:
+        if "benchmarks" in str(item.fspath):
+            item.add_marker(skip)
+
+@pytest.fixture(scope="session")
+def record_benchmark():
+    """Record a benchmark result: record_benchmark(name, params, metrics)."""
+    def record(name: str, params: dict, metrics: dict):
+        _results.append({"name": name, "params": params, "metrics": metrics})
+    return record
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _results:
+        return
+    output = os.environ.get("BENCHMARK_OUTPUT", "benchmark_results.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "results": _results
+        }, f, indent=2)
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    Route the graph's agents to the offline simulator with a fixed latency,
+    and stub the knowledge base so no database is needed.
+    """
+    from unittest.mock import AsyncMock, MagicMock
+    from govuk_content_agents.config import settings
+    from govuk_content_agents.orchestration import graph
+
+    latency = float(os.environ.get("BENCHMARK_LLM_LATENCY", "0.05"))
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "fake")
+    monkeypatch.setattr(settings, "FAKE_LLM_LATENCY", "constant")
+    monkeypatch.setattr(settings, "FAKE_LLM_LATENCY_MEAN", latency)
+
+    agents = [graph.content_agent, graph.style_agent, graph.consistency_agent, graph.improvement_agent, graph.judge_agent]
+    for agent in agents:
+        agent.select_provider()
+
+    vector_db = MagicMock()
+    vector_db.asearch_similar = AsyncMock(return_value=[])
+    vector_db.asearch_passages = AsyncMock(return_value=[])
+    monkeypatch.setattr(graph.consistency_agent, "vector_db", vector_db)
+
+    yield latency
+
+    monkeypatch.undo()
+    for agent in agents:
+        agent.select_provider()
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+import pytest
+from unittest.mock import patch, MagicMock
+from govuk_content_agents.orchestration.graph import app
+from govuk_content_agents.utils.stats import latency_summary
+
+ROOT = Path(__file__).resolve().parents[2]
+
+def guide_text() -> str:
+    """tax_shopping.json flattened the same way the Content API fetcher does."""
+    from govuk_content_agents.utils.web import fetch_content_from_govuk_api
+    data = json.loads((ROOT / "tax_shopping.json").read_text())
+    response = MagicMock()
+    response.json.return_value = data
+    with patch("govuk_content_agents.utils.web.requests.get", return_value=response):
+        return fetch_content_from_govuk_api("/tax-on-shopping")
+
+def initial_state(content: str, max_iterations: int = 2) -> dict:
+    return {
+        "input_content": content,
+        "current_content": content,
+        "feedback": [],
+        "iteration": 0,
+        "max_iterations": max_iterations,
+        "metadata": {}
+    }
+
+@pytest.mark.asyncio
+async def test_graph_latency_per_iteration_and_node(fake_llm, record_benchmark):
+    """End-to-end latency of one document, broken down by node and iteration."""
+    start = time.perf_counter()
+    final_state = await app.ainvoke(initial_state(guide_text()))
+    total = time.perf_counter() - start
+
+    per_node: dict[str, list[float]] = {}
+    per_iteration: dict[int, float] = {}
+    for timing in final_state["timings"]:
+        per_node.setdefault(timing["node"], []).append(timing["seconds"])
+        per_iteration[timing["iteration"]] = per_iteration.get(timing["iteration"], 0.0) + timing["seconds"]
+
+    record_benchmark(
+        "graph.latency",
+        {"llm_latency": fake_llm, "document": "tax_shopping"},
+        {
+            "total_seconds": total,
+            "iterations": final_state["iteration"],
+            "node_seconds": {node: sum(values) for node, values in per_node.items()},
+            "iteration_node_seconds": per_iteration
+        }
+    )
+    assert final_state["final_decision"] in ("pass", "fail")
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [1, 8, 64])
+async def test_graph_throughput(fake_llm, record_benchmark, concurrency):
+    """Documents per second with N documents reviewed concurrently."""
+    documents = [f"## Document {i}\nIt is imperative that you facilitate the submission of form {i}." for i in range(concurrency)]
+    latencies: list[float] = []
+
+    async def review(content: str):
+        start = time.perf_counter()
+        await app.ainvoke(initial_state(content))
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(review(d) for d in documents))
+    elapsed = time.perf_counter() - start
+
+    record_benchmark(
+        "graph.throughput",
+        {"llm_latency": fake_llm, "concurrency": concurrency},
+        {"elapsed_seconds": elapsed, "documents_per_second": concurrency / elapsed, "latency_seconds": latency_summary(latencies)}
+    )
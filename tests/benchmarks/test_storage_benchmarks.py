@@ -0,0 +1,177 @@
+import os
+import time
+from datetime import datetime
+import numpy as np
+import pytest
+from govuk_content_agents.storage.models import ContentEmbedding, generate_uuid
+from govuk_content_agents.storage.vectors import VectorDBClient
+from govuk_content_agents.utils.stats import latency_summary
+
+# Comma-separated row counts, e.g. "1000,100000,1000000"
+ROW_COUNTS = [int(n) for n in os.environ.get("BENCHMARK_VECTOR_ROWS", "1000").split(",")]
+DIMENSIONS = 1536
+
+def random_vectors(rng: np.random.Generator, n: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, DIMENSIONS), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+@pytest.fixture(params=ROW_COUNTS, ids=lambda n: f"{n}_rows")
+def seeded_client(request):
+    """A throwaway table filled with `n` random embeddings."""
+    from psycopg2.extras import execute_values
+    n = request.param
+    client = VectorDBClient(table=f"bench_embeddings_{n}")
+    try:
+        client.connect()
+    except Exception as e:
+        pytest.skip(f"PostgreSQL not available: {e}")
+
+    rng = np.random.default_rng(0)
+    with client.connection() as conn, conn.cursor() as cur:
+        cur.execute(f"TRUNCATE {client.table}")
+        for start in range(0, n, 10_000):
+            batch = random_vectors(rng, min(10_000, n - start))
+            execute_values(
+                cur,
+                f"INSERT INTO {client.table} (id, content, embedding, metadata, created_at) VALUES %s",
+                [(generate_uuid(), f"Document {start + i}", v, "{}", datetime.utcnow()) for i, v in enumerate(batch)]
+            )
+        conn.commit()
+
+    yield client, n, rng
+
+    with client.connection() as conn, conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {client.table}")
+        conn.commit()
+    client.close()
+
+def test_search_similar(seeded_client, record_benchmark):
+    client, n, rng = seeded_client
+    durations = []
+    for query in random_vectors(rng, 50):
+        start = time.perf_counter()
+        client.search_similar(query.tolist(), limit=5)
+        durations.append(time.perf_counter() - start)
+    record_benchmark("vectors.search_similar", {"rows": n, "limit": 5}, latency_summary(durations))
+
+def test_save_embedding(seeded_client, record_benchmark):
+    client, n, rng = seeded_client
+    durations = []
+    for vector in random_vectors(rng, 50):
+        item = ContentEmbedding(content="Benchmark row", embedding=vector.tolist())
+        start = time.perf_counter()
+        client.save_embedding(item)
+        durations.append(time.perf_counter() - start)
+    record_benchmark("vectors.save_embedding", {"rows": n}, latency_summary(durations))
+
+def test_concurrent_search(seeded_client, record_benchmark):
+    """Searches from several threads share the pool instead of one socket."""
+    from concurrent.futures import ThreadPoolExecutor
+    client, n, rng = seeded_client
+    queries = [q.tolist() for q in random_vectors(rng, 64)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=client.max_connections) as pool:
+        list(pool.map(lambda q: client.search_similar(q, limit=5), queries))
+    elapsed = time.perf_counter() - start
+    record_benchmark(
+        "vectors.search_similar_concurrent",
+        {"rows": n, "threads": client.max_connections},
+        {"count": len(queries), "seconds": elapsed, "per_second": len(queries) / elapsed}
+    )
+
+@pytest.mark.parametrize(("index_type", "knob", "values"), [
+    ("hnsw", "ef_search", [10, 40, 100, 200]),
+    ("ivfflat", "probes", [1, 5, 10, 20]),
+])
+def test_index_recall_vs_latency(seeded_client, record_benchmark, index_type, knob, values):
+    """Recall@10 against an exact scan, and latency, for each query-time setting."""
+    client, n, rng = seeded_client
+    limit = 10
+    queries = [q.tolist() for q in random_vectors(rng, 20)]
+
+    client.drop_index()
+    exact = [{row["id"] for row in client.search_similar(q, limit=limit)} for q in queries]
+
+    start = time.perf_counter()
+    client.create_index(index_type, lists=max(1, n // 1000))
+    build_seconds = time.perf_counter() - start
+
+    try:
+        for value in values:
+            durations, recalls = [], []
+            for query, truth in zip(queries, exact):
+                start = time.perf_counter()
+                found = client.search_similar(query, limit=limit, **{knob: value})
+                durations.append(time.perf_counter() - start)
+                recalls.append(len(truth & {row["id"] for row in found}) / len(truth))
+            record_benchmark(
+                "vectors.ann_search",
+                {"rows": n, "index": index_type, knob: value, "limit": limit},
+                {**latency_summary(durations), "recall": sum(recalls) / len(recalls), "build_seconds": build_seconds}
+            )
+    finally:
+        client.drop_index()
+
+@pytest.mark.parametrize("n", ROW_COUNTS, ids=lambda n: f"{n}_rows")
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_local_backend_search(tmp_path, record_benchmark, n, dtype):
+    """In-process NumPy store: search latency and agreement with an exact float32 scan."""
+    from govuk_content_agents.storage.local_vectors import LocalVectorClient
+    rng = np.random.default_rng(0)
+    vectors = random_vectors(rng, n)
+    client = LocalVectorClient(table=f"bench_{dtype}", path=str(tmp_path), dtype=dtype)
+    for start in range(0, n, 10_000):
+        client.save_embeddings([
+            ContentEmbedding(id=f"doc-{start + i}", content=f"Document {start + i}", embedding=v.tolist())
+            for i, v in enumerate(vectors[start:start + 10_000])
+        ])
+
+    durations, overlaps = [], []
+    for query in random_vectors(rng, 50):
+        start = time.perf_counter()
+        found = client.search_similar(query.tolist(), limit=10)
+        durations.append(time.perf_counter() - start)
+        exact = {f"doc-{i}" for i in np.argsort(-(vectors @ query))[:10]}
+        overlaps.append(len(exact & {row["id"] for row in found}) / 10)
+    client.close()
+
+    record_benchmark(
+        "vectors.local_search",
+        {"rows": n, "dtype": dtype, "limit": 10},
+        {**latency_summary(durations), "recall": sum(overlaps) / len(overlaps)}
+    )
+
+@pytest.mark.parametrize("storage", ["full", "halfvec", "reduced", "binary"])
+def test_storage_mode_size_latency_recall(seeded_client, record_benchmark, storage):
+    """HNSW index size, query latency and recall@10 (after exact re-ranking) per storage mode."""
+    client, n, rng = seeded_client
+    limit = 10
+    queries = [q.tolist() for q in random_vectors(rng, 20)]
+
+    for mode in ("full", "halfvec", "reduced", "binary"):
+        client.drop_index(mode)
+    exact = [{row["id"] for row in client.search_similar(q, limit=limit)} for q in queries]
+
+    start = time.perf_counter()
+    client.create_index("hnsw", storage=storage)
+    build_seconds = time.perf_counter() - start
+
+    try:
+        durations, recalls = [], []
+        for query, truth in zip(queries, exact):
+            start = time.perf_counter()
+            found = client.search_similar(query, limit=limit, storage=storage)
+            durations.append(time.perf_counter() - start)
+            recalls.append(len(truth & {row["id"] for row in found}) / len(truth))
+        record_benchmark(
+            "vectors.storage_mode",
+            {"rows": n, "storage": storage, "limit": limit},
+            {
+                **latency_summary(durations),
+                "recall": sum(recalls) / len(recalls),
+                "index_bytes": client.index_size(storage),
+                "build_seconds": build_seconds
+            }
+        )
+    finally:
+        client.drop_index(storage)
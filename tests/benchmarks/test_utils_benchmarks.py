@@ -0,0 +1,46 @@
+import json
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from govuk_content_agents.utils.analytics import analyze_tone, generate_diff_html
+from govuk_content_agents.utils.stats import latency_summary
+from govuk_content_agents.utils.web import fetch_content_from_govuk_api
+
+ROOT = Path(__file__).resolve().parents[2]
+
+def timed_runs(func, repeat: int) -> list[float]:
+    """Call func() `repeat` times and return the durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def load_guide() -> dict:
+    return json.loads((ROOT / "tax_shopping.json").read_text())
+
+def guide_text() -> str:
+    response = MagicMock()
+    response.json.return_value = load_guide()
+    with patch("govuk_content_agents.utils.web.requests.get", return_value=response):
+        return fetch_content_from_govuk_api("/tax-on-shopping")
+
+def test_fetch_govuk_api_parsing(record_benchmark):
+    """Parsing tax_shopping.json (network stubbed out)."""
+    response = MagicMock()
+    response.json.return_value = load_guide()
+    with patch("govuk_content_agents.utils.web.requests.get", return_value=response):
+        durations = timed_runs(lambda: fetch_content_from_govuk_api("/tax-on-shopping"), repeat=20)
+    record_benchmark("web.fetch_content_from_govuk_api", {"document": "tax_shopping"}, latency_summary(durations))
+
+def test_analyze_tone_large_document(record_benchmark):
+    text = guide_text() * 10
+    durations = timed_runs(lambda: analyze_tone(text), repeat=5)
+    record_benchmark("analytics.analyze_tone", {"characters": len(text)}, latency_summary(durations))
+
+def test_generate_diff_html_large_document(record_benchmark):
+    original = guide_text() * 10
+    revised = original.replace("VAT", "Value Added Tax")
+    durations = timed_runs(lambda: generate_diff_html(original, revised), repeat=3)
+    record_benchmark("analytics.generate_diff_html", {"characters": len(original)}, latency_summary(durations))
@@ -53,3 +53,132 @@ async def test_graph_execution_flow():
         m_const.assert_called()
         m_improv.assert_called()
         m_judge.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_reviewers_run_in_parallel():
+    """One iteration should cost max(reviewers), not sum(reviewers)."""
+    import asyncio
+    import time
+
+    def slow(name, delay, **extra):
+        async def run(*args, **kwargs):
+            await asyncio.sleep(delay)
+            return AgentFeedback(agent_name=name, summary="Ok", score=90, **extra)
+        return run
+
+    with patch("govuk_content_agents.orchestration.graph.content_agent.execute", side_effect=slow("Content", 0.3)), \
+         patch("govuk_content_agents.orchestration.graph.style_agent.execute", side_effect=slow("Style", 0.3)), \
+         patch("govuk_content_agents.orchestration.graph.consistency_agent.execute", side_effect=slow("Consistency", 0.3)), \
+         patch("govuk_content_agents.orchestration.graph.improvement_agent.execute", side_effect=slow("Improver", 0, rewritten_content="Better")), \
+         patch("govuk_content_agents.orchestration.graph.judge_agent.execute", side_effect=slow("Judge", 0)):
+
+        initial_state = {
+            "input_content": "Draft content",
+            "current_content": "Draft content",
+            "feedback": [],
+            "iteration": 0,
+            "max_iterations": 1,
+            "metadata": {}
+        }
+
+        start = time.perf_counter()
+        final_state = await app.ainvoke(initial_state)
+        elapsed = time.perf_counter() - start
+
+        # Sequential reviewers would take 0.9s
+        assert elapsed < 0.6
+
+        review_timings = [t for t in final_state["timings"] if t["node"].startswith("review_")]
+        assert len(review_timings) == 3
+        assert all(t["seconds"] >= 0.3 for t in review_timings)
+        assert {f.agent_name for f in final_state["feedback"]} >= {"Content", "Style", "Consistency"}
+
+
+@pytest.mark.asyncio
+async def test_improvement_prompt_stays_flat_across_iterations():
+    """Feedback from earlier iterations must not be re-sent to the improver."""
+    import json
+
+    issues = [{"severity": "high", "description": "Needs work", "suggestion": "Fix it"}]
+    improver_contexts = []
+
+    async def improve(content, context=None):
+        improver_contexts.append(context)
+        return AgentFeedback(agent_name="Improver", summary="Fixed", rewritten_content=content)
+
+    with patch("govuk_content_agents.orchestration.graph.content_agent.execute", new_callable=AsyncMock) as m_content, \
+         patch("govuk_content_agents.orchestration.graph.style_agent.execute", new_callable=AsyncMock) as m_style, \
+         patch("govuk_content_agents.orchestration.graph.consistency_agent.execute", new_callable=AsyncMock) as m_const, \
+         patch("govuk_content_agents.orchestration.graph.improvement_agent.execute", side_effect=improve), \
+         patch("govuk_content_agents.orchestration.graph.judge_agent.execute", new_callable=AsyncMock) as m_judge:
+
+        m_content.return_value = AgentFeedback(agent_name="Content", summary="Ok", score=60, issues=issues)
+        m_style.return_value = AgentFeedback(agent_name="Style", summary="Ok", score=60, issues=issues)
+        m_const.return_value = AgentFeedback(agent_name="Consistency", summary="Ok", score=60, issues=issues)
+        m_judge.return_value = AgentFeedback(agent_name="Judge", summary="Fail", score=50)
+
+        initial_state = {
+            "input_content": "Draft content",
+            "current_content": "Draft content",
+            "feedback": [],
+            "iteration": 0,
+            "max_iterations": 3,
+            "metadata": {}
+        }
+
+        final_state = await app.ainvoke(initial_state)
+
+        assert final_state["iteration"] == 3
+        # Each judge run is timed under the iteration it scored, like the improve run before it
+        timings = final_state["timings"]
+        assert [t["iteration"] for t in timings if t["node"] == "improve"] == [0, 1, 2]
+        assert [t["iteration"] for t in timings if t["node"] == "judge"] == [0, 1, 2]
+        assert len(improver_contexts) == 3
+        sizes = {len(json.dumps(c)) for c in improver_contexts}
+        assert len(sizes) == 1
+        assert len(final_state["feedback"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_only_changed_sections_are_re_reviewed():
+    """After a rewrite, reviewers only see sections whose content changed."""
+    draft = "## Eligibility\nYou can apply if you are over 18.\n\n## How to apply\nIt is imperative that you facilitate the form."
+    rewritten = draft.replace("It is imperative that you facilitate the form.", "Fill in the form.")
+
+    async def review(content, context=None):
+        return AgentFeedback(
+            agent_name="Content",
+            summary="Ok",
+            score=60,
+            issues=[{"severity": "high", "description": f"Issue in {context['section']}"}]
+        )
+
+    with patch("govuk_content_agents.orchestration.graph.content_agent.execute", side_effect=review) as m_content, \
+         patch("govuk_content_agents.orchestration.graph.style_agent.execute", side_effect=review), \
+         patch("govuk_content_agents.orchestration.graph.consistency_agent.execute", side_effect=review), \
+         patch("govuk_content_agents.orchestration.graph.improvement_agent.execute", new_callable=AsyncMock) as m_improv, \
+         patch("govuk_content_agents.orchestration.graph.judge_agent.execute", new_callable=AsyncMock) as m_judge:
+
+        m_improv.return_value = AgentFeedback(agent_name="Improver", summary="Fixed", rewritten_content=rewritten)
+        m_judge.return_value = AgentFeedback(agent_name="Judge", summary="Fail", score=50)
+
+        initial_state = {
+            "input_content": draft,
+            "current_content": draft,
+            "feedback": [],
+            "iteration": 0,
+            "max_iterations": 2,
+            "metadata": {}
+        }
+
+        final_state = await app.ainvoke(initial_state)
+
+        reviewed = [c.args[0] for c in m_content.call_args_list]
+        # Two sections on the first pass, only the rewritten one on the second
+        assert len(reviewed) == 3
+        assert "Fill in the form." in reviewed[2]
+
+        # Carried-forward feedback still covers both sections
+        content_feedback = next(f for f in final_state["feedback"] if f.agent_name == "Content")
+        assert {i["section"] for i in content_feedback.issues} == {"Eligibility", "How to apply"}
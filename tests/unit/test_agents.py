@@ -1,3 +1,5 @@
+import asyncio
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 from govuk_content_agents.agents.content_reviewer import ContentReviewerAgent
@@ -11,7 +13,7 @@ async def test_content_reviewer_execution_openai():
     mock_response.choices[0].message.content = '{"summary": "Test", "score": 80, "issues": []}'
     mock_openai.chat.completions.create.return_value = mock_response
 
-    with patch("govuk_content_agents.agents.base.OpenAI", return_value=mock_openai):
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai):
         agent = ContentReviewerAgent()  # defaults to gpt-4o-mini
         result = await agent.execute("Test content")
         
@@ -33,10 +35,36 @@ async def test_agent_json_parsing_error_openai():
     mock_response.choices[0].message.content = 'Invalid JSON'
     mock_openai.chat.completions.create.return_value = mock_response
     
-    with patch("govuk_content_agents.agents.base.OpenAI", return_value=mock_openai):
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai):
         agent = ContentReviewerAgent()
         result = await agent.execute("Test content")
         
         # Should fallback to text summary
         assert result.summary == "Invalid JSON"
         assert result.issues == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_executions_overlap():
+    """N concurrent executions should take roughly as long as one, not N times as long."""
+
+    def slow_create(**kwargs):
+        time.sleep(0.2)
+        response = MagicMock()
+        response.choices[0].message.content = '{"summary": "Test", "score": 80, "issues": []}'
+        return response
+
+    mock_openai = MagicMock()
+    mock_openai.chat.completions.create.side_effect = slow_create
+
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai):
+        agents = [ContentReviewerAgent() for _ in range(8)]
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(agent.execute("Test content") for agent in agents))
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 8
+        assert all(r.score == 80 for r in results)
+        # Serial execution would take 8 * 0.2s = 1.6s
+        assert elapsed < 0.6
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from govuk_content_agents.orchestration.batch import BatchRunner, item_key, load_items, session_id
+from govuk_content_agents.storage.models import AgentFeedback
+
+def test_load_items_jsonl_and_csv(tmp_path):
+    jsonl = tmp_path / "items.jsonl"
+    jsonl.write_text('{"path": "/vat-rates"}\n\n{"text": "Some text"}\n')
+    csv_file = tmp_path / "items.csv"
+    csv_file.write_text("id,path,text\na,/tax-on-shopping,\nb,,Raw text\n")
+
+    assert [item_key(i) for i in load_items(str(jsonl))][0] == "/vat-rates"
+    assert list(load_items(str(csv_file))) == [{"id": "a", "path": "/tax-on-shopping"}, {"id": "b", "text": "Raw text"}]
+
+@pytest.mark.asyncio
+async def test_batch_resumes_and_reports(tmp_path):
+    """Completed items are skipped, the rest are reviewed, checkpointed and streamed."""
+    items = [{"id": f"doc-{i}", "text": f"Content {i}"} for i in range(5)]
+    output = tmp_path / "results.jsonl"
+
+    final_state = {
+        "current_content": "Better",
+        "final_score": 90,
+        "final_decision": "pass",
+        "iteration": 1,
+        "feedback": [AgentFeedback(agent_name="Judge", summary="Good", score=90)]
+    }
+
+    with patch("govuk_content_agents.orchestration.batch.graph_app.ainvoke", new_callable=AsyncMock) as m_graph, \
+         patch("govuk_content_agents.orchestration.batch.mongo_client") as m_mongo:
+        m_graph.return_value = final_state
+        m_mongo.completed_review_ids = AsyncMock(return_value={session_id("b1", "doc-0"), session_id("b1", "doc-1")})
+        # The runner updates one session in place, so record each status as it is saved
+        statuses = []
+        m_mongo.save_review = AsyncMock(side_effect=lambda session: statuses.append(session.status))
+
+        runner = BatchRunner(batch_id="b1", output_path=str(output), concurrency=2)
+        report = await runner.run(iter(items))
+
+    assert report["skipped"] == 2
+    assert report["completed"] == 3
+    assert report["latency_seconds"]["count"] == 3
+    assert m_graph.await_count == 3
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(r["source"] for r in records) == ["doc-2", "doc-3", "doc-4"]
+
+    assert sorted(statuses) == ["completed"] * 3 + ["reviewing"] * 3
+
+@pytest.mark.asyncio
+async def test_batch_finishes_when_checkpoints_fail(tmp_path):
+    """A checkpoint error fails the item instead of stopping its worker and hanging the batch."""
+    items = [{"id": f"doc-{i}", "text": f"Content {i}"} for i in range(6)]
+
+    with patch("govuk_content_agents.orchestration.batch.graph_app.ainvoke", new_callable=AsyncMock) as m_graph, \
+         patch("govuk_content_agents.orchestration.batch.mongo_client") as m_mongo:
+        m_graph.return_value = {"final_score": 90, "final_decision": "pass", "feedback": []}
+        m_mongo.completed_review_ids = AsyncMock(return_value=set())
+        m_mongo.save_review = AsyncMock(side_effect=RuntimeError("mongo is down"))
+
+        runner = BatchRunner(batch_id="b2", output_path=str(tmp_path / "results.jsonl"), concurrency=2)
+        report = await asyncio.wait_for(runner.run(iter(items)), timeout=5)
+
+    assert report["failed"] == 6
+    assert report["completed"] == 0
+
+@pytest.mark.asyncio
+async def test_batch_stops_when_a_worker_dies(tmp_path):
+    items = ({"id": f"doc-{i}", "text": f"Content {i}"} for i in range(100))
+    runner = BatchRunner(batch_id="b3", output_path=str(tmp_path / "results.jsonl"), concurrency=1, checkpoint=False)
+
+    with patch.object(BatchRunner, "review_item", new_callable=AsyncMock, side_effect=OSError("disk full")):
+        with pytest.raises(OSError, match="disk full"):
+            await asyncio.wait_for(runner.run(items), timeout=5)
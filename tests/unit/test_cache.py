@@ -0,0 +1,179 @@
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch
+from govuk_content_agents.llm.cache import EmbeddingCache, TieredCache, ResponseCache, embedding_namespace
+from govuk_content_agents.agents.content_reviewer import ContentReviewerAgent
+from govuk_content_agents.agents.improvement import ImprovementAgent
+
+def test_tiered_cache_memory_and_disk(tmp_path):
+    """Values survive eviction from memory and a fresh process via the disk tier."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TieredCache("test", path, max_memory_entries=1)
+
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})  # evicts "a" from memory
+
+    assert cache.get("a") == {"value": 1}
+    assert cache.disk_hits == 1
+    assert cache.get("missing") is None
+    assert cache.stats["misses"] == 1
+    cache.close()
+
+    reopened = TieredCache("test", path)
+    assert reopened.get("b") == {"value": 2}
+    reopened.close()
+
+def test_tiered_cache_ttl(tmp_path):
+    """Expired entries are treated as misses."""
+    cache = TieredCache("test", str(tmp_path / "cache.sqlite3"), ttl_seconds=60)
+    with patch("govuk_content_agents.llm.cache.time.time", return_value=1000.0):
+        cache.set("a", 1)
+    with patch("govuk_content_agents.llm.cache.time.time", return_value=1100.0):
+        assert cache.get("a") is None
+
+def test_tiered_cache_size_eviction(tmp_path):
+    """The disk tier is trimmed to its size limit."""
+    cache = TieredCache("test", str(tmp_path / "cache.sqlite3"), max_memory_entries=1, max_disk_entries=10)
+    for i in range(150):
+        cache.set(f"k{i}", i)
+    (count,) = cache._disk().execute("SELECT COUNT(*) FROM cache").fetchone()
+    assert count <= 60
+
+def test_response_cache_key_is_canonical():
+    """Context key order must not change the cache key."""
+    k1 = ResponseCache.make_key("openai", "gpt", "prompt", "content", {"a": 1, "b": 2})
+    k2 = ResponseCache.make_key("openai", "gpt", "prompt", "content", {"b": 2, "a": 1})
+    k3 = ResponseCache.make_key("openai", "gpt", "other prompt", "content", {"a": 1, "b": 2})
+    assert k1 == k2
+    assert k1 != k3
+
+def test_response_cache_key_separates_simulated_output(monkeypatch):
+    """Fake-provider responses never share keys with real ones, or with another seed."""
+    from govuk_content_agents.config import settings
+    real = ResponseCache.make_key("openai", "gpt-4.1-mini", "prompt", "content", None)
+    fake = ResponseCache.make_key("fake", "gpt-4.1-mini", "prompt", "content", None)
+    monkeypatch.setattr(settings, "FAKE_LLM_SEED", 7)
+    reseeded = ResponseCache.make_key("fake", "gpt-4.1-mini", "prompt", "content", None)
+    assert len({real, fake, reseeded}) == 3
+
+@pytest.mark.asyncio
+async def test_execute_uses_response_cache(tmp_path, monkeypatch):
+    """A repeat review is served from cache; opted-out agents always call the provider."""
+    from govuk_content_agents.config import settings
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    cache = ResponseCache("test", str(tmp_path / "cache.sqlite3"))
+
+    mock_openai = MagicMock()
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = '{"summary": "Test", "score": 80, "issues": [], "rewritten_content": "New"}'
+    mock_openai.chat.completions.create.return_value = mock_response
+
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai), \
+         patch("govuk_content_agents.agents.base.response_cache", cache):
+        reviewer = ContentReviewerAgent()
+        first = await reviewer.execute("Same content")
+        second = await reviewer.execute("Same content")
+
+        assert first.summary == second.summary == "Test"
+        assert mock_openai.chat.completions.create.call_count == 1
+        assert cache.hits == 1
+
+        improver = ImprovementAgent()
+        await improver.execute("Same content")
+        await improver.execute("Same content")
+        assert mock_openai.chat.completions.create.call_count == 3
+
+@pytest.mark.asyncio
+async def test_execute_does_not_cache_unparseable_responses(tmp_path, monkeypatch):
+    from govuk_content_agents.config import settings
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    cache = ResponseCache("test", str(tmp_path / "cache.sqlite3"))
+
+    mock_openai = MagicMock()
+    mock_response = MagicMock()
+    mock_response.choices[0].message.content = "Sorry, I cannot review this"
+    mock_openai.chat.completions.create.return_value = mock_response
+
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai), \
+         patch("govuk_content_agents.agents.base.response_cache", cache):
+        reviewer = ContentReviewerAgent()
+        first = await reviewer.execute("Same content")
+        await reviewer.execute("Same content")
+
+    assert first.telemetry.parse_failures == 1
+    assert mock_openai.chat.completions.create.call_count == 2
+    assert cache.hits == 0
+
+def test_embedding_cache_persists_across_restarts(tmp_path):
+    """Identical text is embedded once, even after the process restarts."""
+    path = str(tmp_path / "embeddings.sqlite3")
+    embed = MagicMock(return_value=[0.5, -0.25, 1.0])
+
+    cache = EmbeddingCache("test", path)
+    assert cache.get_or_embed("model", "text", embed) == [0.5, -0.25, 1.0]
+    assert cache.get_or_embed("model", "text", embed) == [0.5, -0.25, 1.0]
+    cache.close()
+
+    reopened = EmbeddingCache("test", path)
+    assert reopened.get_or_embed("model", "text", embed) == [0.5, -0.25, 1.0]
+    assert reopened.disk_hits == 1
+    assert embed.call_count == 1
+
+    reopened.get_or_embed("other-model", "text", embed)
+    assert embed.call_count == 2
+    reopened.close()
+
+def test_embedding_cache_coalesces_threads():
+    """Concurrent misses for the same text share one embedding call."""
+    cache = EmbeddingCache("test", None)
+    release = threading.Event()
+    calls = []
+
+    def embed(text):
+        calls.append(text)
+        release.wait(5)
+        return [1.0]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_embed("m", "t", embed))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while cache.coalesced < 3:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["t"]
+    assert results == [[1.0]] * 4
+
+@pytest.mark.asyncio
+async def test_embedding_cache_batches_only_misses():
+    """Batch lookups embed each missing text once, in a single call, preserving order."""
+    cache = EmbeddingCache("test", None)
+    cache.get_or_embed("m", "cached", lambda text: [0.0])
+    batches = []
+
+    async def embed_many(texts):
+        batches.append(texts)
+        await asyncio.sleep(0.01)
+        return [[float(len(t))] for t in texts]
+
+    first, second = await asyncio.gather(
+        cache.aget_or_embed_many("m", ["cached", "ab", "abc", "ab"], embed_many),
+        cache.aget_or_embed_many("m", ["abc"], embed_many)
+    )
+
+    assert first == [[0.0], [2.0], [3.0], [2.0]]
+    assert second == [[3.0]]
+    assert batches == [["ab", "abc"]]
+
+def test_fake_embeddings_are_not_served_to_real_calls(tmp_path):
+    """Simulated vectors are cached under their own namespace."""
+    cache = EmbeddingCache("test", str(tmp_path / "embeddings.sqlite3"))
+    version = "text-embedding-3-small@1536"
+    cache.get_or_embed(embedding_namespace("fake", version), "VAT", lambda text: [0.5])
+
+    assert cache.get_or_embed(embedding_namespace("openai", version), "VAT", lambda text: [1.0]) == [1.0]
@@ -0,0 +1,35 @@
+from unittest.mock import MagicMock, patch
+from govuk_content_agents.llm.clients import get_openai_client, get_gemini_client
+from govuk_content_agents.agents.content_reviewer import ContentReviewerAgent
+from govuk_content_agents.agents.style_compliance import StyleComplianceAgent
+
+def test_openai_client_is_shared_per_credentials():
+    """Agents using the same credentials should share one pooled client."""
+    with patch("govuk_content_agents.llm.clients.OpenAI", side_effect=lambda **kwargs: MagicMock()) as m_openai:
+        first = get_openai_client("sk-one")
+        second = get_openai_client("sk-one")
+        other = get_openai_client("sk-two")
+
+        assert first is second
+        assert first is not other
+        assert m_openai.call_count == 2
+
+        # Pooled HTTP client is passed through
+        assert "http_client" in m_openai.call_args.kwargs
+        # Retries are left to LLMScheduler
+        assert m_openai.call_args.kwargs["max_retries"] == 0
+
+def test_agents_reuse_registry_client():
+    """Constructing several agents must not create several clients."""
+    with patch("govuk_content_agents.llm.clients.OpenAI", side_effect=lambda **kwargs: MagicMock()) as m_openai:
+        reviewer = ContentReviewerAgent()
+        style = StyleComplianceAgent()
+
+        assert reviewer.client is style.client
+        assert m_openai.call_count == 1
+
+def test_gemini_client_missing_key():
+    """No Gemini key configured means no client."""
+    with patch("govuk_content_agents.llm.clients.settings") as m_settings:
+        m_settings.GEMINI_API_KEY = None
+        assert get_gemini_client() is None
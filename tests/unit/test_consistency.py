@@ -21,11 +21,17 @@ async def test_consistency_execution():
     
     # Mock Vector DB
     mock_vector_db = MagicMock()
-    mock_vector_db.search_similar.return_value = [
-        {"id": "123", "content": "Similar content", "similarity": 0.85}
-    ]
+    mock_vector_db.asearch_passages = AsyncMock(return_value=[
+        {
+            "id": "123",
+            "metadata": {"department": "HMRC"},
+            "similarity": 0.85,
+            "passages": [{"position": 0, "title": "Document", "content": "Similar   content", "similarity": 0.85}]
+        }
+    ])
+    mock_vector_db.asearch_similar = AsyncMock(return_value=[])
 
-    with patch("govuk_content_agents.agents.base.OpenAI", return_value=mock_openai), \
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai), \
          patch("govuk_content_agents.agents.consistency.vector_client", mock_vector_db):
         
         agent = ConsistencyAgent()
@@ -36,7 +42,8 @@ async def test_consistency_execution():
         
         # Verify flow
         mock_openai.embeddings.create.assert_called_once()
-        mock_vector_db.search_similar.assert_called_once()
+        mock_vector_db.asearch_passages.assert_awaited_once()
+        assert mock_vector_db.asearch_passages.await_args.kwargs["min_similarity"] == 0.7
         
         # Verify context passed to chat
         call_args = mock_openai.chat.completions.create.call_args
@@ -52,3 +59,23 @@ async def test_consistency_execution():
         # Yes: if context: messages.append({"role": "user", "content": ...})
         if len(messages) > 2:
             assert "Found the following similar content" in messages[2]['content']
+            assert "> Similar content" in messages[2]['content']
+
+@pytest.mark.asyncio
+async def test_documents_without_passages_are_found_by_document_search():
+    """Documents stored before the passage index still surface, as an excerpt."""
+    passage_hit = {"id": "a", "metadata": {}, "similarity": 0.8, "passages": [{"content": "VAT is 20%"}]}
+    mock_vector_db = MagicMock()
+    mock_vector_db.asearch_passages = AsyncMock(return_value=[passage_hit])
+    mock_vector_db.asearch_similar = AsyncMock(return_value=[
+        {"id": "a", "content": "VAT is 20%", "metadata": {}, "similarity": 0.8},
+        {"id": "b", "content": "Old VAT guidance", "metadata": {"department": "HMRC"}, "similarity": 0.9},
+    ])
+    mock_vector_db.aids_without_passages = AsyncMock(return_value=["b"])
+
+    with patch("govuk_content_agents.agents.consistency.vector_client", mock_vector_db):
+        documents = await ConsistencyAgent().search_existing([0.1] * 1536)
+
+    assert [d["id"] for d in documents] == ["b", "a"]
+    assert documents[0]["passages"][0]["content"] == "Old VAT guidance"
+    mock_vector_db.aids_without_passages.assert_awaited_once_with(["b"])
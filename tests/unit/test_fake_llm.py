@@ -0,0 +1,91 @@
+import pytest
+from govuk_content_agents.llm.fake import FakeLLM, FakeLLMClient, FakeLLMError
+from govuk_content_agents.agents.content_reviewer import ContentReviewerAgent
+from govuk_content_agents.agents.improvement import ImprovementAgent
+from govuk_content_agents.agents.persona import PersonaAgent
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    """Route agents to the simulator with no latency."""
+    from govuk_content_agents.config import settings
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "fake")
+    monkeypatch.setattr(settings, "FAKE_LLM_LATENCY_MEAN", 0.0)
+
+def test_responses_are_repeatable():
+    """The same seed and prompt always give the same response."""
+    messages = [{"role": "system", "content": "Review"}, {"role": "user", "content": "Some content"}]
+    first = FakeLLM(seed=1, latency_mean=0).complete("fake-model", messages)
+    second = FakeLLM(seed=1, latency_mean=0).complete("fake-model", messages)
+    other = FakeLLM(seed=2, latency_mean=0).complete("fake-model", messages)
+
+    assert first.choices[0].message.content == second.choices[0].message.content
+    assert first.choices[0].message.content != other.choices[0].message.content
+    assert first.usage.total_tokens > 0
+
+def test_latency_distribution_is_seeded():
+    import random
+    llm = FakeLLM(latency="lognormal", latency_mean=0.5, latency_sigma=0.3)
+    samples = [llm.sample_latency(random.Random(i)) for i in range(500)]
+    assert samples == [llm.sample_latency(random.Random(i)) for i in range(500)]
+    assert 0.4 < sum(samples) / len(samples) < 0.6
+
+def test_rate_limit_injection():
+    """Injected 429s carry a Retry-After header."""
+    llm = FakeLLM(latency_mean=0, rate_limit_rate=1.0, retry_after=2.0)
+    with pytest.raises(FakeLLMError) as exc:
+        llm.complete("fake-model", [{"role": "user", "content": "x"}])
+    assert exc.value.status_code == 429
+    assert exc.value.response.headers["retry-after"] == "2.000"
+
+def test_embeddings_reflect_shared_words():
+    client = FakeLLMClient(FakeLLM(latency_mean=0))
+    vat, vat_rates, fishing = (
+        client.embeddings.create(input=t, model="fake").data[0].embedding
+        for t in ("VAT rates for shops", "VAT rates", "Fishing licences")
+    )
+    dot = lambda a, b: sum(x * y for x, y in zip(a, b))
+    assert len(vat) == 1536
+    assert dot(vat, vat_rates) > dot(vat, fishing)
+
+@pytest.mark.asyncio
+async def test_agents_return_schema_valid_feedback(fake_provider):
+    """Each agent gets a response matching its own prompt contract."""
+    reviewer = ContentReviewerAgent()
+    improver = ImprovementAgent()
+    persona = PersonaAgent()
+    assert reviewer.provider == "fake"
+
+    review = await reviewer.execute("It is imperative that you facilitate the form.")
+    assert 0 <= review.score <= 100
+    assert all({"severity", "description"} <= set(i) for i in review.issues)
+
+    rewrite = await improver.execute("Paragraph one.\n\nParagraph two.")
+    assert rewrite.rewritten_content
+
+    persona_feedback = await persona.execute("Some content")
+    assert persona_feedback.rewritten_content is None
+
+def test_attempt_counters_are_dropped_on_success():
+    """Retried requests advance their attempt; successful ones are forgotten."""
+    llm = FakeLLM(latency_mean=0, error_rate=0.5)
+    for i in range(50):
+        messages = [{"role": "user", "content": f"Request {i}"}]
+        while True:
+            try:
+                llm.complete("fake-model", messages)
+                break
+            except FakeLLMError:
+                pass
+    assert llm._attempts == {}
+
+def test_fake_client_follows_simulator_settings(monkeypatch):
+    """Changing any FAKE_LLM_* setting gives a client built with the new values."""
+    from govuk_content_agents.config import settings
+    from govuk_content_agents.llm.clients import get_fake_client
+    first = get_fake_client()
+    assert get_fake_client() is first
+
+    monkeypatch.setattr(settings, "FAKE_LLM_ERROR_RATE", 0.5)
+    second = get_fake_client()
+    assert second is not first
+    assert second.llm.error_rate == 0.5
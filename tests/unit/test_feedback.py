@@ -0,0 +1,31 @@
+from govuk_content_agents.orchestration.feedback import merge_feedback, compact_feedback
+from govuk_content_agents.storage.models import AgentFeedback
+
+def test_merge_feedback_keeps_latest_iteration():
+    """Feedback from earlier iterations is dropped when a newer round arrives."""
+    old = [AgentFeedback(agent_name="Content", summary="Old", iteration=0)]
+    new = [AgentFeedback(agent_name="Content", summary="New", iteration=1)]
+
+    assert merge_feedback(old, new) == new
+    # Parallel reviewers in the same iteration accumulate
+    same = [AgentFeedback(agent_name="Style", summary="New", iteration=1)]
+    assert len(merge_feedback(new, same)) == 2
+
+def test_compact_feedback_drops_resolved_and_duplicates():
+    """Resolved and duplicate issues are removed; the rest are sorted by severity."""
+    feedback = [
+        AgentFeedback(agent_name="Content", summary="", issues=[
+            {"severity": "low", "description": "Long sentence"},
+            {"severity": "high", "description": "Missing user need"},
+            {"severity": "medium", "description": "Old issue", "resolved": True},
+        ]),
+        AgentFeedback(agent_name="Style", summary="", issues=[
+            {"severity": "low", "description": "long  sentence"},
+            {"severity": "info", "description": "Good use of headings"},
+        ]),
+    ]
+
+    summary = compact_feedback(feedback, max_issues_per_agent=5)
+
+    assert [i["description"] for i in summary[0]["issues"]] == ["Missing user need", "Long sentence"]
+    assert summary[1]["issues"] == []
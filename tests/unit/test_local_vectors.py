@@ -0,0 +1,222 @@
+import numpy as np
+import pytest
+from datetime import datetime
+from govuk_content_agents.storage import local_vectors
+from govuk_content_agents.storage.local_vectors import LocalVectorClient, top_k
+from govuk_content_agents.storage.models import ContentEmbedding, PassageEmbedding
+from govuk_content_agents.storage.vectors import RRF_K, create_vector_client
+
+DIMENSIONS = 32
+
+def random_items(n: int, seed: int = 0) -> list[ContentEmbedding]:
+    rng = np.random.default_rng(seed)
+    return [
+        ContentEmbedding(
+            id=f"doc-{i}",
+            content=f"Policy {i} about {'VAT' if i % 2 else 'benefits'}",
+            embedding=rng.standard_normal(DIMENSIONS).tolist(),
+            metadata={"department": "HMRC" if i % 2 else "DWP", "type": "external_policy"},
+            created_at=datetime(2024, 1 + i % 12, 1)
+        )
+        for i in range(n)
+    ]
+
+@pytest.fixture
+def store(tmp_path):
+    client = LocalVectorClient(table="test_vectors", path=str(tmp_path))
+    client.save_embeddings(random_items(200))
+    yield client
+    client.close()
+
+def exact_ranking(items: list[ContentEmbedding], query: np.ndarray, k: int) -> list[str]:
+    matrix = np.array([item.embedding for item in items], dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    scores = matrix @ (query / np.linalg.norm(query))
+    return [items[i].id for i in np.argsort(-scores)[:k]]
+
+def test_top_k_orders_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.9, 0.3], dtype=np.float32)
+    assert top_k(scores, 3).tolist() == [1, 3, 2]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 4, 0]
+
+def test_search_matches_exact_cosine_ordering(store):
+    items = random_items(200)
+    query = np.random.default_rng(1).standard_normal(DIMENSIONS)
+
+    results = store.search_similar(query.tolist(), limit=10)
+
+    assert [r["id"] for r in results] == exact_ranking(items, query, 10)
+    assert results[0]["similarity"] >= results[-1]["similarity"]
+    assert set(results[0]) == {"id", "content", "metadata", "similarity"}
+
+def test_filters_threshold_and_truncation(store):
+    query = random_items(200)[3].embedding
+
+    results = store.search_similar(
+        query,
+        limit=50,
+        filters={"department": "HMRC"},
+        created_after=datetime(2024, 4, 1),
+        min_similarity=0.1,
+        max_content_chars=8
+    )
+
+    assert results[0]["id"] == "doc-3"
+    assert results[0]["similarity"] == pytest.approx(1.0, abs=1e-5)
+    assert all(r["metadata"]["department"] == "HMRC" for r in results)
+    assert all(r["similarity"] >= 0.1 for r in results)
+    assert all(len(r["content"]) <= 8 for r in results)
+
+def test_store_persists_and_replaces_documents(tmp_path, store):
+    item = random_items(1, seed=5)[0].model_copy(update={"id": "doc-7", "content": "Updated policy"})
+    store.save_embedding(item)
+    store.close()
+
+    reopened = LocalVectorClient(table="test_vectors", path=str(tmp_path))
+    results = reopened.search_similar(item.embedding, limit=1)
+    reopened_hashes = reopened.get_content_hashes(["doc-7", "missing"])
+    # The replaced row stays retired after reopening
+    everything = reopened.search_similar(item.embedding, limit=1000)
+    reopened.close()
+
+    assert len(everything) == len({r["id"] for r in everything}) == 200
+
+    assert results[0]["id"] == "doc-7"
+    assert results[0]["content"] == "Updated policy"
+    assert list(reopened_hashes) == ["doc-7"]
+
+def test_replacing_a_document_leaves_its_old_row_untouched(store):
+    """Rows are copy-on-write, so a search scoring the old row sees the vector and doc it started with."""
+    old_row = store._rows["doc-0"]
+    old_vector = np.array(store._matrix[old_row])
+    old_doc = store._docs[old_row]
+    replacement = random_items(1, seed=9)[0].model_copy(update={"id": "doc-0", "content": "Replaced"})
+
+    store.save_embedding(replacement)
+
+    assert store._rows["doc-0"] != old_row
+    assert np.array_equal(store._matrix[old_row], old_vector)
+    assert store._docs[old_row] is old_doc
+    [result] = store.search_similar(replacement.embedding, limit=1)
+    assert (result["id"], result["content"]) == ("doc-0", "Replaced")
+    assert len(store.search_similar(replacement.embedding, limit=1000)) == 200
+
+def test_float16_store_keeps_top_result(tmp_path):
+    items = random_items(200)
+    client = LocalVectorClient(table="half_vectors", path=str(tmp_path), dtype="float16")
+    client.save_embeddings(items)
+
+    for item in items[:10]:
+        assert client.search_similar(item.embedding, limit=1)[0]["id"] == item.id
+    client.close()
+
+def test_ivf_index_with_all_probes_is_exact(store):
+    items = random_items(200)
+    query = np.random.default_rng(2).standard_normal(DIMENSIONS)
+    store.create_index("ivfflat", lists=8)
+
+    approximate = store.search_similar(query.tolist(), limit=5, probes=2)
+    exhaustive = store.search_similar(query.tolist(), limit=5, probes=8)
+
+    assert len(approximate) == 5
+    assert [r["id"] for r in exhaustive] == exact_ranking(items, query, 5)
+
+    store.drop_index()
+    assert [r["id"] for r in store.search_similar(query.tolist(), limit=5)] == exact_ranking(items, query, 5)
+
+def test_hybrid_search_scores_keyword_matches(store):
+    query = np.random.default_rng(3).standard_normal(DIMENSIONS)
+
+    results = store.search_similar(query.tolist(), limit=5, query_text="VAT")
+
+    assert all("score" in r for r in results)
+    assert any("VAT" in r["content"] for r in results)
+
+def test_hybrid_search_fuses_vector_and_keyword_ranks(tmp_path):
+    store = LocalVectorClient(table="hybrid", path=str(tmp_path))
+    axis = np.eye(DIMENSIONS)
+    store.save_embeddings([
+        ContentEmbedding(id="near", content="Tax guidance", embedding=axis[0].tolist()),
+        ContentEmbedding(id="middle", content="VAT rates", embedding=(axis[0] + axis[1]).tolist()),
+        ContentEmbedding(id="far", content="VAT returns", embedding=axis[1].tolist()),
+    ])
+
+    results = store.search_similar(axis[0].tolist(), limit=3, query_text="VAT")
+    store.close()
+
+    # Vector ranks: near 1, middle 2, far 3. Keyword ranks: middle 1, far 2
+    assert [r["id"] for r in results] == ["middle", "far", "near"]
+    assert [r["score"] for r in results] == pytest.approx([
+        1 / (RRF_K + 2) + 1 / (RRF_K + 1), 1 / (RRF_K + 3) + 1 / (RRF_K + 2), 1 / (RRF_K + 1)
+    ])
+    assert [r["similarity"] for r in results] == pytest.approx([2 ** -0.5, 0.0, 1.0], abs=1e-6)
+
+def test_create_vector_client_selects_backend(tmp_path, monkeypatch):
+    from govuk_content_agents.config import settings
+    monkeypatch.setattr(settings, "VECTOR_LOCAL_PATH", str(tmp_path))
+
+    assert isinstance(create_vector_client(backend="local"), LocalVectorClient)
+    with pytest.raises(ValueError):
+        create_vector_client(backend="faiss")
+
+def test_passage_search_groups_by_parent_and_replaces_passages(store):
+    rng = np.random.default_rng(1)
+    query = rng.standard_normal(DIMENSIONS)
+    near = (query + 0.1 * rng.standard_normal(DIMENSIONS)).tolist()
+
+    def passage(parent, position, embedding):
+        return PassageEmbedding(
+            id=f"{parent}-p{position}", parent_id=parent, position=position,
+            content=f"Passage {position} of {parent}", embedding=embedding
+        )
+
+    store.save_passages([
+        passage("doc-1", 0, near),
+        passage("doc-1", 1, near),
+        passage("doc-1", 2, rng.standard_normal(DIMENSIONS).tolist()),
+        passage("doc-2", 0, near),
+    ])
+    assert store.ids_without_passages(["doc-1", "doc-2", "doc-3"]) == ["doc-3"]
+
+    results = store.search_passages(query.tolist(), limit=2, passages_per_parent=2, min_similarity=0.5)
+    assert {r["id"] for r in results} == {"doc-1", "doc-2"}
+    doc_1 = next(r for r in results if r["id"] == "doc-1")
+    assert sorted(p["position"] for p in doc_1["passages"]) == [0, 1]
+    assert doc_1["metadata"]["department"] == "HMRC"
+
+    # Re-saving a parent drops its old passages; filters apply to the parent
+    store.save_passages([passage("doc-1", 0, rng.standard_normal(DIMENSIONS).tolist())])
+    results = store.search_passages(query.tolist(), limit=3, min_similarity=0.5)
+    assert [r["id"] for r in results] == ["doc-2"]
+    assert store.search_passages(query.tolist(), filters={"department": "HMRC"}, min_similarity=0.5) == []
+
+def test_replaced_passages_are_compacted(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(local_vectors, "COMPACT_MIN_DEAD_ROWS", 4)
+    rng = np.random.default_rng(2)
+
+    def save(version):
+        store.save_passages([
+            PassageEmbedding(
+                id=f"doc-1-v{version}-p{position}", parent_id="doc-1", position=position,
+                content=f"Passage {position}, version {version}", embedding=rng.standard_normal(DIMENSIONS).tolist()
+            )
+            for position in range(3)
+        ])
+
+    for version in range(10):
+        save(version)
+    passages = store._passage_store()
+    assert len(passages._ids) < 12
+    assert len(passages._rows) == 3
+    assert all(passages._ids[row] == doc_id for doc_id, row in passages._rows.items())
+
+    query = store.export_chunks("passages").__next__()[1][0]
+    [result] = store.search_passages(query.tolist(), limit=1, passages_per_parent=3)
+    assert sorted(p["content"] for p in result["passages"]) == [f"Passage {i}, version 9" for i in range(3)]
+
+    # The rewritten matrix and sidecar reopen consistently, retired rows included
+    store.close()
+    reopened = LocalVectorClient(table="test_vectors", path=str(tmp_path))
+    [result] = reopened.search_passages(query.tolist(), limit=1, passages_per_parent=1)
+    assert result["passages"][0]["similarity"] == pytest.approx(1.0, abs=1e-3)
+    reopened.close()
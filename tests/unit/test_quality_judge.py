@@ -17,7 +17,7 @@ async def test_quality_judge_execution():
     """
     mock_openai.chat.completions.create.return_value = mock_response
 
-    with patch("govuk_content_agents.agents.base.OpenAI", return_value=mock_openai):
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai):
         agent = QualityJudgeAgent()
         result = await agent.execute("Perfect content")
         
@@ -0,0 +1,77 @@
+import pytest
+from datetime import datetime
+from govuk_content_agents.storage.local_vectors import LocalVectorClient
+from govuk_content_agents.storage.models import ContentEmbedding, DEFAULT_EMBEDDING_VERSION, EmbeddingVersion
+from govuk_content_agents.storage.reembed import reembed
+from govuk_content_agents.storage.vectors import VectorService
+
+TARGET = EmbeddingVersion("text-embedding-3-large", 256)
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch):
+    from govuk_content_agents.config import settings
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "fake")
+    monkeypatch.setattr(settings, "FAKE_LLM_LATENCY", "constant")
+    monkeypatch.setattr(settings, "FAKE_LLM_LATENCY_MEAN", 0.0)
+
+@pytest.fixture
+def source(tmp_path):
+    client = LocalVectorClient(table="kb", path=str(tmp_path), version=DEFAULT_EMBEDDING_VERSION)
+    client.save_embeddings([
+        ContentEmbedding(
+            id=f"doc-{i}",
+            content=f"Policy {i} on VAT rates",
+            embedding=[1.0] + [0.0] * 1535,
+            metadata={"n": i},
+            created_at=datetime(2024, 1, 1 + i)
+        )
+        for i in range(5)
+    ])
+    yield client
+    client.close()
+
+def test_version_tables():
+    assert DEFAULT_EMBEDDING_VERSION.table("content_embeddings") == "content_embeddings"
+    assert TARGET.table("content_embeddings") == "content_embeddings_3_large_256"
+    assert TARGET.request_options() == {"dimensions": 256}
+    assert EmbeddingVersion("text-embedding-ada-002", 1536).request_options() == {}
+
+@pytest.mark.asyncio
+async def test_reembed_copies_documents_into_target_version(tmp_path, source):
+    target = LocalVectorClient(table=TARGET.table("kb"), path=str(tmp_path), version=TARGET)
+
+    report = await reembed(source, target, batch_size=2, chunk_rows=3)
+
+    assert report["documents"] == 5
+    assert target.dimensions == 256
+    assert target.get_content_hashes(["doc-3"]) == source.get_content_hashes(["doc-3"])
+    query = VectorService(client=target).embed_text("Policy 3 on VAT rates")
+    assert len(query) == 256
+    [result] = target.search_similar(query, limit=1)
+    assert result["id"] == "doc-3"
+    assert result["metadata"] == {"n": 3}
+    assert target.ids_without_passages([f"doc-{i}" for i in range(5)]) == []
+    target.close()
+
+@pytest.mark.asyncio
+async def test_reembed_resumes_without_re_embedding(tmp_path, source, monkeypatch):
+    target = LocalVectorClient(table=TARGET.table("kb"), path=str(tmp_path), version=TARGET)
+    await reembed(source, target)
+
+    calls = []
+    original = VectorService._aembed_texts
+
+    async def counting(self, texts):
+        calls.append(len(texts))
+        return await original(self, texts)
+
+    monkeypatch.setattr(VectorService, "_aembed_texts", counting)
+    report = await reembed(source, target)
+
+    assert report["documents"] == 5
+    assert calls == []
+    target.close()
+
+def test_local_store_rejects_other_version(tmp_path, source):
+    with pytest.raises(ValueError, match="text-embedding-3-small@1536"):
+        LocalVectorClient(table="kb", path=str(tmp_path), version=TARGET).connect()
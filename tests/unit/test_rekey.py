@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from datetime import datetime
+from govuk_content_agents.storage.local_vectors import LocalVectorClient
+from govuk_content_agents.storage.models import ContentEmbedding, PassageEmbedding, document_id, generate_uuid, passage_id
+from govuk_content_agents.storage.rekey import rekey
+from govuk_content_agents.storage.vectors import VectorService
+
+DIMENSIONS = 8
+
+def item(doc_id: str, content: str, day: int, metadata: dict | None = None) -> ContentEmbedding:
+    return ContentEmbedding(
+        id=doc_id,
+        content=content,
+        embedding=np.random.default_rng(day).standard_normal(DIMENSIONS).tolist(),
+        metadata=metadata or {},
+        created_at=datetime(2024, 1, day)
+    )
+
+@pytest.fixture
+def client(tmp_path):
+    client = LocalVectorClient(table="kb", path=str(tmp_path))
+    yield client
+    client.close()
+
+def key_id(content: str, metadata: dict | None = None) -> str:
+    return document_id(VectorService.document_key(content, metadata or {}))
+
+def test_rekey_moves_random_ids_and_drops_duplicates(client):
+    old_url, old_copy, new_copy, duplicate, current = (generate_uuid() for _ in range(5))
+    client.save_embeddings([
+        item(old_url, "Guidance on VAT", 1, {"url": "/vat"}),
+        # The same content saved twice: the newer row is kept
+        item(old_copy, "Benefit rates", 2),
+        item(new_copy, "Benefit rates", 3),
+        # Already stored under a deterministic id
+        item(duplicate, "Pension age", 4),
+        item(current, "Pension age", 5, {"url": "/pensions"}),
+        item(key_id("Pension age", {"url": "/pensions"}), "Pension age", 6, {"url": "/pensions"}),
+    ])
+    client.save_passages([
+        PassageEmbedding(
+            id=passage_id(old_url, i), parent_id=old_url, position=i, content=f"Part {i}", embedding=[1.0] * DIMENSIONS
+        )
+        for i in range(2)
+    ])
+
+    report = rekey(client, chunk_rows=2)
+
+    assert (report["moved"], report["dropped"]) == (2, 3)
+    moved = key_id("Guidance on VAT", {"url": "/vat"})
+    assert client.get_content_hashes([old_url, old_copy, new_copy, duplicate, current]) == {}
+    assert set(client._rows) == {moved, key_id("Benefit rates"), key_id("Pension age", {"url": "/pensions"})}
+    assert client._docs[client._rows[key_id("Benefit rates")]]["created_at"] == datetime(2024, 1, 3)
+    assert client.ids_without_passages([moved]) == []
+    [result] = client.search_passages([1.0] * DIMENSIONS, limit=1)
+    assert result["id"] == moved
+    assert sorted(p["content"] for p in result["passages"]) == ["Part 0", "Part 1"]
+
+    # A second run has nothing left to do
+    assert rekey(client)["moved"] == 0
+
+def test_rekey_dry_run_changes_nothing(client):
+    doc_id = generate_uuid()
+    client.save_embeddings([item(doc_id, "Guidance on VAT", 1)])
+
+    report = rekey(client, dry_run=True)
+
+    assert report["moved"] == 1
+    assert client._ids == [doc_id]
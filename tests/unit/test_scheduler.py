@@ -0,0 +1,107 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from govuk_content_agents.llm.scheduler import (
+    CallStats,
+    LLMScheduler,
+    ModelLimiter,
+    TokenBucket,
+    is_retryable,
+    retry_after_seconds,
+)
+
+class FakeRateLimitError(Exception):
+    """Mimics openai.RateLimitError (status code plus httpx response headers)."""
+    def __init__(self, retry_after: str | None = None):
+        super().__init__("rate limited")
+        self.status_code = 429
+        self.response = MagicMock(headers={"retry-after": retry_after} if retry_after else {})
+
+def test_token_bucket_wait_time():
+    """An empty bucket reports how long until enough budget refills."""
+    bucket = TokenBucket(per_minute=60)
+    bucket.available = 0
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    assert bucket.wait_time(1, scale=0.5) == pytest.approx(2.0)
+
+def test_retry_after_parsing():
+    """Retry-After headers are honoured; unrelated errors are not retried."""
+    assert retry_after_seconds(FakeRateLimitError("3")) == 3.0
+    assert retry_after_seconds(FakeRateLimitError()) is None
+    assert is_retryable(FakeRateLimitError())
+    assert not is_retryable(ValueError("bad request"))
+
+@pytest.mark.asyncio
+async def test_limiter_serves_higher_priority_first():
+    """When the budget is exhausted, higher-priority waiters go first."""
+    limiter = ModelLimiter(rpm=600, tpm=1_000_000)
+    limiter.requests.available = 0
+    order = []
+
+    async def worker(name, priority):
+        await limiter.acquire(tokens=1, priority=priority)
+        order.append(name)
+        limiter.release(1)
+
+    low = asyncio.create_task(worker("low", 0))
+    await asyncio.sleep(0)
+    high = asyncio.create_task(worker("high", 5))
+    await asyncio.gather(low, high)
+
+    assert order == ["high", "low"]
+
+@pytest.mark.asyncio
+async def test_release_wakes_waiter_for_concurrency_slot():
+    """A waiter blocked on concurrency is woken by release, not by polling."""
+    limiter = ModelLimiter(rpm=600, tpm=1_000_000, max_concurrency=1)
+    await limiter.acquire(tokens=1)
+    waiter = asyncio.create_task(limiter.acquire(tokens=1))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    limiter.release(1)
+    await asyncio.wait_for(waiter, timeout=0.05)
+    assert limiter.in_flight == 1
+    assert limiter._waiters == {}
+
+@pytest.mark.asyncio
+async def test_submit_retries_rate_limits_with_retry_after():
+    """A 429 is retried after the provider's Retry-After delay and the model is paused."""
+    scheduler = LLMScheduler()
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise FakeRateLimitError("0.1")
+        return "ok"
+
+    stats = CallStats()
+    start = time.monotonic()
+    result = await scheduler.submit("openai", "test-model", flaky, estimated_tokens=10, stats=stats)
+    elapsed = time.monotonic() - start
+
+    assert result == "ok"
+    assert calls == 2
+    assert elapsed >= 0.1
+    # Retry sleeps are backoff, not rate-limit queueing
+    assert stats.backoff_wait == pytest.approx(0.1)
+    assert stats.queue_wait < 0.1
+    assert scheduler.limiter("openai", "test-model").rate_scale < 1.0
+
+@pytest.mark.asyncio
+async def test_submit_gives_up_after_max_retries():
+    """Persistent failures are re-raised once retries are exhausted."""
+    scheduler = LLMScheduler()
+
+    async def always_fails():
+        raise FakeRateLimitError("0")
+
+    with patch("govuk_content_agents.llm.scheduler.settings") as m_settings:
+        m_settings.LLM_MAX_RETRIES = 2
+        m_settings.LLM_RATE_LIMITS = {}
+        m_settings.PROVIDER_RATE_LIMITS = {}
+        with pytest.raises(FakeRateLimitError):
+            await scheduler.submit("openai", "test-model", always_fails, estimated_tokens=10)
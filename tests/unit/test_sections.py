@@ -0,0 +1,77 @@
+import pytest
+from govuk_content_agents.orchestration.sections import combine_section_feedback
+from govuk_content_agents.orchestration.map_reduce import map_reduce_review
+from govuk_content_agents.storage.models import AgentFeedback
+from govuk_content_agents.utils.text import split_sections, split_chunks
+
+def test_split_markdown_and_guide_parts():
+    """Headings and GOV.UK part markers both start a new section."""
+    content = "Title: Tax on shopping\n\nIntro text\n\n--- Part: VAT and duties ---\n\nVAT is a tax.\n\n## Fuel Duty\nFuel duty applies."
+    sections = split_sections(content)
+
+    assert [s.title for s in sections] == ["Introduction", "VAT and duties", "Fuel Duty"]
+    assert "VAT is a tax." in sections[1].text
+
+def test_plain_text_is_one_section():
+    """Content without headings is reviewed as-is."""
+    sections = split_sections("Just a paragraph.")
+    assert len(sections) == 1
+    assert sections[0].text == "Just a paragraph."
+
+def test_hash_ignores_whitespace_changes():
+    a = split_sections("## A\nSome text.")[0]
+    b = split_sections("## A\nSome   text.\n")[0]
+    assert a.hash == b.hash
+
+def test_combine_weights_scores_and_tags_sections():
+    sections = split_sections("## Short\nA.\n\n## Long\n" + "Word " * 50)
+    reviews = {
+        sections[0].hash: AgentFeedback(agent_name="Style", summary="ok", score=0, issues=[{"description": "x"}]),
+        sections[1].hash: AgentFeedback(agent_name="Style", summary="ok", score=100),
+    }
+    combined = combine_section_feedback(sections, reviews)
+
+    assert combined.score > 90
+    assert combined.issues == [{"description": "x", "section": "Short", "chunk": 1, "chunks": [1]}]
+
+def test_split_chunks_respects_token_budget():
+    """Oversized sections are split into paragraph-packed chunks."""
+    paragraphs = "\n\n".join(f"Paragraph {i}. " + "word " * 80 for i in range(10))
+    chunks = split_chunks("## Big\n" + paragraphs, max_tokens=250)
+
+    assert len(chunks) > 1
+    assert all(len(c.text) <= 250 * 4 for c in chunks)
+    assert chunks[0].title.startswith("Big (1/")
+
+@pytest.mark.asyncio
+async def test_map_reduce_review_dedupes_with_bounded_parallelism():
+    """Chunks are reviewed concurrently (bounded) and shared issues are merged."""
+    import asyncio
+    from unittest.mock import MagicMock
+
+    in_flight = 0
+    peak = 0
+
+    async def execute(content, context=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return AgentFeedback(agent_name="Style", summary="ok", score=80, issues=[
+            {"severity": "low", "description": "Uses passive voice"},
+            {"severity": "high", "description": f"Problem in {context['section']}"},
+        ])
+
+    agent = MagicMock()
+    agent.execute = execute
+    content = "\n\n".join(f"--- Part: Part {i} ---\nText for part {i}." for i in range(8))
+
+    result = await map_reduce_review(agent, content)
+
+    assert peak <= 4
+    assert result.score == 80
+    passive = [i for i in result.issues if i["description"] == "Uses passive voice"]
+    assert len(passive) == 1
+    assert passive[0]["chunks"] == list(range(1, 9))
+    assert len(result.issues) == 9
@@ -0,0 +1,73 @@
+import io
+import numpy as np
+import pytest
+from datetime import datetime
+from govuk_content_agents.storage.local_vectors import LocalVectorClient
+from govuk_content_agents.storage.models import ContentEmbedding, PassageEmbedding
+from govuk_content_agents.storage.snapshot import export_snapshot, import_snapshot, read_snapshot, write_chunk, write_header
+
+DIMENSIONS = 16
+
+@pytest.fixture
+def source(tmp_path):
+    rng = np.random.default_rng(0)
+    client = LocalVectorClient(table="kb", path=str(tmp_path / "source"))
+    client.save_embeddings([
+        ContentEmbedding(
+            id=f"doc-{i}",
+            content=f"Policy {i}",
+            embedding=rng.standard_normal(DIMENSIONS).tolist(),
+            metadata={"department": "HMRC"},
+            created_at=datetime(2024, 1, 1 + i)
+        )
+        for i in range(25)
+    ])
+    client.save_passages([
+        PassageEmbedding(id=f"doc-{i}-p0", parent_id=f"doc-{i}", position=0, content=f"Policy {i}",
+                         embedding=rng.standard_normal(DIMENSIONS).tolist())
+        for i in range(25)
+    ])
+    yield client
+    client.close()
+
+def test_snapshot_round_trip_without_embedding_calls(tmp_path, source):
+    path = str(tmp_path / "kb.snapshot")
+    assert export_snapshot(source, path, chunk_rows=10) == {"documents": 25, "passages": 25}
+
+    target = LocalVectorClient(table="kb", path=str(tmp_path / "target"))
+    assert import_snapshot(target, path) == {"documents": 25, "passages": 25}
+
+    query = np.random.default_rng(1).standard_normal(DIMENSIONS).tolist()
+    expected = source.search_similar(query, limit=5)
+    loaded = target.search_similar(query, limit=5)
+    assert [r["id"] for r in loaded] == [r["id"] for r in expected]
+    assert loaded[0]["similarity"] == pytest.approx(expected[0]["similarity"], abs=1e-5)
+    assert [r["id"] for r in target.search_passages(query, limit=3)] == [r["id"] for r in source.search_passages(query, limit=3)]
+    assert target.get_content_hashes(["doc-3"]) == source.get_content_hashes(["doc-3"])
+    target.close()
+
+def test_float16_chunks_are_half_size():
+    records = [{"id": "a", "content": "x"}]
+    embeddings = np.ones((1, 1536), dtype=np.float32)
+    sizes = {}
+    for dtype in ("float32", "float16"):
+        f = io.BytesIO()
+        write_header(f, "kb", dtype, "text-embedding-3-small@1536")
+        write_chunk(f, "documents", records, embeddings, dtype)
+        f.write(b"E")
+        sizes[dtype] = len(f.getvalue())
+        f.seek(0)
+        _, chunks = read_snapshot(f)
+        [chunk] = list(chunks)
+        assert chunk.records == records
+        assert np.array_equal(chunk.embeddings, embeddings)
+    assert sizes["float32"] - sizes["float16"] == 1536 * 2
+
+def test_import_rejects_other_embedding_model(tmp_path, source, monkeypatch):
+    from govuk_content_agents.config import settings
+    path = str(tmp_path / "kb.snapshot")
+    export_snapshot(source, path)
+    monkeypatch.setattr(settings, "EMBEDDING_MODEL", "text-embedding-3-large")
+
+    with pytest.raises(ValueError, match="text-embedding-3-small"):
+        import_snapshot(LocalVectorClient(table="kb", path=str(tmp_path / "target")), path)
@@ -24,7 +24,7 @@ async def test_style_compliance_execution():
     """
     mock_openai.chat.completions.create.return_value = mock_response
 
-    with patch("govuk_content_agents.agents.base.OpenAI", return_value=mock_openai):
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai):
         agent = StyleComplianceAgent()
         result = await agent.execute("Mistakes were made.")
         
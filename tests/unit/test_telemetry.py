@@ -0,0 +1,74 @@
+import json
+import logging
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from govuk_content_agents.agents.content_reviewer import ContentReviewerAgent
+from govuk_content_agents.logging_config import JsonFormatter
+from govuk_content_agents.storage.models import AgentTelemetry
+from govuk_content_agents.utils.telemetry import summarize_telemetry
+
+def make_response(content: str):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=120,
+            completion_tokens=30,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=64)
+        )
+    )
+
+@pytest.mark.asyncio
+async def test_execute_records_token_usage():
+    """Token counts from response.usage end up on the feedback."""
+    mock_openai = MagicMock()
+    mock_openai.chat.completions.create.return_value = make_response('{"summary": "Test", "score": 80, "issues": []}')
+
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai):
+        result = await ContentReviewerAgent().execute("Test content")
+
+    telemetry = result.telemetry
+    assert telemetry.agent_name == "Content Reviewer"
+    assert telemetry.provider == "openai"
+    assert telemetry.prompt_tokens == 120
+    assert telemetry.completion_tokens == 30
+    assert telemetry.cached_tokens == 64
+    assert telemetry.retries == 0
+    assert telemetry.parse_failures == 0
+    assert telemetry.total_seconds >= telemetry.provider_latency_seconds
+
+@pytest.mark.asyncio
+async def test_execute_counts_parse_failures():
+    mock_openai = MagicMock()
+    mock_openai.chat.completions.create.return_value = make_response("Invalid JSON")
+
+    with patch("govuk_content_agents.llm.clients.OpenAI", return_value=mock_openai):
+        result = await ContentReviewerAgent().execute("Test content")
+
+    assert result.telemetry.parse_failures == 1
+
+def test_summarize_telemetry_rolls_up_per_agent():
+    items = [
+        AgentTelemetry(agent_name="Style", provider="openai", model="m", prompt_tokens=100, total_seconds=1.0),
+        AgentTelemetry(agent_name="Style", provider="openai", model="m", prompt_tokens=50, total_seconds=0.5, retries=2),
+        AgentTelemetry(agent_name="Judge", provider="openai", model="m", prompt_tokens=10, cache_hit=True),
+    ]
+
+    summary = summarize_telemetry(items)
+
+    assert summary["total"]["calls"] == 3
+    assert summary["total"]["prompt_tokens"] == 160
+    assert summary["total"]["cache_hits"] == 1
+    assert summary["agents"]["Style"]["total_seconds"] == 1.5
+    assert summary["agents"]["Style"]["retries"] == 2
+    assert summary["agents"]["Judge"]["calls"] == 1
+
+def test_json_formatter_includes_structured_event():
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "done", None, None)
+    record.event = "agent_execution"
+    record.data = {"agent_name": "Style", "prompt_tokens": 5}
+
+    output = json.loads(JsonFormatter().format(record))
+
+    assert output["event"] == "agent_execution"
+    assert output["data"]["prompt_tokens"] == 5
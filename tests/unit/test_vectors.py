@@ -0,0 +1,448 @@
+import asyncio
+import struct
+import time
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import psycopg2
+import pytest
+from govuk_content_agents.config import settings
+from govuk_content_agents.llm.fake import FakeLLM, FakeLLMClient
+from govuk_content_agents.storage import search_cache, vectors
+from govuk_content_agents.storage.models import ContentEmbedding, EmbeddingVersion, content_hash, document_id
+from govuk_content_agents.storage.search_cache import SearchCache
+from govuk_content_agents.storage.vectors import RRF_K, VectorDBClient, VectorService, create_vector_client
+
+@pytest.fixture
+def pool():
+    """Pooled connections are MagicMocks; the schema setup is skipped."""
+    pool = MagicMock()
+    pool.getconn.side_effect = lambda: MagicMock(closed=0)
+    with patch.object(vectors, "_VectorConnectionPool", return_value=pool), \
+         patch.object(vectors.psycopg2, "connect"):
+        yield pool
+    vectors._initialised_tables.clear()
+
+@pytest.fixture
+def conn(pool):
+    """The connection every checkout returns. Its cursor fetches no rows unless a test sets them."""
+    conn = MagicMock(closed=0)
+    conn.cursor.return_value.__enter__.return_value.fetchall.return_value = []
+    pool.getconn.side_effect = lambda: conn
+    return conn
+
+@pytest.fixture
+def cursor(conn):
+    return conn.cursor.return_value.__enter__.return_value
+
+@pytest.fixture
+def client(pool):
+    client = VectorDBClient(table="pool_test")
+    client.connect()
+    return client
+
+@pytest.fixture
+def cache(monkeypatch):
+    """A fresh, enabled search cache used by every vector client."""
+    monkeypatch.setattr(settings, "SEARCH_CACHE_ENABLED", True)
+    cache = SearchCache(max_entries=10)
+    monkeypatch.setattr(vectors, "search_cache", cache)
+    monkeypatch.setattr(search_cache, "search_cache", cache)
+    return cache
+
+@pytest.fixture
+def ingest_service():
+    """VectorService with fake embeddings and an async client with nothing stored."""
+    service = VectorService()
+    service.openai = FakeLLMClient(FakeLLM(latency_mean=0))
+    service.client = MagicMock(
+        asave_embeddings=AsyncMock(),
+        aget_content_hashes=AsyncMock(return_value={}),
+        afind_embeddings_by_hash=AsyncMock(return_value={}),
+        aids_without_passages=AsyncMock(return_value=[]),
+        asave_passages=AsyncMock()
+    )
+    return service
+
+@pytest.fixture
+def service():
+    service = VectorService()
+    service.openai = MagicMock()
+    service.openai.embeddings.create.return_value = MagicMock(data=[MagicMock(embedding=[0.5] * 1536)])
+    service.client = MagicMock()
+    service.client.get_content_hashes.return_value = {}
+    service.client.find_embeddings_by_hash.return_value = {}
+    service.client.ids_without_passages.return_value = []
+    return service
+
+def test_schema_is_created_once_per_process(pool):
+    first = VectorDBClient(table="pool_test")
+    second = VectorDBClient(table="pool_test")
+    first.connect()
+    second.connect()
+
+    assert vectors.psycopg2.connect.call_count == 1
+
+def test_search_returns_connection_to_pool(pool, client, conn, cursor):
+    cursor.fetchall.return_value = [("1", "Text", {}, 0.9)]
+
+    results = client.search_similar([0.1] * 1536, limit=1)
+
+    assert results == [{"id": "1", "content": "Text", "metadata": {}, "similarity": 0.9}]
+    pool.putconn.assert_called_once_with(conn, close=False)
+
+def test_broken_connection_is_discarded_and_retried(pool, client):
+    broken = MagicMock(closed=0)
+    broken.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError("server closed")
+    healthy = MagicMock(closed=0)
+    healthy.cursor.return_value.__enter__.return_value.fetchall.return_value = []
+    pool.getconn.side_effect = [broken, healthy]
+
+    assert client.search_similar([0.1] * 1536) == []
+    pool.putconn.assert_any_call(broken, close=True)
+    pool.putconn.assert_any_call(healthy, close=False)
+
+def test_closed_connection_is_replaced_on_checkout(pool, client):
+    stale = MagicMock(closed=1)
+    fresh = MagicMock(closed=0)
+    pool.getconn.side_effect = [stale, fresh]
+
+    with client.connection() as conn:
+        assert conn is fresh
+    pool.putconn.assert_any_call(stale, close=True)
+
+@pytest.mark.asyncio
+async def test_async_searches_overlap(pool):
+    """asearch_similar runs off the event loop, so concurrent lookups overlap."""
+    def slow_fetch():
+        time.sleep(0.2)
+        return [("1", "Text", {}, 0.9)]
+
+    def make_conn():
+        conn = MagicMock(closed=0)
+        conn.cursor.return_value.__enter__.return_value.fetchall.side_effect = slow_fetch
+        return conn
+
+    pool.getconn.side_effect = make_conn
+    client = VectorDBClient(table="pool_test", max_connections=4)
+    client.connect()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client.asearch_similar([0.1] * 1536, limit=1) for _ in range(4)))
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    assert all(r[0]["similarity"] == 0.9 for r in results)
+    assert elapsed < 0.6
+
+def test_index_sql_uses_cosine_ops():
+    client = VectorDBClient(table="pool_test")
+
+    hnsw = client._index_sql("hnsw", m=24, ef_construction=100)
+    ivfflat = client._index_sql("ivfflat", lists=50, concurrently=True)
+
+    assert "USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 100)" in hnsw
+    assert ivfflat.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS pool_test_embedding_idx")
+    assert "WITH (lists = 50)" in ivfflat
+    with pytest.raises(ValueError):
+        client._index_sql("flat")
+
+def test_search_sets_query_time_index_parameters(client, cursor):
+    client.search_similar([0.1] * 1536, limit=5, ef_search=80, probes=10)
+
+    statements = [c.args[0] for c in cursor.execute.call_args_list]
+    assert statements[0] == "SET LOCAL hnsw.ef_search = %s"
+    assert statements[1] == "SET LOCAL ivfflat.probes = %s"
+    assert cursor.execute.call_args_list[0].args[1] == (80,)
+
+def test_search_applies_filters_and_threshold_in_sql(client, cursor):
+    client.search_similar(
+        [0.1] * 1536,
+        filters={"department": "HMRC"},
+        created_after=datetime(2024, 1, 1),
+        min_similarity=0.7,
+        max_content_chars=200
+    )
+
+    sql, params = cursor.execute.call_args.args
+    assert "metadata @> %(filters)s::jsonb" in sql
+    assert "created_at >= %(created_after)s" in sql
+    assert "left(content, %(chars)s)" in sql
+    assert params["filters"] == '{"department": "HMRC"}'
+    assert params["max_distance"] == pytest.approx(0.3)
+
+def test_hybrid_search_fuses_ranks(client, cursor):
+    cursor.fetchall.return_value = [("1", "VAT rates", {}, 0.82, 0.0328)]
+
+    results = client.search_similar([0.1] * 1536, limit=3, query_text="VAT rates")
+
+    sql, params = cursor.execute.call_args.args
+    assert "websearch_to_tsquery" in sql
+    assert "FULL OUTER JOIN" in sql
+    assert params["query_text"] == "VAT rates"
+    assert results == [{"id": "1", "content": "VAT rates", "metadata": {}, "similarity": 0.82, "score": 0.0328}]
+
+def test_hybrid_search_returns_rows_by_fused_score(client, cursor):
+    # Ranks (vector, keyword): both (1, 2), keyword only (-, 1), vector only (2, -).
+    # PostgreSQL returns the fused score as numeric.
+    rrf = lambda rank: Decimal(1) / (RRF_K + rank)
+    cursor.fetchall.return_value = [
+        ("both", "VAT rates", {}, 0.9, rrf(1) + rrf(2)),
+        ("keyword", "VAT", {}, 0.2, rrf(1)),
+        ("vector", "Tax", {}, 0.8, rrf(2)),
+    ]
+
+    results = client.search_similar([0.1] * 1536, limit=3, query_text="VAT")
+
+    sql, params = cursor.execute.call_args.args
+    assert "ORDER BY fused.score DESC" in sql
+    assert (params["k"], params["candidates"]) == (RRF_K, 20)
+    assert [r["id"] for r in results] == ["both", "keyword", "vector"]
+    assert [r["similarity"] for r in results] == [0.9, 0.2, 0.8]
+    assert all(type(r["score"]) is float for r in results)
+    assert results[0]["score"] == pytest.approx(1 / (RRF_K + 1) + 1 / (RRF_K + 2))
+
+def test_save_embeddings_is_one_multi_row_upsert(client, conn):
+    items = [
+        ContentEmbedding(id="a", content="First", embedding=[0.1]),
+        ContentEmbedding(id="b", content="Second", embedding=[0.2]),
+        ContentEmbedding(id="a", content="First (updated)", embedding=[0.3]),
+    ]
+
+    with patch.object(vectors, "execute_values") as execute_values:
+        written = client.save_embeddings(items)
+
+    assert written == 2
+    rows = execute_values.call_args.args[2]
+    assert [row[:2] for row in rows] == [("a", "First (updated)"), ("b", "Second")]
+    conn.commit.assert_called_once()
+
+def test_each_embedding_version_has_its_own_table(conn):
+    version = EmbeddingVersion("text-embedding-3-large", 3072)
+    client = create_vector_client(table="pool_test", backend="pgvector", version=version)
+    assert client.table == "pool_test_3_large_3072"
+    assert "halfvec(3072)" in client._index_sql("hnsw", storage="halfvec")
+
+    client.connect()
+    with patch.object(vectors, "execute_values") as execute_values:
+        client.save_embeddings([ContentEmbedding(id="a", content="First", embedding=[0.1] * 3072)])
+
+    [row] = execute_values.call_args.args[2]
+    assert row[4] == "text-embedding-3-large@3072"
+
+def test_large_embeddings_are_indexed_as_halfvec():
+    client = VectorDBClient(table="pool_test", version=EmbeddingVersion("text-embedding-3-large", 3072))
+
+    # pgvector cannot index vector columns over 2000 dimensions
+    assert "((embedding::halfvec(3072)) halfvec_cosine_ops)" in client._index_sql("hnsw", storage="full")
+    passages = client._index_sql("hnsw", storage="full", table=client.passages_table)
+    assert "pool_test_passages_embedding_halfvec_idx" in passages
+    assert client.index_name == "pool_test_embedding_halfvec_idx"
+    with pytest.raises(ValueError, match="4000"):
+        VectorDBClient(table="pool_test", version=EmbeddingVersion("some-model", 4096))
+
+@pytest.mark.asyncio
+async def test_ingest_streams_batches_in_order(ingest_service):
+    def documents():
+        for i in range(7):
+            yield {"id": f"doc-{i}", "content": f"Policy {i}", "metadata": {"n": i}}
+
+    batches = [ids async for ids in ingest_service.ingest(documents(), batch_size=3, concurrency=2)]
+
+    assert batches == [["doc-0", "doc-1", "doc-2"], ["doc-3", "doc-4", "doc-5"], ["doc-6"]]
+    client = ingest_service.client
+    assert client.asave_embeddings.await_count == 3
+    # Batches run concurrently, so calls may complete in any order
+    saved = {item.id: item for c in client.asave_embeddings.await_args_list for item in c.args[0]}
+    assert len(saved["doc-0"].embedding) == 1536
+    passages = [p for c in client.asave_passages.await_args_list for p in c.args[0]]
+    assert sorted((p.parent_id, p.position) for p in passages) == [(f"doc-{i}", 0) for i in range(7)]
+    assert all(p.embedding == saved[p.parent_id].embedding for p in passages)
+
+@pytest.mark.asyncio
+async def test_ingest_splits_long_documents_into_passages(ingest_service, monkeypatch):
+    monkeypatch.setattr(settings, "PASSAGE_MAX_TOKENS", 10)
+    content = "VAT is charged on most goods.\n\nSome goods are zero rated.\n\nFuel is charged at 5%."
+
+    [ids] = [ids async for ids in ingest_service.ingest([{"id": "doc-1", "content": content}])]
+
+    passages = ingest_service.client.asave_passages.await_args.args[0]
+    assert [p.content for p in passages] == [
+        "VAT is charged on most goods.", "Some goods are zero rated.", "Fuel is charged at 5%."
+    ]
+    assert {p.parent_id for p in passages} == {"doc-1"}
+    assert len({p.id for p in passages}) == 3
+
+def test_search_passages_groups_by_parent(client, cursor):
+    passages = [{"position": 2, "title": "Rates", "content": "VAT is 20%", "similarity": 0.91}]
+    cursor.fetchall.return_value = [("1", {"department": "HMRC"}, 0.91, passages)]
+
+    results = client.search_passages([0.1] * 1536, limit=3, passages_per_parent=2, min_similarity=0.7)
+
+    sql, params = cursor.execute.call_args_list[-1].args
+    assert "pool_test_passages p JOIN pool_test d" in sql
+    assert "PARTITION BY parent_id" in sql
+    assert params["per_parent"] == 2
+    assert params["max_distance"] == pytest.approx(0.3)
+    assert results == [{"id": "1", "metadata": {"department": "HMRC"}, "similarity": 0.91, "passages": passages}]
+
+def test_upsert_uses_deterministic_id_for_content_id(service):
+    first = service.upsert_policy("VAT is 20%", {"content_id": "abc-123"})
+    second = service.upsert_policy("VAT is 20% for most goods", {"content_id": "abc-123"})
+
+    assert first == second == document_id("content_id:abc-123")
+    assert service.client.save_embedding.call_count == 2
+
+def test_upsert_skips_embedding_for_unchanged_content(service):
+    doc_id = document_id("HMRC:VAT")
+    service.client.get_content_hashes.return_value = {doc_id: content_hash("VAT is 20%")}
+
+    assert service.upsert_policy("VAT is 20%", {"topic": "VAT"}, key="HMRC:VAT") == doc_id
+
+    service.openai.embeddings.create.assert_not_called()
+    service.client.save_embedding.assert_not_called()
+    service.client.update_metadata.assert_called_once_with(doc_id, {"topic": "VAT"})
+
+def test_upsert_reuses_embedding_for_identical_text(service):
+    digest = content_hash("VAT is 20%")
+    service.client.find_embeddings_by_hash.return_value = {digest: [0.1] * 1536}
+
+    service.upsert_policy("VAT is 20%", {}, key="DWP:VAT")
+
+    service.openai.embeddings.create.assert_not_called()
+    saved = service.client.save_embedding.call_args.args[0]
+    assert saved.content_hash == digest
+    assert saved.embedding == [0.1] * 1536
+    # A single-passage document reuses the document embedding
+    [passage] = service.client.save_passages.call_args.args[0]
+    assert passage.parent_id == saved.id
+    assert passage.embedding == [0.1] * 1536
+
+def test_compressed_storage_index_expressions():
+    client = VectorDBClient(table="pool_test")
+
+    halfvec = client._index_sql("hnsw", storage="halfvec")
+    binary = client._index_sql("hnsw", storage="binary")
+    reduced = client._index_sql("ivfflat", storage="reduced")
+
+    assert "pool_test_embedding_halfvec_idx" in halfvec
+    assert "((embedding::halfvec(1536)) halfvec_cosine_ops)" in halfvec
+    assert "((binary_quantize(embedding)::bit(1536)) bit_hamming_ops)" in binary
+    assert "subvector(embedding, 1, 512)::vector(512)" in reduced
+    with pytest.raises(ValueError):
+        client._index_sql("hnsw", storage="pq")
+
+def test_compressed_search_reranks_candidates(client, cursor):
+    client.search_similar([0.1] * 1536, limit=5, storage="binary")
+
+    statements = [c.args for c in cursor.execute.call_args_list]
+    assert statements[0] == ("SET LOCAL hnsw.ef_search = %s", (40,))
+    sql, params = statements[-1]
+    assert "ORDER BY binary_quantize(embedding)::bit(1536) <~> binary_quantize(%(embedding)s::vector)" in sql
+    assert "ORDER BY embedding <=> %(embedding)s::vector" in sql
+    assert params["rerank"] == 20
+
+def test_compressed_search_returns_rows_in_exact_distance_order(client, cursor):
+    cursor.fetchall.return_value = [("b", "Closest", {}, 0.95), ("a", "Next", {}, 0.9), ("c", "Last", {}, 0.4)]
+
+    results = client.search_similar([0.1] * 1536, limit=3, storage="halfvec")
+
+    sql, _ = cursor.execute.call_args.args
+    # Candidates come from the compressed index; the outer query orders them by exact distance
+    approximate = sql.index("ORDER BY embedding::halfvec(1536) <=> %(embedding)s::halfvec(1536)")
+    exact = sql.rindex("ORDER BY embedding <=> %(embedding)s::vector")
+    assert approximate < sql.index("AS candidates") < exact
+    assert [(r["id"], r["similarity"]) for r in results] == [("b", 0.95), ("a", 0.9), ("c", 0.4)]
+    assert all("score" not in r for r in results)
+
+def test_search_cache_serves_repeats_until_a_write(client, cursor, cache):
+    cursor.fetchall.return_value = [("1", "Text", {}, 0.9)]
+
+    first = client.search_similar([0.1] * 1536, limit=3, filters={"department": "HMRC"})
+    first[0]["content"] = "mutated by caller"
+    second = client.search_similar([0.1] * 1536, limit=3, filters={"department": "HMRC"})
+    client.search_similar([0.1] * 1536, limit=3, filters={"department": "DWP"})
+
+    assert second[0]["content"] == "Text"
+    assert cache.hits == 1 and cache.misses == 2
+
+    with patch.object(vectors, "execute_values"):
+        client.save_embeddings([ContentEmbedding(id="a", content="New", embedding=[0.1])])
+    client.search_similar([0.1] * 1536, limit=3, filters={"department": "HMRC"})
+
+    assert cache.misses == 3
+    stats = cache.stats
+    assert stats["hit_ratio"] == pytest.approx(0.25)
+    assert stats["invalidations"] == 1
+    assert stats["latency_saved_seconds"]["count"] == 1
+
+def test_search_cache_key_covers_search_settings(client, cursor, cache, monkeypatch):
+    client.search_similar([0.1] * 1536, limit=3)
+    # An explicit storage that resolves to the default shares the entry
+    client.search_similar([0.1] * 1536, limit=3, storage="full")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    for name, value in [("VECTOR_STORAGE", "binary"), ("VECTOR_HNSW_EF_SEARCH", 200), ("VECTOR_RERANK_FACTOR", 8)]:
+        monkeypatch.setattr(settings, name, value)
+        client.search_similar([0.1] * 1536, limit=3)
+    assert (cache.hits, cache.misses) == (1, 4)
+
+def test_search_cache_expires_and_evicts():
+    cache = SearchCache(max_entries=2, ttl_seconds=60)
+    search = MagicMock(return_value=["result"])
+    key = cache.make_key("t", "search_similar", {"embedding": [0.1], "limit": 1})
+
+    with patch("govuk_content_agents.storage.search_cache.time.monotonic", return_value=0.0):
+        cache.get_or_search(key, search)
+        cache.get_or_search(key, search)
+    with patch("govuk_content_agents.storage.search_cache.time.monotonic", return_value=61.0):
+        cache.get_or_search(key, search)
+    assert search.call_count == 2
+
+    for i in range(3):
+        cache.get_or_search(f"other-{i}", search)
+    assert cache.stats["entries"] == 2
+
+def test_bulk_load_copies_binary_rows(client, cursor):
+    records = [{"id": "00000000-0000-0000-0000-000000000001", "content": "VAT", "content_hash": "h",
+                "metadata": {"department": "HMRC"}, "created_at": None}]
+
+    assert client.bulk_load("documents", records, np.array([[1.0, 2.0]], dtype=np.float32)) == 1
+
+    copy_sql, data = cursor.copy_expert.call_args.args
+    assert "FORMAT binary" in copy_sql
+    payload = data.getvalue()
+    assert payload.startswith(b"PGCOPY\n\xff\r\n\x00")
+    # pgvector binary: length, int16 dimensions, int16 unused, big-endian float4s
+    assert payload.endswith(struct.pack(">ihhff", 12, 2, 0, 1.0, 2.0) + struct.pack(">h", -1))
+    insert_sql, params = cursor.execute.call_args.args
+    assert "ON CONFLICT (id) DO UPDATE" in insert_sql
+    assert "embedding_model = EXCLUDED.embedding_model" in insert_sql
+    assert params == ("text-embedding-3-small@1536",)
+    assert cursor.execute.call_count == 2
+
+def test_compressed_search_keeps_ef_search_within_pgvector_limit(client, cursor):
+    client.search_similar([0.1] * 1536, limit=300, storage="halfvec")
+    assert cursor.execute.call_args_list[0].args == ("SET LOCAL hnsw.ef_search = %s", (1000,))
+    assert cursor.execute.call_args.args[1]["rerank"] == 1000
+
+    # Hybrid search reads 4x limit candidates
+    client.search_similar([0.1] * 1536, limit=30, storage="binary", query_text="VAT", ef_search=5000)
+    assert cursor.execute.call_args_list[-2].args == ("SET LOCAL hnsw.ef_search = %s", (1000,))
+
+def test_search_passages_sets_index_parameters(client, cursor):
+    client.search_passages([0.1] * 1536, limit=100, passages_per_parent=3, probes=12)
+
+    statements = [c.args for c in cursor.execute.call_args_list]
+    assert statements[0] == ("SET LOCAL hnsw.ef_search = %s", (1000,))
+    assert statements[1] == ("SET LOCAL ivfflat.probes = %s", (12,))
+
+def test_update_content_hashes_backfills_rows(client):
+    with patch.object(vectors, "execute_values") as execute_values:
+        client.update_content_hashes({"00000000-0000-0000-0000-000000000001": "h"})
+
+    _, sql, rows = execute_values.call_args.args
+    assert sql.startswith("UPDATE pool_test AS t SET content_hash = v.hash")
+    assert rows == [("00000000-0000-0000-0000-000000000001", "h")]